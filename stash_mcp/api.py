@@ -18,18 +18,12 @@ from .filesystem import (
     FileSystemError,
     InvalidPathError,
 )
-from .mcp_server import MIME_TYPES
+from .mcp_server import get_mime_type
 from .metrics import get_metrics
 
 logger = logging.getLogger(__name__)
 
 
-def _get_mime_type(path: str) -> str:
-    """Get mime type for a file path based on extension."""
-    suffix = PurePosixPath(path).suffix.lower()
-    return MIME_TYPES.get(suffix, "text/plain")
-
-
 class ContentItem(BaseModel):
     """Content item model."""
 
@@ -187,7 +181,7 @@ def create_api(filesystem: FileSystem, lifespan=None, search_engine=None) -> Fas
                         ContentItem(
                             path=file_path,
                             is_directory=False,
-                            mime_type=_get_mime_type(file_path),
+                            mime_type=get_mime_type(file_path),
                             updated_at=_get_updated_at(file_path),
                         )
                     )
@@ -201,7 +195,7 @@ def create_api(filesystem: FileSystem, lifespan=None, search_engine=None) -> Fas
                         ContentItem(
                             path=item_path,
                             is_directory=is_dir,
-                            mime_type=_get_mime_type(item_path) if not is_dir else None,
+                            mime_type=get_mime_type(item_path) if not is_dir else None,
                             updated_at=_get_updated_at(item_path) if not is_dir else None,
                         )
                     )
@@ -224,7 +218,7 @@ def create_api(filesystem: FileSystem, lifespan=None, search_engine=None) -> Fas
                 path=path,
                 is_directory=False,
                 content=content,
-                mime_type=_get_mime_type(path),
+                mime_type=get_mime_type(path),
                 updated_at=_get_updated_at(path),
             )
         except FileNotFoundError:
@@ -360,9 +354,13 @@ def create_api(filesystem: FileSystem, lifespan=None, search_engine=None) -> Fas
             }
 
         @app.post("/api/search/reindex")
-        async def reindex():
-            """Trigger a full reindex (non-blocking)."""
-            asyncio.create_task(search_engine.reindex())
+        async def reindex(full: bool = False):
+            """Trigger a reindex (non-blocking).
+
+            Args:
+                full: Re-embed every file instead of only changed ones.
+            """
+            asyncio.create_task(search_engine.reindex(full=full))
             return {
                 "message": "Reindex started",
                 "status": "in_progress",
@@ -23,6 +23,17 @@ def _parse_content_paths(raw: str | None) -> list[str] | None:
     return patterns if patterns else None
 
 
+class _EnvVar:
+    """Class attribute that reads an environment variable on each access."""
+
+    def __init__(self, name: str, default: str) -> None:
+        self.name = name
+        self.default = default
+
+    def __get__(self, instance, owner=None) -> str:
+        return os.getenv(self.name, self.default)
+
+
 class Config:
     """Server configuration."""
 
@@ -43,7 +54,7 @@ class Config:
     )
 
     # MCP settings
-    SERVER_NAME: str = os.getenv("STASH_SERVER_NAME", "stash-mcp")
+    SERVER_NAME: str = _EnvVar("STASH_SERVER_NAME", "stash-mcp")
     READ_ONLY: bool = os.getenv("STASH_READ_ONLY", "false").lower() == "true"
     SERVER_VERSION: str = "0.1.0"
 
@@ -63,6 +74,7 @@ class Config:
     )
     SEARCH_CHUNK_SIZE: int = int(os.getenv("STASH_SEARCH_CHUNK_SIZE", "1000"))
     SEARCH_CHUNK_OVERLAP: int = int(os.getenv("STASH_SEARCH_CHUNK_OVERLAP", "100"))
+    SEARCH_QUANTIZE: bool = os.getenv("STASH_SEARCH_QUANTIZE", "false").lower() == "true"
 
     # Model cache directory (for HuggingFace/sentence-transformers weights)
     MODEL_CACHE_DIR: Path = Path(
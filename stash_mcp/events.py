@@ -20,6 +20,11 @@ def add_listener(callback: Callable) -> None:
     _listeners.append(callback)
 
 
+def remove_listener(callback: Callable) -> None:
+    """Unregister a listener previously passed to :func:`add_listener`."""
+    _listeners.remove(callback)
+
+
 def emit(event_type: str, path: str, **kwargs: str) -> None:
     """Emit a content change event to all registered listeners."""
     for listener in _listeners:
@@ -1,5 +1,6 @@
 """Filesystem layer for content management."""
 
+import functools
 import logging
 import re
 from pathlib import Path
@@ -67,10 +68,12 @@ class FileSystem:
         return full_path
 
     @staticmethod
+    @functools.cache
     def _glob_to_regex(pattern: str) -> re.Pattern[str]:
         """Convert a glob pattern to a regex.
 
-        Handles *, ?, and ** (zero or more path segments).
+        Handles *, ?, and ** (zero or more path segments). Results are cached
+        so every FileSystem sharing a pattern reuses the compiled regex.
         """
         i = 0
         n = len(pattern)
@@ -191,28 +194,18 @@ class FileSystem:
                 return [relative_path]
             return []
 
-        if self.include_patterns:
-            seen: set[str] = set()
-            for pattern in self.include_patterns:
-                for item in self.content_dir.glob(pattern):
-                    if not item.is_file():
-                        continue
-                    if any(part.startswith(".") for part in item.relative_to(self.content_dir).parts):
-                        continue
-                    rel = str(item.relative_to(self.content_dir))
-                    # Filter by relative_path prefix
-                    if relative_path:
-                        prefix = relative_path.rstrip("/") + "/"
-                        if not rel.startswith(prefix) and rel != relative_path:
-                            continue
-                    seen.add(rel)
-            return sorted(seen)
-
+        # Walk the requested subtree once and filter each file against the
+        # include patterns, rather than globbing the whole tree per pattern.
         files = []
         for item in full_path.rglob("*"):
-            if item.is_file() and not any(part.startswith(".") for part in item.parts):
-                rel_path = item.relative_to(self.content_dir)
-                files.append(str(rel_path))
+            if not item.is_file():
+                continue
+            rel_path = item.relative_to(self.content_dir)
+            if any(part.startswith(".") for part in rel_path.parts):
+                continue
+            rel = rel_path.as_posix()
+            if self._matches_patterns(rel):
+                files.append(rel)
 
         return sorted(files)
 
@@ -265,6 +258,35 @@ class FileSystem:
             logger.error(f"Error writing file '{relative_path}': {e}")
             raise FileSystemError(f"Failed to write file: {e}")
 
+    def write_files(self, files: dict[str, str]) -> None:
+        """Write several files in one call.
+
+        All paths are validated before anything is written, and each distinct
+        parent directory is created only once.
+
+        Args:
+            files: Mapping of path relative to content_dir -> content
+
+        Raises:
+            InvalidPathError: If any path is invalid
+        """
+        resolved = sorted(
+            (self._resolve_path(relative_path), relative_path, content)
+            for relative_path, content in files.items()
+        )
+
+        created_parents: set[Path] = set()
+        for full_path, relative_path, content in resolved:
+            if full_path.parent not in created_parents:
+                full_path.parent.mkdir(parents=True, exist_ok=True)
+                created_parents.add(full_path.parent)
+            try:
+                full_path.write_text(content, encoding="utf-8")
+            except Exception as e:
+                logger.error(f"Error writing file '{relative_path}': {e}")
+                raise FileSystemError(f"Failed to write file: {e}")
+        logger.info(f"Wrote {len(resolved)} files")
+
     def delete_file(self, relative_path: str) -> None:
         """Delete a file.
 
@@ -128,6 +128,7 @@ def _create_search_engine():
             anthropic_api_key=os.getenv("ANTHROPIC_API_KEY"),
             chunk_size=Config.SEARCH_CHUNK_SIZE,
             chunk_overlap=Config.SEARCH_CHUNK_OVERLAP,
+            quantize=Config.SEARCH_QUANTIZE,
         )
         logger.info(
             f"Search engine initialised (model={Config.SEARCH_EMBEDDER_MODEL}, "
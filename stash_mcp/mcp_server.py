@@ -98,10 +98,15 @@ def _is_resource_file(path: str) -> bool:
     return PurePosixPath(normalized).name == RESOURCE_FILENAME
 
 
-def _get_mime_type(path: str) -> str:
+def get_mime_type(path: str) -> str:
     """Get mime type for a file path based on extension."""
-    suffix = PurePosixPath(path).suffix.lower()
-    return MIME_TYPES.get(suffix, "text/plain")
+    # Same suffix rules as PurePosixPath(path).suffix (a leading or trailing
+    # dot is not an extension) without building a path object per call.
+    name = path.rstrip("/").rpartition("/")[2]
+    dot = name.rfind(".")
+    if dot <= 0 or dot == len(name) - 1:
+        return "text/plain"
+    return MIME_TYPES.get(name[dot:].lower(), "text/plain")
 
 
 def _get_description(fs: FileSystem, path: str) -> str:
@@ -129,41 +134,41 @@ def _apply_edits(content: str, edits: list[EditOperation], path: str) -> str:
     for edit in edits:
         if not edit.old_string:
             raise ValueError(f"old_string must not be empty (file: {path})")
-        if edit.old_string not in content:
+        # replace_all only needs to know the string is present; a single edit
+        # needs the full count, which also covers the not-found case.
+        if edit.replace_all:
+            count = 1 if edit.old_string in content else 0
+        else:
+            count = content.count(edit.old_string)
+        if count == 0:
             raise ValueError(
                 f"old_string not found in '{path}'. The file content may have changed."
             )
-        if not edit.replace_all and content.count(edit.old_string) > 1:
+        if count > 1:
             raise ValueError(
-                f"old_string appears {content.count(edit.old_string)} times in '{path}'. "
+                f"old_string appears {count} times in '{path}'. "
                 "Set replace_all=True or provide a more specific old_string."
             )
-        if edit.replace_all:
-            content = content.replace(edit.old_string, edit.new_string)
-        else:
-            content = content.replace(edit.old_string, edit.new_string, 1)
+        content = content.replace(
+            edit.old_string, edit.new_string, -1 if edit.replace_all else 1
+        )
     return content
 
 
 _HEADING_RE = re.compile(r"^(#{1,6})\s+(.+)$")
-_FENCE_RE = re.compile(r"^```")
 
 
 def _build_heading_tree(flat: list[dict]) -> list[dict]:
     """Convert a flat list of headings into a nested tree."""
     root: list[dict] = []
-    stack: list[dict] = []
+    # (level, children list) pairs; the level-0 sentinel is never popped.
+    stack: list[tuple[int, list[dict]]] = [(0, root)]
 
     for heading in flat:
-        while stack and stack[-1]["level"] >= heading["level"]:
+        while stack[-1][0] >= heading["level"]:
             stack.pop()
-
-        if stack:
-            stack[-1]["children"].append(heading)
-        else:
-            root.append(heading)
-
-        stack.append(heading)
+        stack[-1][1].append(heading)
+        stack.append((heading["level"], heading["children"]))
 
     return root
 
@@ -174,15 +179,19 @@ def parse_markdown_structure(content: str) -> list[dict]:
     flat_headings: list[dict] = []
 
     for line_num, line in enumerate(content.splitlines(), start=1):
-        if _FENCE_RE.match(line.strip()):
+        line = line.strip()
+        # Most lines are prose; skip them without touching the regex.
+        if not line.startswith(("#", "```")):
+            continue
+        if line.startswith("```"):
             in_code_block = not in_code_block
             continue
         if in_code_block:
             continue
-        match = _HEADING_RE.match(line.strip())
+        match = _HEADING_RE.match(line)
         if match:
             level = len(match.group(1))
-            text = match.group(2).strip()
+            text = match.group(2)
             flat_headings.append({
                 "heading": text,
                 "level": level,
@@ -259,7 +268,7 @@ def create_mcp_server(filesystem: FileSystem, search_engine=None, git_backend=No
         if not _is_resource_file(file_path):
             continue
         uri = f"stash://{file_path}"
-        mime = _get_mime_type(file_path)
+        mime = get_mime_type(file_path)
         desc = _get_description(filesystem, file_path)
         fp = file_path  # capture for closure
 
@@ -285,7 +294,7 @@ def create_mcp_server(filesystem: FileSystem, search_engine=None, git_backend=No
         mcp.add_resource(FunctionResource(
             uri=AnyUrl(uri), name=path,
             description=_get_description(filesystem, path),
-            mime_type=_get_mime_type(path),
+            mime_type=get_mime_type(path),
             fn=lambda _fp=path: filesystem.read_file(_fp),
         ))
         return True
@@ -474,8 +483,9 @@ def create_mcp_server(filesystem: FileSystem, search_engine=None, git_backend=No
             if len(paths) != len(set(paths)):
                 raise ValueError("Duplicate file_path entries are not allowed in a single edit_content_batch call.")
 
-            # Phase 1: read all files and validate SHAs
-            originals: dict[str, str] = {}
+            # Phase 1: read, validate and apply edits in memory.  Any failure
+            # aborts here, before a single file has been written.
+            staged: dict[str, str] = {}
             for op in edit_operations:
                 current = filesystem.read_file(op.file_path)
                 current_sha = hashlib.sha256(current.encode("utf-8")).hexdigest()
@@ -484,24 +494,19 @@ def create_mcp_server(filesystem: FileSystem, search_engine=None, git_backend=No
                         f"SHA mismatch for '{op.file_path}': expected {current_sha}, got {op.sha}. "
                         "The file may have changed since it was last read."
                     )
-                originals[op.file_path] = current
-
-            # Phase 2: apply all edits in memory
-            new_contents: dict[str, str] = {}
-            for op in edit_operations:
-                new_contents[op.file_path] = _apply_edits(originals[op.file_path], op.edits, op.file_path)
+                staged[op.file_path] = _apply_edits(current, op.edits, op.file_path)
 
-            # Phase 3: write all files and send notifications
+            # Phase 2: write all files together, then notify
+            filesystem.write_files(staged)
             results = []
-            for op in edit_operations:
-                filesystem.write_file(op.file_path, new_contents[op.file_path])
-                if _is_resource_file(op.file_path):
-                    uri = AnyUrl(f"stash://{op.file_path}")
+            for path, new_content in staged.items():
+                if _is_resource_file(path):
+                    uri = AnyUrl(f"stash://{path}")
                     await ctx.session.send_resource_updated(uri=uri)
-                emit(CONTENT_UPDATED, op.file_path)
-                logger.info(f"Edited: {op.file_path}")
-                new_sha = hashlib.sha256(new_contents[op.file_path].encode("utf-8")).hexdigest()
-                results.append({"path": op.file_path, "result": "ok", "new_sha": new_sha})
+                emit(CONTENT_UPDATED, path)
+                logger.info(f"Edited: {path}")
+                new_sha = hashlib.sha256(new_content.encode("utf-8")).hexdigest()
+                results.append({"path": path, "result": "ok", "new_sha": new_sha})
 
             return {"results": results}
 
@@ -611,27 +616,29 @@ def create_mcp_server(filesystem: FileSystem, search_engine=None, git_backend=No
         if max_lines is not None and max_lines < 1:
             raise ValueError("max_lines must be a positive integer.")
 
-        results = []
-        for path in paths:
+        async def _read_one(path: str) -> dict:
             try:
                 content = await asyncio.to_thread(filesystem.read_file, path)
-                sha = hashlib.sha256(content.encode("utf-8")).hexdigest()
-                truncated = False
-                if max_lines is not None:
-                    lines = content.splitlines(keepends=True)
-                    if len(lines) > max_lines:
-                        content = "".join(lines[:max_lines])
-                        truncated = True
-                results.append({
-                    "path": path, "content": content, "sha": sha,
-                    "truncated": truncated, "error": None,
-                })
             except (FileNotFoundError, InvalidPathError) as exc:
-                results.append({
+                return {
                     "path": path, "content": None, "sha": None,
                     "truncated": False, "error": str(exc),
-                })
-        return {"results": results}
+                }
+            sha = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            truncated = False
+            if max_lines is not None:
+                lines = content.splitlines(keepends=True)
+                if len(lines) > max_lines:
+                    content = "".join(lines[:max_lines])
+                    truncated = True
+            return {
+                "path": path, "content": content, "sha": sha,
+                "truncated": truncated, "error": None,
+            }
+
+        # Reads are independent, so overlap them; gather preserves input order.
+        results = await asyncio.gather(*(_read_one(path) for path in paths))
+        return {"results": list(results)}
 
     @mcp.tool(
         annotations=ToolAnnotations(
@@ -732,8 +739,7 @@ def create_mcp_server(filesystem: FileSystem, search_engine=None, git_backend=No
         if len(paths) != len(set(paths)):
             raise ValueError("Duplicate paths are not allowed in a single batch call.")
 
-        results = []
-        for path in paths:
+        def _inspect_one(path: str) -> dict:
             try:
                 suffix = PurePosixPath(path).suffix.lower()
                 if suffix not in (".md", ".markdown"):
@@ -748,20 +754,25 @@ def create_mcp_server(filesystem: FileSystem, search_engine=None, git_backend=No
                     if s["level"] == 1:
                         title = s["heading"]
                         break
-                results.append({
+                return {
                     "path": path,
                     "title": title,
                     "sections": sections,
                     "error": None,
-                })
+                }
             except (FileNotFoundError, InvalidPathError, ValueError) as exc:
-                results.append({
+                return {
                     "path": path,
                     "title": None,
                     "sections": None,
                     "error": str(exc),
-                })
-        return {"results": results}
+                }
+
+        # Read and parse each file off the event loop; gather preserves order.
+        results = await asyncio.gather(
+            *(asyncio.to_thread(_inspect_one, path) for path in paths)
+        )
+        return {"results": list(results)}
 
     if not Config.READ_ONLY:
 
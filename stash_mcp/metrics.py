@@ -4,45 +4,135 @@ Metrics are stored in a local CSV file — nothing is sent externally.
 Collection is opt-out via the STASH_METRICS_ENABLED environment variable.
 """
 
+import functools
 import logging
+import os
+import threading
 from datetime import UTC, datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+# db_path value that selects TinyFlux's in-memory storage instead of a CSV file
+MEMORY_DB_PATH = ":memory:"
+
+# Tag values shared by every point instead of being rebuilt per call
+_TRUE = "true"
+_FALSE = "false"
+
 # Module-level singleton, initialised by init_metrics()
 _collector: "MetricsCollector | None" = None
 
 
+@functools.lru_cache(maxsize=64)
+def _status_class(status_code: int) -> str:
+    """Return the ``"2xx"``-style class tag for an HTTP status code."""
+    return f"{status_code // 100}xx"
+
+
+@functools.lru_cache(maxsize=512)
+def _file_extension(path: str) -> str:
+    """Return the lower-cased extension tag for *path*, or ``"none"``."""
+    return os.path.splitext(path)[1].lower() or "none"
+
+
 class MetricsCollector:
-    """Local usage metrics backed by TinyFlux."""
+    """Local usage metrics backed by TinyFlux.
+
+    ``record_*`` calls only append to an in-memory buffer.  A background
+    writer thread drains it with a single ``insert_multiple`` every
+    ``flush_interval`` seconds, or as soon as ``max_batch`` points are waiting.
+    If the writer falls behind and ``max_buffer`` points are pending, new
+    points are dropped and counted in :attr:`dropped`.  Call :meth:`flush` to
+    write the buffer synchronously; :meth:`close` stops the writer and flushes.
+
+    A *db_path* of ``":memory:"`` keeps the database in memory instead of a
+    CSV file, which is useful for tests.
+    """
+
+    __slots__ = (
+        "enabled",
+        "dropped",
+        "_db",
+        "_max_batch",
+        "_flush_interval",
+        "_max_buffer",
+        "_buffer",
+        "_lock",
+        "_write_lock",
+        "_wake",
+        "_stop",
+        "_writer",
+        "_closed",
+    )
 
-    def __init__(self, db_path: str, enabled: bool = True, retention_days: int = 90) -> None:
+    def __init__(
+        self,
+        db_path: str,
+        enabled: bool = True,
+        retention_days: int = 90,
+        max_batch: int = 500,
+        flush_interval: float = 1.0,
+        max_buffer: int = 10_000,
+    ) -> None:
         self.enabled = enabled
+        self.dropped = 0
         self._db = None
+        self._max_batch = max_batch
+        self._flush_interval = flush_interval
+        self._max_buffer = max_buffer
+        self._buffer: list = []
+        self._lock = threading.Lock()  # guards _buffer
+        self._write_lock = threading.Lock()  # serialises access to _db
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._writer: threading.Thread | None = None
+        self._closed = False
         if enabled:
             try:
                 from tinyflux import TinyFlux
 
-                self._db = TinyFlux(db_path)
+                if db_path == MEMORY_DB_PATH:
+                    from tinyflux.storages import MemoryStorage
+
+                    self._db = TinyFlux(storage=MemoryStorage)
+                else:
+                    self._db = TinyFlux(db_path)
                 logger.info("Metrics collector initialised (path=%s)", db_path)
                 if retention_days > 0:
                     self._prune(retention_days)
             except Exception as exc:
                 logger.warning("Failed to initialise metrics DB: %s", exc)
                 self._db = None
+        if self._db is not None:
+            self._writer = threading.Thread(
+                target=self._drain_loop, name="metrics-writer", daemon=True
+            )
+            self._writer.start()
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
 
     def _insert(self, point) -> None:
-        """Insert a Point, silently swallowing errors to never impact callers."""
+        """Buffer a Point for the writer thread; never blocks on disk I/O."""
         if self._db is None:
             return
-        try:
-            self._db.insert(point)
-        except Exception as exc:
-            logger.debug("Metrics insert error: %s", exc)
+        with self._lock:
+            if len(self._buffer) >= self._max_buffer:
+                self.dropped += 1
+                logger.debug("Metrics buffer full; dropped %d points", self.dropped)
+                return
+            self._buffer.append(point)
+            batch_ready = len(self._buffer) >= self._max_batch
+        if batch_ready:
+            self._wake.set()
+
+    def _drain_loop(self) -> None:
+        """Writer thread: flush whenever woken or every ``flush_interval`` seconds."""
+        while not self._stop.is_set():
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            self.flush()
 
     def _prune(self, retention_days: int) -> None:
         """Remove data points older than *retention_days*."""
@@ -71,14 +161,15 @@ class MetricsCollector:
         transport: str = "stdio",
     ) -> None:
         """Record a single MCP tool invocation."""
-        if not self.enabled or self._db is None:
+        # _db is only ever set when enabled, so this one check covers both.
+        if self._db is None:
             return
         try:
             from tinyflux import Point
 
             tags = {
                 "tool": tool_name,
-                "success": str(success).lower(),
+                "success": _TRUE if success else _FALSE,
                 "transport": transport,
             }
             if error_type:
@@ -102,12 +193,11 @@ class MetricsCollector:
         duration_ms: float,
     ) -> None:
         """Record an HTTP API request (HTTP mode only)."""
-        if not self.enabled or self._db is None:
+        if self._db is None:
             return
         try:
             from tinyflux import Point
 
-            status_class = f"{status_code // 100}xx"
             self._insert(
                 Point(
                     time=datetime.now(UTC),
@@ -115,7 +205,7 @@ class MetricsCollector:
                     tags={
                         "method": method,
                         "endpoint": endpoint,
-                        "status_class": status_class,
+                        "status_class": _status_class(status_code),
                     },
                     fields={"duration_ms": duration_ms, "status_code": float(status_code)},
                 )
@@ -130,19 +220,16 @@ class MetricsCollector:
         size_bytes: int = 0,
     ) -> None:
         """Record content lifecycle events (create, update, delete, move)."""
-        if not self.enabled or self._db is None:
+        if self._db is None:
             return
         try:
-            import os
-
             from tinyflux import Point
 
-            ext = os.path.splitext(path)[1].lower() or "none"
             self._insert(
                 Point(
                     time=datetime.now(UTC),
                     measurement="content_event",
-                    tags={"event": event, "file_extension": ext},
+                    tags={"event": event, "file_extension": _file_extension(path)},
                     fields={"size_bytes": float(size_bytes)},
                 )
             )
@@ -157,7 +244,7 @@ class MetricsCollector:
         duration_ms: float,
     ) -> None:
         """Record semantic search queries and performance."""
-        if not self.enabled or self._db is None:
+        if self._db is None:
             return
         try:
             import hashlib
@@ -181,7 +268,7 @@ class MetricsCollector:
 
     def record_server_event(self, event: str, **fields) -> None:
         """Record server lifecycle events (startup, shutdown, errors)."""
-        if not self.enabled or self._db is None:
+        if self._db is None:
             return
         try:
             from tinyflux import Point
@@ -200,20 +287,50 @@ class MetricsCollector:
         except Exception as exc:
             logger.debug("Metrics record_server_event error: %s", exc)
 
-    def close(self) -> None:
-        """Flush and close the TinyFlux database."""
-        if self._db is not None:
+    def flush(self) -> None:
+        """Write any buffered points to the database now.
+
+        Errors are logged and swallowed so metrics never impact callers.
+        """
+        with self._write_lock:
+            with self._lock:
+                batch, self._buffer = self._buffer, []
+            if not batch or self._db is None:
+                return
             try:
-                self._db.close()
+                self._db.insert_multiple(batch)
             except Exception as exc:
-                logger.debug("Metrics close error: %s", exc)
-            finally:
-                self._db = None
+                logger.debug("Metrics insert error: %s", exc)
+
+    def close(self) -> None:
+        """Stop the writer thread, flush, and close the TinyFlux database.
+
+        Safe to call more than once; later calls return immediately.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._stop.set()
+        self._wake.set()
+        if self._writer is not None:
+            self._writer.join()
+            self._writer = None
+        self.flush()
+        with self._write_lock:
+            if self._db is not None:
+                try:
+                    self._db.close()
+                except Exception as exc:
+                    logger.debug("Metrics close error: %s", exc)
+                finally:
+                    self._db = None
 
 
 def init_metrics(db_path: str, enabled: bool = True, retention_days: int = 90) -> MetricsCollector:
     """Initialise the module-level metrics singleton and return it."""
     global _collector
+    if _collector is not None:
+        _collector.close()
     _collector = MetricsCollector(db_path=db_path, enabled=enabled, retention_days=retention_days)
     return _collector
 
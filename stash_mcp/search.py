@@ -1,14 +1,16 @@
 """Semantic search with vector index for Stash-MCP.
 
-Provides VectorStore (numpy-based cosine similarity search with pickle persistence)
+Provides VectorStore (numpy-based cosine similarity search with memory-mapped persistence)
 and SearchEngine (chunking → optional contextual enrichment → embedding → storage → query).
 """
 
 import asyncio
+import functools
 import hashlib
+import importlib
 import json
 import logging
-import pickle
+import os
 import re
 from dataclasses import asdict, dataclass, field
 from pathlib import Path
@@ -18,6 +20,14 @@ logger = logging.getLogger(__name__)
 # Maximum characters to pass to contextual retrieval model (~200k tokens ≈ 150k chars)
 MAX_CONTEXTUAL_DOCUMENT_CHARS = 150_000
 
+# Maximum texts per embedder request; providers cap inputs per call (OpenAI: 2048)
+MAX_EMBED_BATCH_SIZE = 256
+
+# Boundaries used by the markdown-aware _chunk_text
+_HEADING_RE = re.compile(r"(?=^#{1,6}\s)", re.MULTILINE)
+_PARAGRAPH_RE = re.compile(r"\n\s*\n")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
 
 def _normalize_path(path: str) -> str:
     """Normalize a file path for consistent matching.
@@ -60,49 +70,158 @@ class SearchResult:
     commit_message: str | None = None
 
 
+@functools.cache
+def _optional_module(name: str):
+    """Return an optional accelerator module (e.g. ``simsimd``, ``orjson``), or None."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def _json_dumps(data, *, indent: bool = False) -> bytes:
+    """Serialize *data* to JSON bytes, using orjson when it is installed."""
+    orjson = _optional_module("orjson")
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(data, indent=2 if indent else None).encode("utf-8")
+
+
+def _json_loads(raw: bytes):
+    """Parse JSON bytes, using orjson when it is installed."""
+    orjson = _optional_module("orjson")
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _row_norms(vectors):
+    """Return the L2 norm of each row, clamped away from zero."""
+    import numpy as np
+
+    return np.maximum(np.linalg.norm(vectors, axis=1), 1e-10)
+
+
 class VectorStore:
     """Lightweight embedded vector database using numpy.
 
     Stores pre-computed embedding vectors and metadata, performs cosine
-    similarity search, and persists to disk via pickle.
+    similarity search, and persists to disk as a ``.npy`` matrix with a
+    JSON metadata sidecar. The matrix is memory-mapped on load so startup
+    cost does not grow with the size of the index.
     """
 
     def __init__(self, store_path: Path):
         """Load existing store from disk, or start empty.
 
         Args:
-            store_path: Path to the pickle file for persistence.
+            store_path: Path to the ``.npy`` file holding the vector matrix.
+                Metadata is stored alongside it with a ``.json`` suffix.
         """
         self.store_path = store_path
+        self.metadata_path = store_path.with_suffix(".json")
         self._vectors = None  # np.ndarray | None, shape: (n, dim)
+        self._norms = None  # np.ndarray | None, shape: (n,)
         self._metadata: list[dict] = []
         self._load()
 
     def _load(self) -> None:
         """Load vectors and metadata from disk if available."""
+        legacy_path = self.store_path.with_suffix(".pkl")
         if self.store_path.exists():
             try:
-                with open(self.store_path, "rb") as f:
-                    data = pickle.load(f)  # noqa: S301
-                self._vectors = data.get("vectors")
-                self._metadata = data.get("metadata", [])
+                import numpy as np
+
+                vectors = np.load(self.store_path, mmap_mode="r")
+                metadata = _json_loads(self.metadata_path.read_bytes())
+                if len(vectors) != len(metadata):
+                    raise ValueError(
+                        f"{len(vectors)} vectors but {len(metadata)} metadata entries"
+                    )
+                self._vectors = vectors
+                self._metadata = metadata
                 count = len(self._metadata)
                 logger.info(f"Loaded {count} vectors from {self.store_path}")
             except Exception as e:
                 logger.warning(f"Failed to load vector store: {e}")
                 self._vectors = None
                 self._metadata = []
+        elif legacy_path.exists():
+            # Pickle is never loaded (it can execute arbitrary code); the
+            # SearchEngine sees an empty store and rebuilds the index.
+            logger.info(f"Ignoring legacy pickle index {legacy_path}")
+
+    def _row_norms(self):
+        """Return the row norms, computing them on first use after a change.
+
+        Only stores whose rows are not unit length (:class:`Int8VectorStore`)
+        need them, and computing them lazily keeps loading a memory-mapped
+        store from paging in the whole matrix.
+        """
+        if self._norms is None and self._vectors is not None:
+            self._norms = _row_norms(self._vectors)
+        return self._norms
 
     def save(self) -> None:
-        """Persist vectors and metadata to disk."""
+        """Persist vectors and metadata to disk.
+
+        Both files are written to a temporary name and renamed into place,
+        which leaves any existing memory map of the old matrix valid.
+        """
+        if self._vectors is None:
+            self.store_path.unlink(missing_ok=True)
+            self.metadata_path.unlink(missing_ok=True)
+            return
+
+        import numpy as np
+
         self.store_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.store_path, "wb") as f:
-            pickle.dump({"vectors": self._vectors, "metadata": self._metadata}, f)
+        tmp_vectors = self.store_path.with_name(self.store_path.name + ".tmp")
+        with open(tmp_vectors, "wb") as f:
+            np.save(f, self._vectors)
+        tmp_metadata = self.metadata_path.with_name(self.metadata_path.name + ".tmp")
+        tmp_metadata.write_bytes(_json_dumps(self._metadata))
+        os.replace(tmp_vectors, self.store_path)
+        os.replace(tmp_metadata, self.metadata_path)
 
     async def save_async(self) -> None:
         """Persist vectors and metadata to disk without blocking the event loop."""
         await asyncio.to_thread(self.save)
 
+    def _encode(self, vectors):
+        """Convert a float32 batch into the stored representation.
+
+        Rows are L2-normalized so that cosine similarity is a plain dot
+        product at query time. Zero rows stay zero.
+        """
+        import numpy as np
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    def _similarities(self, queries):
+        """Return the cosine similarity of every stored row to each unit query.
+
+        Uses SimSIMD's batched cosine kernel when it is installed, which
+        works on the stored dtype directly, and a numpy matrix product
+        otherwise.
+
+        Args:
+            queries: Unit-length query vectors, shape ``(m, dim)``.
+
+        Returns:
+            Similarity matrix of shape ``(m, n)``.
+        """
+        simsimd = _optional_module("simsimd")
+        if simsimd is None:
+            return queries @ self._vectors.T
+
+        import numpy as np
+
+        encoded = self._encode(queries)
+        distances = np.asarray(simsimd.cdist(encoded, self._vectors, metric="cosine"))
+        return 1.0 - distances
+
     def add(self, embeddings: list[list[float]], metadata: list[dict]) -> None:
         """Append vectors and metadata.
 
@@ -119,11 +238,12 @@ class VectorStore:
 
         import numpy as np
 
-        new_vectors = np.array(embeddings, dtype=np.float32)
+        new_vectors = self._encode(np.array(embeddings, dtype=np.float32))
         if self._vectors is None or len(self._vectors) == 0:
             self._vectors = new_vectors
         else:
-            self._vectors = np.vstack([self._vectors, new_vectors])
+            self._vectors = np.concatenate([self._vectors, new_vectors])
+        self._norms = None
         self._metadata.extend(metadata)
 
     def remove_by_file(self, file_path: str) -> int:
@@ -140,21 +260,29 @@ class VectorStore:
         if not self._metadata:
             return 0
 
+        import numpy as np
+
         normalized = _normalize_path(file_path)
-        keep_indices = [
-            i for i, m in enumerate(self._metadata)
-            if _normalize_path(m.get("file_path", "")) != normalized
-        ]
-        removed = len(self._metadata) - len(keep_indices)
+        keep = np.fromiter(
+            (
+                _normalize_path(m.get("file_path", "")) != normalized
+                for m in self._metadata
+            ),
+            dtype=bool,
+            count=len(self._metadata),
+        )
+        removed = len(self._metadata) - int(keep.sum())
 
         if removed == 0:
             return 0
 
-        if keep_indices:
-            self._vectors = self._vectors[keep_indices]
-            self._metadata = [self._metadata[i] for i in keep_indices]
+        if removed < len(self._metadata):
+            self._vectors = self._vectors[keep]
+            self._norms = None
+            self._metadata = [m for m, k in zip(self._metadata, keep) if k]
         else:
             self._vectors = None
+            self._norms = None
             self._metadata = []
 
         return removed
@@ -172,39 +300,57 @@ class VectorStore:
             List of metadata dicts with added 'score' field, sorted by
             descending similarity.
         """
-        if self._vectors is None or len(self._vectors) == 0:
-            return []
+        return self.search_batch([query_embedding], top_n=top_n)[0]
+
+    def search_batch(
+        self, query_embeddings: list[list[float]], top_n: int = 10
+    ) -> list[list[dict]]:
+        """Cosine similarity search for several queries with one matrix product.
+
+        Args:
+            query_embeddings: The query embedding vectors.
+            top_n: Maximum number of results to return per query.
+
+        Returns:
+            One result list per query, each as returned by :meth:`search`.
+            Zero-length queries get an empty list.
+        """
+        results: list[list[dict]] = [[] for _ in query_embeddings]
+        if self._vectors is None or len(self._vectors) == 0 or not query_embeddings:
+            return results
 
         import numpy as np
 
-        query = np.array(query_embedding, dtype=np.float32)
-        query_norm = np.linalg.norm(query)
-        if query_norm == 0:
-            return []
-        query = query / query_norm
-
-        norms = np.linalg.norm(self._vectors, axis=1, keepdims=True)
-        norms = np.maximum(norms, 1e-10)
-        normed = self._vectors / norms
-
-        similarities = normed @ query
-        top_k = min(top_n, len(similarities))
-        top_indices = np.argsort(similarities)[-top_k:][::-1]
-
-        results = []
-        for idx in top_indices:
-            score = float(similarities[idx])
-            if score <= 0:
-                continue
-            result = dict(self._metadata[idx])
-            result["score"] = score
-            results.append(result)
+        queries = np.array(query_embeddings, dtype=np.float32)
+        query_norms = np.linalg.norm(queries, axis=1)
+        valid = np.flatnonzero(query_norms > 0)
+        if len(valid) == 0:
+            return results
+        queries = queries[valid] / query_norms[valid, None]
+
+        similarities = self._similarities(queries)
+        top_k = min(top_n, similarities.shape[1])
+        if top_k <= 0:
+            return results
+
+        for row, query_index in zip(similarities, valid):
+            # Select the top k in O(n), then sort only those k
+            top_indices = np.argpartition(-row, top_k - 1)[:top_k]
+            top_indices = top_indices[np.argsort(-row[top_indices])]
+            for idx in top_indices:
+                score = float(row[idx])
+                if score <= 0:
+                    continue
+                result = dict(self._metadata[idx])
+                result["score"] = score
+                results[query_index].append(result)
 
         return results
 
     def clear(self) -> None:
         """Remove all vectors and metadata."""
         self._vectors = None
+        self._norms = None
         self._metadata = []
         self.save()
 
@@ -214,6 +360,30 @@ class VectorStore:
         return len(self._metadata)
 
 
+class Int8VectorStore(VectorStore):
+    """VectorStore variant that keeps vectors as int8.
+
+    Each row is quantized symmetrically against its own absolute maximum,
+    which cuts memory and on-disk size by 4x. Cosine similarity does not
+    depend on a row's scale, so no per-row scale factor needs to be kept;
+    the numpy search path divides by the int8 rows' norms instead.
+    """
+
+    def _similarities(self, queries):
+        """Cosine similarity against the (not unit-length) int8 rows."""
+        if _optional_module("simsimd") is not None:
+            return super()._similarities(queries)
+        return (queries @ self._vectors.T) / self._row_norms()
+
+    def _encode(self, vectors):
+        """Quantize each row to int8 with a per-row absmax scale."""
+        import numpy as np
+
+        absmax = np.abs(vectors).max(axis=1, keepdims=True)
+        scale = np.where(absmax > 0, absmax / 127.0, 1.0)
+        return np.clip(np.rint(vectors / scale), -127, 127).astype(np.int8)
+
+
 def _chunk_text_sliding_window(
     text: str,
     chunk_size: int = 1000,
@@ -275,8 +445,7 @@ def _chunk_text(text: str, max_chunk_size: int = 1500) -> list[str]:
         return [text.strip()]
 
     # Split on markdown headings (keep heading with section)
-    heading_pattern = re.compile(r"(?=^#{1,6}\s)", re.MULTILINE)
-    sections = heading_pattern.split(text)
+    sections = _HEADING_RE.split(text)
     sections = [s for s in sections if s.strip()]
 
     chunks: list[str] = []
@@ -285,7 +454,7 @@ def _chunk_text(text: str, max_chunk_size: int = 1500) -> list[str]:
             chunks.append(section.strip())
         else:
             # Split on paragraph boundaries
-            paragraphs = re.split(r"\n\s*\n", section)
+            paragraphs = _PARAGRAPH_RE.split(section)
             current = ""
             for para in paragraphs:
                 para = para.strip()
@@ -300,7 +469,7 @@ def _chunk_text(text: str, max_chunk_size: int = 1500) -> list[str]:
                         current = para
                     else:
                         # Last resort: split on sentences
-                        sentences = re.split(r"(?<=[.!?])\s+", para)
+                        sentences = _SENTENCE_RE.split(para)
                         current = ""
                         for sent in sentences:
                             if len(current) + len(sent) + 1 <= max_chunk_size:
@@ -331,16 +500,16 @@ class IndexMeta:
     def save(self, path: Path) -> None:
         """Persist to JSON file."""
         path.parent.mkdir(parents=True, exist_ok=True)
-        with open(path, "w") as f:
-            json.dump(
+        path.write_bytes(
+            _json_dumps(
                 {
                     "file_hashes": self.file_hashes,
                     "chunk_counts": self.chunk_counts,
                     "embedder_model": self.embedder_model,
                 },
-                f,
-                indent=2,
+                indent=True,
             )
+        )
 
     async def save_async(self, path: Path) -> None:
         """Persist to JSON file without blocking the event loop."""
@@ -352,8 +521,7 @@ class IndexMeta:
         if not path.exists():
             return cls()
         try:
-            with open(path) as f:
-                data = json.load(f)
+            data = _json_loads(path.read_bytes())
             return cls(
                 file_hashes=data.get("file_hashes", {}),
                 chunk_counts=data.get("chunk_counts", {}),
@@ -384,6 +552,7 @@ class SearchEngine:
         git_backend=None,
         chunk_size: int = 1000,
         chunk_overlap: int = 100,
+        quantize: bool = False,
     ):
         """Initialize the search engine.
 
@@ -400,6 +569,8 @@ class SearchEngine:
             git_backend: Optional GitBackend instance for blame-enriched results.
             chunk_size: Number of characters per chunk for the sliding window.
             chunk_overlap: Number of characters to overlap between adjacent chunks.
+            quantize: Store vectors as int8 (:class:`Int8VectorStore`) instead
+                      of float32.
         """
         self.content_dir = content_dir
         self.index_dir = index_dir
@@ -426,9 +597,20 @@ class SearchEngine:
                 )
 
         self.index_dir.mkdir(parents=True, exist_ok=True)
-        self.store = VectorStore(index_dir / "vectors.pkl")
+        if quantize:
+            self.store = Int8VectorStore(index_dir / "vectors.int8.npy")
+        else:
+            self.store = VectorStore(index_dir / "vectors.npy")
         self.meta = IndexMeta.load(index_dir / "index_meta.json")
 
+        # Hashes without matching vectors (e.g. after switching store format)
+        # would make build_index skip every file, so start from scratch.
+        if sum(self.meta.chunk_counts.values()) != self.store.count:
+            logger.warning("Vector store does not match index meta. Rebuilding index.")
+            self.store.clear()
+            self.meta = IndexMeta()
+            self.meta.save(self.index_dir / "index_meta.json")
+
         # If embedder model changed, clear stale index for rebuild
         if self.meta.embedder_model and self.meta.embedder_model != embedder_model:
             logger.warning(
@@ -470,17 +652,23 @@ class SearchEngine:
     async def _embed(self, texts: list[str]) -> list[list[float]]:
         """Embed a list of document texts using the configured embedder.
 
+        Texts are sent in requests of at most :data:`MAX_EMBED_BATCH_SIZE`.
+
         Args:
             texts: Texts to embed.
 
         Returns:
             List of embedding vectors.
         """
-        if self._embed_fn is not None:
-            return await self._embed_fn(texts)
-
-        result = await self._embedder.embed_documents(texts)
-        return result.embeddings
+        embeddings: list[list[float]] = []
+        for start in range(0, len(texts), MAX_EMBED_BATCH_SIZE):
+            batch = texts[start:start + MAX_EMBED_BATCH_SIZE]
+            if self._embed_fn is not None:
+                embeddings.extend(await self._embed_fn(batch))
+            else:
+                result = await self._embedder.embed_documents(batch)
+                embeddings.extend(result.embeddings)
+        return embeddings
 
     async def _embed_query(self, text: str) -> list[float]:
         """Embed a single query text using the configured embedder.
@@ -501,6 +689,23 @@ class SearchEngine:
         result = await self._embedder.embed_query(text)
         return result.embeddings[0]
 
+    async def _embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """Embed several query texts.
+
+        A custom embed_fn receives all texts in one call; the configured
+        embedder embeds them concurrently through its query path.
+
+        Args:
+            texts: Query texts to embed.
+
+        Returns:
+            One embedding vector per text.
+        """
+        if self._embed_fn is not None:
+            return await self._embed_fn(texts)
+
+        return list(await asyncio.gather(*(self._embed_query(t) for t in texts)))
+
     async def _contextualise_chunk(
         self, chunk: str, full_document: str
     ) -> str | None:
@@ -547,8 +752,9 @@ class SearchEngine:
         """Build or rebuild the index for the given files.
 
         Only re-embeds files whose content has changed (hash-detected).
-        Yields to the event loop between files and batches persistence
-        every 10 files to avoid blocking.
+        Changed files are collected into batches of 10 whose chunks are
+        embedded together (see :meth:`_embed`), and each batch is persisted once.
+        Yields to the event loop between files to avoid blocking.
 
         Args:
             file_paths: List of relative file paths to index.
@@ -558,8 +764,8 @@ class SearchEngine:
         """
         self._indexing = True
         total_chunks = 0
-        files_since_save = 0
-        _SAVE_BATCH_SIZE = 10
+        pending: list[tuple[str, str, list[str], list[dict]]] = []
+        _BATCH_SIZE = 10
 
         try:
             for rel_path in file_paths:
@@ -583,22 +789,23 @@ class SearchEngine:
                     total_chunks += self.meta.chunk_counts.get(normalized, 0)
                     continue
 
-                async with self._lock:
-                    chunks_added = await self._index_file_locked(
-                        normalized, content=content
-                    )
-                total_chunks += chunks_added
-                files_since_save += 1
+                texts, metadata = await self._prepare_chunks(
+                    normalized, content, content_h
+                )
+                pending.append((normalized, content_h, texts, metadata))
 
-                # Batch persistence
-                if files_since_save >= _SAVE_BATCH_SIZE:
+                # Batch embedding and persistence
+                if len(pending) >= _BATCH_SIZE:
+                    total_chunks += await self._store_batch(pending)
+                    pending = []
                     await self.store.save_async()
                     await self.meta.save_async(self.index_dir / "index_meta.json")
-                    files_since_save = 0
 
                 # Yield to the event loop between files
                 await asyncio.sleep(0)
 
+            total_chunks += await self._store_batch(pending)
+
             # Final save
             self.meta.embedder_model = self.embedder_model
             await self.store.save_async()
@@ -608,13 +815,81 @@ class SearchEngine:
         finally:
             self._indexing = False
 
+    async def _prepare_chunks(
+        self, normalized_path: str, content: str, content_h: str
+    ) -> tuple[list[str], list[dict]]:
+        """Chunk a file and build the texts to embed and their metadata.
+
+        Args:
+            normalized_path: Normalized relative path to the file.
+            content: File content.
+            content_h: :func:`_content_hash` of *content*.
+
+        Returns:
+            Tuple of (texts to embed, chunk metadata dicts), one entry per chunk.
+        """
+        chunks = _chunk_text_sliding_window(content, self.chunk_size, self.chunk_overlap)
+        metadata_list: list[dict] = []
+        texts_to_embed: list[str] = []
+
+        for i, chunk in enumerate(chunks):
+            context = None
+            if self.contextual_retrieval:
+                context = await self._contextualise_chunk(chunk, content)
+
+            embed_text = f"{context}\n\n{chunk}" if context else chunk
+            texts_to_embed.append(embed_text)
+
+            meta = ChunkMetadata(
+                file_path=normalized_path,
+                chunk_index=i,
+                content=chunk,
+                context=context,
+                content_hash=content_h,
+            )
+            metadata_list.append(asdict(meta))
+
+        return texts_to_embed, metadata_list
+
+    async def _store_batch(
+        self, batch: list[tuple[str, str, list[str], list[dict]]]
+    ) -> int:
+        """Embed the chunks of several files together and store them.
+
+        Args:
+            batch: ``(normalized_path, content_hash, texts, metadata)`` per
+                file, as produced by :meth:`_prepare_chunks`.
+
+        Returns:
+            Number of chunks indexed.
+        """
+        if not batch:
+            return 0
+
+        all_texts = [text for _, _, texts, _ in batch for text in texts]
+        embeddings = await self._embed(all_texts) if all_texts else []
+
+        total = 0
+        async with self._lock:
+            for normalized_path, content_h, texts, metadata in batch:
+                self.store.remove_by_file(normalized_path)
+                if not texts:
+                    self.meta.file_hashes.pop(normalized_path, None)
+                    self.meta.chunk_counts.pop(normalized_path, None)
+                    continue
+                self.store.add(embeddings[total:total + len(texts)], metadata)
+                self.meta.file_hashes[normalized_path] = content_h
+                self.meta.chunk_counts[normalized_path] = len(texts)
+                total += len(texts)
+        return total
+
     async def _index_file_locked(
         self, relative_path: str, *, content: str | None = None
     ) -> int:
         """Index or re-index a single file (no persistence, no lock acquisition).
 
-        Must be called while holding ``self._lock``. Used by ``build_index()``
-        which manages its own lock and batched saves.
+        Must be called while holding ``self._lock``. Used by single-file
+        updates; ``build_index()`` batches files through :meth:`_store_batch`.
 
         Args:
             relative_path: Relative path to the file.
@@ -639,38 +914,22 @@ class SearchEngine:
                 logger.warning(f"Could not read {normalized_path}: {e}")
                 return 0
 
-        chunks = _chunk_text_sliding_window(content, self.chunk_size, self.chunk_overlap)
-        if not chunks:
-            return 0
-
         content_h = _content_hash(content)
-        metadata_list: list[dict] = []
-        texts_to_embed: list[str] = []
-
-        for i, chunk in enumerate(chunks):
-            context = None
-            if self.contextual_retrieval:
-                context = await self._contextualise_chunk(chunk, content)
-
-            embed_text = f"{context}\n\n{chunk}" if context else chunk
-            texts_to_embed.append(embed_text)
-
-            meta = ChunkMetadata(
-                file_path=normalized_path,
-                chunk_index=i,
-                content=chunk,
-                context=context,
-                content_hash=content_h,
-            )
-            metadata_list.append(asdict(meta))
+        texts_to_embed, metadata_list = await self._prepare_chunks(
+            normalized_path, content, content_h
+        )
+        if not texts_to_embed:
+            self.meta.file_hashes.pop(normalized_path, None)
+            self.meta.chunk_counts.pop(normalized_path, None)
+            return 0
 
         embeddings = await self._embed(texts_to_embed)
         self.store.add(embeddings, metadata_list)
 
         self.meta.file_hashes[normalized_path] = content_h
-        self.meta.chunk_counts[normalized_path] = len(chunks)
+        self.meta.chunk_counts[normalized_path] = len(texts_to_embed)
 
-        return len(chunks)
+        return len(texts_to_embed)
 
     async def index_file(
         self, relative_path: str, *, content: str | None = None
@@ -747,41 +1006,70 @@ class SearchEngine:
         Returns:
             List of SearchResult sorted by relevance.
         """
-        if not self._ready or self.store.count == 0:
-            return []
+        results = await self.search_batch(
+            [query], max_results=max_results, file_types=file_types
+        )
+        return results[0]
+
+    async def search_batch(
+        self,
+        queries: list[str],
+        *,
+        max_results: int = 5,
+        file_types: list[str] | None = None,
+    ) -> list[list[SearchResult]]:
+        """Search for several queries at once.
+
+        The queries are embedded together and scored against the index with
+        a single matrix product.
+
+        Args:
+            queries: Search query texts.
+            max_results: Maximum number of results per query.
+            file_types: Optional list of file extensions to filter (e.g. [".md", ".py"]).
+
+        Returns:
+            One list of SearchResult per query, each sorted by relevance.
+        """
+        if not self._ready or self.store.count == 0 or not queries:
+            return [[] for _ in queries]
 
-        query_embedding = await self._embed_query(query)
+        query_embeddings = await self._embed_queries(queries)
 
         # Get more results than needed so we can filter
         fetch_n = max_results * 3 if file_types else max_results
         async with self._lock:
-            raw_results = self.store.search(query_embedding, top_n=fetch_n)
-
-        results: list[SearchResult] = []
-        for r in raw_results:
-            fp = r.get("file_path", "")
-            if file_types:
-                if not any(fp.endswith(ext) for ext in file_types):
-                    continue
-
-            results.append(
-                SearchResult(
-                    file_path=fp,
-                    chunk_index=r.get("chunk_index", 0),
-                    content=r.get("content", ""),
-                    context=r.get("context"),
-                    score=r.get("score", 0.0),
+            raw_batches = self.store.search_batch(query_embeddings, top_n=fetch_n)
+
+        batches: list[list[SearchResult]] = []
+        for raw_results in raw_batches:
+            results: list[SearchResult] = []
+            for r in raw_results:
+                fp = r.get("file_path", "")
+                if file_types:
+                    if not any(fp.endswith(ext) for ext in file_types):
+                        continue
+
+                results.append(
+                    SearchResult(
+                        file_path=fp,
+                        chunk_index=r.get("chunk_index", 0),
+                        content=r.get("content", ""),
+                        context=r.get("context"),
+                        score=r.get("score", 0.0),
+                    )
                 )
-            )
-            if len(results) >= max_results:
-                break
+                if len(results) >= max_results:
+                    break
 
-        # Lazy blame enrichment: annotate each result when git_backend is set
-        if self._git_backend is not None:
-            for result in results:
-                await self._enrich_with_blame(result)
+            # Lazy blame enrichment: annotate each result when git_backend is set
+            if self._git_backend is not None:
+                for result in results:
+                    await self._enrich_with_blame(result)
 
-        return results
+            batches.append(results)
+
+        return batches
 
     async def _enrich_with_blame(self, result: "SearchResult") -> None:
         """Populate blame fields on *result* using the configured git backend.
@@ -831,20 +1119,23 @@ class SearchEngine:
         result.changed_by = most_recent.author
         result.commit_message = most_recent.summary
 
-    async def reindex(self) -> int:
-        """Full reindex of all content files.
+    async def reindex(self, *, full: bool = False) -> int:
+        """Reindex all content files.
 
         Uses the FileSystem instance (if provided) to respect
         STASH_CONTENT_PATHS filtering, otherwise falls back to
         discovering all files under content_dir.
 
+        By default only files whose content hash changed are re-embedded,
+        and files that no longer exist (or are no longer included) are
+        dropped from the index.
+
+        Args:
+            full: Clear the index first and re-embed every file.
+
         Returns:
             Total number of chunks indexed.
         """
-        async with self._lock:
-            self.store.clear()
-            self.meta = IndexMeta()
-
         file_paths = []
         if self._filesystem is not None:
             file_paths = self._filesystem.list_all_files()
@@ -857,6 +1148,17 @@ class SearchEngine:
                     continue
                 file_paths.append(str(rel))
 
+        async with self._lock:
+            if full:
+                self.store.clear()
+                self.meta = IndexMeta()
+            else:
+                current = {_normalize_path(p) for p in file_paths}
+                for stale in [p for p in self.meta.file_hashes if p not in current]:
+                    self.store.remove_by_file(stale)
+                    self.meta.file_hashes.pop(stale, None)
+                    self.meta.chunk_counts.pop(stale, None)
+
         return await self.build_index(sorted(file_paths))
 
     @property
@@ -292,6 +292,10 @@ class TransactionManager:
         self._require_active_transaction()
         return self.fs.write_file(path, content)
 
+    def write_files(self, files: dict[str, str]) -> None:
+        self._require_active_transaction()
+        return self.fs.write_files(files)
+
     def delete_file(self, path: str) -> None:
         self._require_active_transaction()
         return self.fs.delete_file(path)
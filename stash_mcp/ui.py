@@ -1086,6 +1086,17 @@ def _render_markdown(
     if filesystem is not None:
         content = _EMBED_FENCE_RE.sub(_make_embed_replacer(filesystem, base_dir), content)
     content = _CSV_FENCE_RE.sub(_csv_fence_replace, content)
+    return _convert_markdown(content)
+
+
+@functools.lru_cache(maxsize=128)
+def _convert_markdown(content: str) -> tuple[str, str]:
+    """Convert fully expanded markdown to `(html, toc_html)`.
+
+    Cached on the source text: embeds and CSV fences are already substituted
+    by `_render_markdown`, so an edit to the document or to anything it embeds
+    changes the key, and re-viewing an unchanged page skips the parse.
+    """
     converter = md.Markdown(extensions=[
         "fenced_code",
         "tables",
@@ -1964,6 +1975,43 @@ if(typeof hljs!=='undefined'){hljs.highlightAll();}
 # ---------------------------------------------------------------------------
 
 
+def _asset_tags() -> str:
+    """Return the vendor `<link>`/`<script>` tags with their cache busters.
+
+    Built per render rather than cached with the rest of the chrome, so the
+    URLs always reflect what `_static_url` currently returns.
+    """
+    return f"""<link rel="stylesheet" href="{_static_url("vendor/github-dark.min.css")}">
+<script src="{_static_url("vendor/highlight.min.js")}"></script>
+<script src="{_static_url("vendor/languages/terraform.min.js")}"></script>
+<script src="{_static_url("vendor/mermaid.min.js")}"></script>
+<script src="{_static_url("vendor/stash-gantt.js")}"></script>
+"""
+
+
+@functools.cache
+def _page_chrome() -> tuple[str, str, str]:
+    """Return the invariant `(style, top_bar, tail)` markup wrapped around every page.
+
+    The inline CSS, top-bar wordmark and closing inline script are identical
+    on every request, so they are assembled once. The vendor asset tags go
+    between `style` and `top_bar` and come from `_asset_tags`.
+    """
+    style = f"""<style>{_CSS}</style>
+"""
+    top_bar = """</head>
+<body>
+<div class="app">
+<header class="top-bar">
+<div class="top-bar-left">
+<svg class="app-wordmark" width="220" height="44" viewBox="0 0 320 64" fill="none" xmlns="http://www.w3.org/2000/svg"><rect x="2" y="8" width="38" height="48" rx="8" fill="#272738" stroke="#94e2d5" stroke-width="2"/><rect x="7" y="14" width="28" height="34" rx="5" fill="#1e1e2e" stroke="#313244" stroke-width="1"/><path d="M13 18 L13 42 L31 42 L31 24 L25 18 Z" fill="#272738" stroke="#94e2d5" stroke-width="1.2" stroke-linejoin="round"/><path d="M25 18 L25 24 L31 24" fill="none" stroke="#94e2d5" stroke-width="1.2" stroke-linejoin="round"/><line x1="16" y1="28" x2="27" y2="28" stroke="#585b70" stroke-width="1.2" stroke-linecap="round"/><line x1="16" y1="32" x2="28" y2="32" stroke="#4a4b5e" stroke-width="1" stroke-linecap="round"/><line x1="16" y1="36" x2="24" y2="36" stroke="#4a4b5e" stroke-width="1" stroke-linecap="round"/><circle cx="52" cy="16" r="5" fill="#272738" stroke="#94e2d5" stroke-width="1.5"/><circle cx="52" cy="16" r="2" fill="#94e2d5"/><circle cx="52" cy="32" r="5" fill="#272738" stroke="#94e2d5" stroke-width="1.5"/><circle cx="52" cy="32" r="2" fill="#94e2d5"/><circle cx="52" cy="48" r="5" fill="#272738" stroke="#94e2d5" stroke-width="1.5"/><circle cx="52" cy="48" r="2" fill="#94e2d5"/><line x1="40" y1="18" x2="47" y2="16" stroke="#94e2d5" stroke-width="1" opacity="0.4"/><line x1="40" y1="32" x2="47" y2="32" stroke="#94e2d5" stroke-width="1" opacity="0.4"/><line x1="40" y1="46" x2="47" y2="48" stroke="#94e2d5" stroke-width="1" opacity="0.4"/><circle cx="21" cy="14" r="2.5" fill="#1e1e2e" stroke="#94e2d5" stroke-width="1"/><circle cx="21" cy="14" r="1" fill="#94e2d5"/><text x="70" y="41" font-family="-apple-system,BlinkMacSystemFont,'Segoe UI','Helvetica Neue',sans-serif" font-size="32" font-weight="600" fill="#cdd6f4" letter-spacing="-0.5">stash</text><text x="147" y="41" font-family="-apple-system,BlinkMacSystemFont,'Segoe UI','Helvetica Neue',sans-serif" font-size="32" font-weight="300" fill="#94e2d5" letter-spacing="-0.5">-mcp</text></svg>
+</div>
+<div class="top-bar-right">"""
+    tail = f"""<script>{_JS}</script>
+</body></html>"""
+    return style, top_bar, tail
+
+
 def _page(
     title: str,
     sidebar: str,
@@ -2005,25 +2053,18 @@ def _page(
             f'title="Toggle info panel">{_icon("panel-right")}</button>'
         )
 
-    return f"""<!DOCTYPE html>
+    style, top_bar, tail = _page_chrome()
+    return (
+        f"""<!DOCTYPE html>
 <html lang="en">
 <head>
 <meta charset="UTF-8"><meta name="viewport" content="width=device-width,initial-scale=1">
 <title>{html.escape(title)} – Stash-MCP</title>
-<style>{_CSS}</style>
-<link rel="stylesheet" href="{_static_url("vendor/github-dark.min.css")}">
-<script src="{_static_url("vendor/highlight.min.js")}"></script>
-<script src="{_static_url("vendor/languages/terraform.min.js")}"></script>
-<script src="{_static_url("vendor/mermaid.min.js")}"></script>
-<script src="{_static_url("vendor/stash-gantt.js")}"></script>
-</head>
-<body>
-<div class="app">
-<header class="top-bar">
-<div class="top-bar-left">
-<svg class="app-wordmark" width="220" height="44" viewBox="0 0 320 64" fill="none" xmlns="http://www.w3.org/2000/svg"><rect x="2" y="8" width="38" height="48" rx="8" fill="#272738" stroke="#94e2d5" stroke-width="2"/><rect x="7" y="14" width="28" height="34" rx="5" fill="#1e1e2e" stroke="#313244" stroke-width="1"/><path d="M13 18 L13 42 L31 42 L31 24 L25 18 Z" fill="#272738" stroke="#94e2d5" stroke-width="1.2" stroke-linejoin="round"/><path d="M25 18 L25 24 L31 24" fill="none" stroke="#94e2d5" stroke-width="1.2" stroke-linejoin="round"/><line x1="16" y1="28" x2="27" y2="28" stroke="#585b70" stroke-width="1.2" stroke-linecap="round"/><line x1="16" y1="32" x2="28" y2="32" stroke="#4a4b5e" stroke-width="1" stroke-linecap="round"/><line x1="16" y1="36" x2="24" y2="36" stroke="#4a4b5e" stroke-width="1" stroke-linecap="round"/><circle cx="52" cy="16" r="5" fill="#272738" stroke="#94e2d5" stroke-width="1.5"/><circle cx="52" cy="16" r="2" fill="#94e2d5"/><circle cx="52" cy="32" r="5" fill="#272738" stroke="#94e2d5" stroke-width="1.5"/><circle cx="52" cy="32" r="2" fill="#94e2d5"/><circle cx="52" cy="48" r="5" fill="#272738" stroke="#94e2d5" stroke-width="1.5"/><circle cx="52" cy="48" r="2" fill="#94e2d5"/><line x1="40" y1="18" x2="47" y2="16" stroke="#94e2d5" stroke-width="1" opacity="0.4"/><line x1="40" y1="32" x2="47" y2="32" stroke="#94e2d5" stroke-width="1" opacity="0.4"/><line x1="40" y1="46" x2="47" y2="48" stroke="#94e2d5" stroke-width="1" opacity="0.4"/><circle cx="21" cy="14" r="2.5" fill="#1e1e2e" stroke="#94e2d5" stroke-width="1"/><circle cx="21" cy="14" r="1" fill="#94e2d5"/><text x="70" y="41" font-family="-apple-system,BlinkMacSystemFont,'Segoe UI','Helvetica Neue',sans-serif" font-size="32" font-weight="600" fill="#cdd6f4" letter-spacing="-0.5">stash</text><text x="147" y="41" font-family="-apple-system,BlinkMacSystemFont,'Segoe UI','Helvetica Neue',sans-serif" font-size="32" font-weight="300" fill="#94e2d5" letter-spacing="-0.5">-mcp</text></svg>
-</div>
-<div class="top-bar-right">{toolbar_right_items}</div>
+"""
+        + style
+        + _asset_tags()
+        + top_bar
+        + f"""{toolbar_right_items}</div>
 </header>
 <div class="layout">
 <nav class="sidebar">{sidebar}</nav>
@@ -2034,8 +2075,9 @@ def _page(
 {right_panel}
 </div>
 </div>
-<script>{_JS}</script>
-</body></html>"""
+"""
+        + tail
+    )
 
 
 def _sidebar_html(
@@ -8,7 +8,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 from stash_mcp.api import create_api
-from stash_mcp.events import _listeners, add_listener
+from stash_mcp.events import add_listener, remove_listener
 from stash_mcp.filesystem import FileSystem
 
 
@@ -32,7 +32,7 @@ def event_listener():
     listener = MagicMock()
     add_listener(listener)
     yield listener
-    _listeners.remove(listener)
+    remove_listener(listener)
 
 
 def test_root_endpoint(test_client):
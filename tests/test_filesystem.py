@@ -68,6 +68,27 @@ def test_write_file_existing_directory_no_error(temp_fs):
     assert temp_fs.read_file("existing/file2.txt") == "Second"
 
 
+def test_write_files(temp_fs):
+    """Test writing several files, including nested paths, in one call."""
+    temp_fs.write_files({
+        "root.txt": "Root",
+        "docs/a.md": "# A",
+        "docs/b.md": "# B",
+        "docs/deep/c.md": "# C",
+    })
+    assert temp_fs.read_file("root.txt") == "Root"
+    assert temp_fs.read_file("docs/a.md") == "# A"
+    assert temp_fs.read_file("docs/b.md") == "# B"
+    assert temp_fs.read_file("docs/deep/c.md") == "# C"
+
+
+def test_write_files_invalid_path_writes_nothing(temp_fs):
+    """Test write_files validates every path before writing any file."""
+    with pytest.raises(InvalidPathError):
+        temp_fs.write_files({"ok.txt": "fine", "../escape.txt": "bad"})
+    assert not temp_fs.file_exists("ok.txt")
+
+
 def test_list_files(temp_fs):
     """Test listing files in a directory."""
     temp_fs.write_file("file1.txt", "Content 1")
@@ -314,6 +335,13 @@ def test_list_files_with_patterns_hides_non_matching(populated_dir):
     assert "ideas.md" not in names
 
 
+def test_list_all_files_with_trailing_star_star(populated_dir):
+    """Test a 'dir/**' pattern (from a trailing '/') matches files under dir."""
+    fs = FileSystem(populated_dir, include_patterns=["docs/**"])
+    files = fs.list_all_files()
+    assert files == ["docs/api.md", "docs/deep/nested.md", "docs/guide.md"]
+
+
 def test_include_patterns_trailing_slash_normalization():
     """Test that trailing '/' is treated as '/**'."""
     from stash_mcp.config import _parse_content_paths
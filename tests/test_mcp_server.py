@@ -1,91 +1,356 @@
 """Tests for MCP server implementation."""
 
+import functools
 import hashlib
+import json
+import os
+import shutil
+import threading
+import weakref
 from pathlib import Path
 from tempfile import TemporaryDirectory
-from unittest.mock import AsyncMock, MagicMock, patch
+from types import SimpleNamespace
+from unittest.mock import call, patch
 
 import pytest
+from fastmcp.server.context import _current_context
 
+from stash_mcp.config import Config
 from stash_mcp.filesystem import FileNotFoundError, FileSystem
 from stash_mcp.mcp_server import (
     EditOperation,
     FileEditOperation,
     MoveOperation,
     _build_heading_tree,
-    _get_mime_type,
     create_mcp_server,
+    get_mime_type,
     parse_markdown_structure,
 )
 
 
+@functools.lru_cache(maxsize=512)
 def _sha(content: str) -> str:
     return hashlib.sha256(content.encode("utf-8")).hexdigest()
 
 
+def _sha_file(path: Path) -> str:
+    """SHA-256 of a file on disk, streamed rather than read into memory."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+# Files written by the mcp_server and seeded_mcp fixtures.
+_SEED_FILES = {
+    "README.md": "# Root README",
+    "docs/README.md": "# Docs README\nSome docs",
+    "data.json": '{"key": "value"}',
+}
+
+# SHAs of fixture content used across many tests, hashed once at import.
+_SHA_ROOT_README = _sha(_SEED_FILES["README.md"])
+_SHA_DATA_JSON = _sha(_SEED_FILES["data.json"])
+_SHA_EVENT_TEST = _sha("event test")
+
+# Shared multi-line fixture content.
+_MULTI_3 = "line1\nline2\nline3"
+_MULTI_5 = "line1\nline2\nline3\nline4\nline5"
+_REPEAT = "foo bar foo baz foo"
+_SHA_MULTI_3 = _sha(_MULTI_3)
+_SHA_REPEAT = _sha(_REPEAT)
+
+# One more path (or move) than the batch tools accept, built once at import.
+_OVERLIMIT_PATHS = tuple(f"file{i}.md" for i in range(11))
+_OVERLIMIT_MOVES = tuple(
+    MoveOperation(source_path=p, dest_path=f"moved/{p}") for p in _OVERLIMIT_PATHS
+)
+
+# Edit operations shared by several edit tests, validated once at import.
+_EDIT_NOT_FOUND = EditOperation(old_string="NONEXISTENT", new_string="x")
+_FILE_EDIT_ROOT_CHANGED = FileEditOperation(
+    file_path="README.md",
+    sha=_SHA_ROOT_README,
+    edits=[EditOperation(old_string="Root", new_string="Changed")],
+)
+
+
+# Tools are fixed once create_mcp_server returns, so list them once per server
+# instead of rebuilding FastMCP's tool dict on every get_tool call.
+_TOOL_CACHE: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+async def _get_tool(mcp, name: str):
+    """Return tool *name* from *mcp*, caching the server's tool dict."""
+    tools = _TOOL_CACHE.get(mcp)
+    if tools is None:
+        tools = _TOOL_CACHE[mcp] = await mcp.get_tools()
+    return tools[name]
+
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+
+def _payload(result) -> dict:
+    """Parse the JSON body of a tool result that returns a dict."""
+    return _json_loads(result.content[0].text)
+
+
+# Keep per-test content dirs in RAM where the host provides a tmpfs; the
+# FileSystem under test is still the real on-disk implementation.
+_TMP_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
 @pytest.fixture
 def temp_fs():
     """Create a temporary filesystem for testing."""
-    with TemporaryDirectory() as tmpdir:
+    with TemporaryDirectory(dir=_TMP_ROOT) as tmpdir:
         fs = FileSystem(Path(tmpdir))
         yield fs
 
 
+# Read-only fixture files, written once per session and hardlinked into each
+# test's content dir.  Only seed files a test never writes: FileSystem writes
+# in place, which would change the shared inode for every later test.
+_GOLDEN = {
+    "multi.md": _MULTI_3,
+    "multi5.md": _MULTI_5,
+    "a.md": "line1\nline2\nline3\nline4",
+    "b.md": "alpha\nbeta\ngamma",
+}
+
+
+@pytest.fixture(scope="session")
+def golden_dir():
+    """Write the golden fixture files once for the whole session."""
+    # Same root as temp_fs so seed() can hardlink rather than copy.
+    with TemporaryDirectory(dir=_TMP_ROOT) as tmpdir:
+        root = Path(tmpdir)
+        FileSystem(root).write_files(_GOLDEN)
+        yield root
+
+
+@pytest.fixture
+def seed(temp_fs, golden_dir):
+    """Return a helper that hardlinks golden files into ``temp_fs``."""
+
+    def _seed(*names: str) -> None:
+        for name in names:
+            dest = temp_fs.content_dir / name
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(golden_dir / name, dest)
+            except OSError:
+                # Different filesystem (EXDEV); fall back to a copy.
+                shutil.copyfile(golden_dir / name, dest)
+
+    return _seed
+
+
+class _InMemoryFS:
+    """Dict-backed stand-in for FileSystem in read-only tool tests.
+
+    Implements only what create_mcp_server touches at startup and what the
+    read-only tools call; anything else raises AttributeError.
+    """
+
+    def __init__(self):
+        self._files: dict[str, str] = {}
+
+    def write_file(self, relative_path: str, content: str) -> None:
+        self._files[relative_path] = content
+
+    def write_files(self, files: dict[str, str]) -> None:
+        self._files.update(files)
+
+    def read_file(self, relative_path: str) -> str:
+        try:
+            return self._files[relative_path]
+        except KeyError:
+            raise FileNotFoundError(f"File '{relative_path}' not found") from None
+
+    def file_exists(self, relative_path: str) -> bool:
+        return relative_path in self._files
+
+    def list_all_files(self, relative_path: str = "") -> list[str]:
+        return sorted(self._files)
+
+
+# Inputs for the read-only inspect_content_structure tests, seeded once.
+_INSPECT_FILES = {
+    "doc.md": "# Title\n\n## Section 1\n\n### Subsection\n\n## Section 2\n",
+    "titled.md": "# My Title\n\n## Sub\n",
+    "no_h1.md": "## Section\n\n### Subsection\n",
+    "data.json": '{"key": "value"}',
+    "docs/guide.md": "# Guide\n",
+    "a.md": "# Alpha\n\n## Section A\n",
+    "b.md": "# Beta\n\n## Section B\n",
+    "exists.md": "# Exists\n",
+    "first.md": "# First\n",
+    "second.md": "# Second\n",
+    "third.md": "# Third\n",
+}
+
+
+@pytest.fixture(scope="module")
+def shared_fs():
+    """Module-wide in-memory filesystem pre-seeded with ``_INSPECT_FILES``.
+
+    Tests using it must not write to it.
+    """
+    fs = _InMemoryFS()
+    fs.write_files(_INSPECT_FILES)
+    return fs
+
+
+@pytest.fixture(scope="module")
+def shared_mcp(shared_fs):
+    """Build one MCP server over ``shared_fs`` for the whole module."""
+    return create_mcp_server(shared_fs)
+
+
+@pytest.fixture(scope="module")
+def _emit_log():
+    """Patch the event bus once per module, recording into a shared list."""
+    events: list[tuple[str, str, dict]] = []
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(
+            "stash_mcp.mcp_server.emit",
+            lambda event_type, path, **kwargs: events.append((event_type, path, kwargs)),
+        )
+        yield events
+
+
+@pytest.fixture(autouse=True)
+def captured_emits(_emit_log):
+    """Capture event-bus emits from the MCP tools as ``(event, path, kwargs)``."""
+    _emit_log.clear()
+    return _emit_log
+
+
 @pytest.fixture
 def mcp_server(temp_fs):
     """Create a FastMCP server with temporary filesystem."""
-    temp_fs.write_file("README.md", "# Root README")
-    temp_fs.write_file("docs/README.md", "# Docs README\nSome docs")
-    temp_fs.write_file("data.json", '{"key": "value"}')
+    temp_fs.write_files(_SEED_FILES)
     return create_mcp_server(temp_fs)
 
 
-@pytest.fixture
-def mock_context():
-    """Set up a mock Context in FastMCP's _current_context ContextVar."""
-    from fastmcp.server.context import Context, _current_context
+@pytest.fixture(scope="module")
+def seeded_mcp():
+    """Build one server over ``_SEED_FILES`` for tests that never write.
 
-    ctx = MagicMock(spec=Context)
-    ctx.session = AsyncMock()
-    ctx.send_resource_list_changed = AsyncMock()
-    token = _current_context.set(ctx)
-    yield ctx
-    _current_context.reset(token)
+    Construction registers every tool and resource, so read-only tests share
+    it instead of paying for it per test as ``mcp_server`` does.  Tests whose
+    write calls are rejected during validation also qualify, since a failed
+    call leaves the seed files untouched.
+    """
+    with TemporaryDirectory(dir=_TMP_ROOT) as tmpdir:
+        fs = FileSystem(Path(tmpdir))
+        fs.write_files(_SEED_FILES)
+        yield create_mcp_server(fs)
 
 
-# --- Mime type tests ---
+class _Recorder:
+    """Awaitable that records its calls, with the AsyncMock asserts tests use."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, *args, **kwargs):
+        self.calls.append(call(*args, **kwargs))
 
+    @property
+    def call_args(self):
+        return self.calls[-1] if self.calls else None
 
-def test_get_mime_type_markdown():
-    """Test mime type detection for markdown files."""
-    assert _get_mime_type("file.md") == "text/markdown"
-    assert _get_mime_type("file.markdown") == "text/markdown"
+    def assert_awaited(self):
+        assert self.calls, "Expected to have been awaited."
 
+    def assert_awaited_once(self):
+        assert len(self.calls) == 1, f"Expected one await, got {len(self.calls)}."
 
-def test_get_mime_type_json():
-    """Test mime type detection for JSON files."""
-    assert _get_mime_type("file.json") == "application/json"
+    def assert_not_awaited(self):
+        assert not self.calls, f"Expected no awaits, got {len(self.calls)}."
 
+    def reset_mock(self):
+        self.calls.clear()
 
-def test_get_mime_type_yaml():
-    """Test mime type detection for YAML files."""
-    assert _get_mime_type("file.yaml") == "application/x-yaml"
-    assert _get_mime_type("file.yml") == "application/x-yaml"
 
+class _DummyContext:
+    """Minimal stand-in for FastMCP's Context.
 
-def test_get_mime_type_default():
-    """Test default mime type for unknown extensions."""
-    assert _get_mime_type("file.xyz") == "text/plain"
-    assert _get_mime_type("file") == "text/plain"
+    The tools only await ``session.send_resource_updated`` and
+    ``send_resource_list_changed``; FastMCP itself calls the
+    ``_queue_*_list_changed`` hooks when the registry changes.  That is all
+    a ``MagicMock(spec=Context)`` was providing, minus the introspection.
+    """
+
+    def __init__(self):
+        self.session = SimpleNamespace(send_resource_updated=_Recorder())
+        self.send_resource_list_changed = _Recorder()
+
+    def _queue_resource_list_changed(self):
+        pass
+
+    def _queue_tool_list_changed(self):
+        pass
+
+    def reset_mocks(self):
+        self.session.send_resource_updated.reset_mock()
+        self.send_resource_list_changed.reset_mock()
+
+
+# Built once and reset after each test rather than re-allocated per test.
+_CONTEXT = _DummyContext()
+
+
+@pytest.fixture(autouse=True)
+def _ctx_var():
+    """Install the shared dummy Context in FastMCP's _current_context ContextVar."""
+    token = _current_context.set(_CONTEXT)
+    try:
+        yield
+    finally:
+        _current_context.reset(token)
+        _CONTEXT.reset_mocks()
+
+
+@pytest.fixture
+def mock_context(_ctx_var):
+    """The dummy Context, for tests that assert on its notifications."""
+    return _CONTEXT
+
+
+# --- Mime type tests ---
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("file.md", "text/markdown"),
+        ("file.markdown", "text/markdown"),
+        ("file.json", "application/json"),
+        ("file.yaml", "application/x-yaml"),
+        ("file.yml", "application/x-yaml"),
+        ("file.xyz", "text/plain"),
+        ("file", "text/plain"),
+        ("README.MD", "text/markdown"),
+        ("docs.v2/notes", "text/plain"),
+    ],
+)
+def test_get_mime_type(path, expected):
+    """Test mime type detection by extension, defaulting to text/plain."""
+    assert get_mime_type(path) == expected
 
 
 # --- Resource tests ---
 
 
-async def test_list_resources(mcp_server):
+async def test_list_resources(seeded_mcp):
     """Test listing resources returns only README.md files."""
-    resources = await mcp_server.get_resources()
-    uris = list(resources.keys())
+    resources = await seeded_mcp.get_resources()
+    uris = set(resources)
     # Only README.md files should be registered as resources
     assert "stash://README.md" in uris
     assert "stash://docs/README.md" in uris
@@ -93,9 +358,9 @@ async def test_list_resources(mcp_server):
     assert "stash://data.json" not in uris
 
 
-async def test_resource_mime_types(mcp_server):
+async def test_resource_mime_types(seeded_mcp):
     """Test that resources have correct mime types."""
-    resources = await mcp_server.get_resources()
+    resources = await seeded_mcp.get_resources()
     md_resource = resources.get("stash://README.md")
     assert md_resource is not None
     assert md_resource.mime_type == "text/markdown"
@@ -105,16 +370,16 @@ async def test_resource_mime_types(mcp_server):
     assert json_resource is None
 
 
-async def test_resource_templates(mcp_server):
+async def test_resource_templates(seeded_mcp):
     """Test that resource template is registered."""
-    templates = await mcp_server.get_resource_templates()
+    templates = await seeded_mcp.get_resource_templates()
     assert "stash://{path}" in templates
 
 
-async def test_read_resource_via_template(mcp_server):
+async def test_read_resource_via_template(seeded_mcp):
     """Test reading a resource through the resource template."""
     # README.md is registered, so it can be accessed
-    resource = await mcp_server.get_resource("stash://README.md")
+    resource = await seeded_mcp.get_resource("stash://README.md")
     content = resource.fn()
     assert content == "# Root README"
 
@@ -122,143 +387,135 @@ async def test_read_resource_via_template(mcp_server):
 # --- Tool tests ---
 
 
-async def test_list_tools(mcp_server):
+async def test_list_tools(seeded_mcp):
     """Test listing tools returns all expected tools."""
-    tools = await mcp_server.get_tools()
-    tool_names = list(tools.keys())
-    assert "create_content" in tool_names
-    assert "read_content" in tool_names
-    assert "overwrite_content" in tool_names
-    assert "edit_content" in tool_names
-    assert "edit_content_batch" in tool_names
-    assert "delete_content" in tool_names
-    assert "list_content" in tool_names
-    assert "read_content_batch" in tool_names
-    assert "move_content" in tool_names
-    assert "move_content_directory" in tool_names
-    assert "move_content_batch" in tool_names
-    assert "inspect_content_structure" in tool_names
-    assert "inspect_content_structure_batch" in tool_names
+    tools = await seeded_mcp.get_tools()
+    assert {
+        "create_content",
+        "read_content",
+        "overwrite_content",
+        "edit_content",
+        "edit_content_batch",
+        "delete_content",
+        "list_content",
+        "read_content_batch",
+        "move_content",
+        "move_content_directory",
+        "move_content_batch",
+        "inspect_content_structure",
+        "inspect_content_structure_batch",
+    } <= tools.keys()
 
 
 async def test_create_content_tool(temp_fs, mock_context):
-    """Test create_content tool creates a file."""
+    """Test create_content tool creates a file.
+
+    Side-effect-only tests call ``tool.fn`` directly; schema handling is
+    still covered by the ``tool.run`` tests for each tool.
+    """
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("create_content")
-    result = await tool.run({"path": "new.md", "content": "# New File"})
-    assert "Created: new.md" in str(result.content)
-    assert temp_fs.file_exists("new.md")
+    tool = await _get_tool(mcp, "create_content")
+    result = await tool.fn(path="new.md", content="# New File", ctx=mock_context)
+    assert "Created: new.md" in result
     assert temp_fs.read_file("new.md") == "# New File"
 
 
-async def test_create_content_tool_nested_path(temp_fs, mock_context):
+async def test_create_content_tool_nested_path(temp_fs):
     """Test create_content tool creates missing parent directories."""
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("create_content")
+    tool = await _get_tool(mcp, "create_content")
     result = await tool.run({"path": "a/b/c/new.md", "content": "# Nested"})
-    assert "Created: a/b/c/new.md" in str(result.content)
-    assert temp_fs.file_exists("a/b/c/new.md")
+    assert "Created: a/b/c/new.md" in result.content[0].text
     assert temp_fs.read_file("a/b/c/new.md") == "# Nested"
 
 
-async def test_create_content_tool_existing_file(mcp_server, temp_fs, mock_context):
+async def test_create_content_tool_existing_file(seeded_mcp):
     """Test create_content tool errors on existing file."""
-    tool = await mcp_server.get_tool("create_content")
+    tool = await _get_tool(seeded_mcp, "create_content")
     with pytest.raises(ValueError, match="already exists"):
         await tool.run({"path": "README.md", "content": "overwrite"})
 
 
-async def test_read_content_tool(mcp_server):
+async def test_read_content_tool(seeded_mcp):
     """Test read_content tool reads a file and returns sha."""
-    tool = await mcp_server.get_tool("read_content")
+    tool = await _get_tool(seeded_mcp, "read_content")
     result = await tool.run({"path": "README.md"})
-    text = str(result.content)
-    assert "# Root README" in text
-    assert "sha" in text
+    payload = _payload(result)
+    assert payload["content"] == "# Root README"
+    assert payload["sha"] == _SHA_ROOT_README
 
 
-async def test_read_content_tool_not_found(mcp_server):
+async def test_read_content_tool_not_found(seeded_mcp):
     """Test read_content tool errors on missing file."""
-    tool = await mcp_server.get_tool("read_content")
+    tool = await _get_tool(seeded_mcp, "read_content")
     with pytest.raises(FileNotFoundError):
         await tool.run({"path": "nonexistent.md"})
 
 
-async def test_read_content_tool_returns_truncated_false_by_default(mcp_server):
+async def test_read_content_tool_returns_truncated_false_by_default(seeded_mcp):
     """Test read_content returns truncated=False when max_lines is not provided."""
-    tool = await mcp_server.get_tool("read_content")
+    tool = await _get_tool(seeded_mcp, "read_content")
     result = await tool.run({"path": "README.md"})
-    text = str(result.content)
-    assert "truncated" in text
-    assert '"truncated":false' in text
+    assert _payload(result)["truncated"] is False
 
 
-async def test_read_content_tool_max_lines_truncates(temp_fs):
+async def test_read_content_tool_max_lines_truncates(temp_fs, seed):
     """Test read_content truncates content to max_lines lines."""
-    temp_fs.write_file("multi.md", "line1\nline2\nline3\nline4\nline5")
+    seed("multi5.md")
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("read_content")
-    result = await tool.run({"path": "multi.md", "max_lines": 2})
-    text = str(result.content)
-    assert "line1" in text
-    assert "line2" in text
-    assert "line3" not in text
-    assert '"truncated":true' in text  # truncated=True
+    tool = await _get_tool(mcp, "read_content")
+    result = await tool.run({"path": "multi5.md", "max_lines": 2})
+    payload = _payload(result)
+    assert payload["content"] == "line1\nline2\n"
+    assert payload["truncated"] is True
 
 
-async def test_read_content_tool_max_lines_sha_is_full_file(temp_fs):
+async def test_read_content_tool_max_lines_sha_is_full_file(temp_fs, seed):
     """Test read_content SHA is computed on full file even when truncated."""
-    content = "line1\nline2\nline3"
-    temp_fs.write_file("multi.md", content)
+    seed("multi.md")
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("read_content")
+    tool = await _get_tool(mcp, "read_content")
     result = await tool.run({"path": "multi.md", "max_lines": 1})
-    text = str(result.content)
     # SHA must match the full file, not just the first line
-    assert _sha(content) in text
+    assert _payload(result)["sha"] == _SHA_MULTI_3
 
 
-async def test_read_content_tool_max_lines_no_truncation_when_within_limit(temp_fs):
+async def test_read_content_tool_max_lines_no_truncation_when_within_limit(temp_fs, seed):
     """Test read_content returns full content when max_lines >= total lines."""
-    content = "line1\nline2\nline3"
-    temp_fs.write_file("multi.md", content)
+    seed("multi.md")
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("read_content")
+    tool = await _get_tool(mcp, "read_content")
     result = await tool.run({"path": "multi.md", "max_lines": 10})
-    text = str(result.content)
-    assert "line1" in text
-    assert "line2" in text
-    assert "line3" in text
-    assert '"truncated":false' in text  # truncated=False
+    payload = _payload(result)
+    assert payload["content"] == _MULTI_3
+    assert payload["truncated"] is False
 
 
-async def test_read_content_tool_max_lines_exact_line_count(temp_fs):
+async def test_read_content_tool_max_lines_exact_line_count(temp_fs, seed):
     """Test read_content with max_lines equal to total line count."""
-    content = "line1\nline2\nline3"
-    temp_fs.write_file("multi.md", content)
+    seed("multi.md")
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("read_content")
+    tool = await _get_tool(mcp, "read_content")
     result = await tool.run({"path": "multi.md", "max_lines": 3})
-    text = str(result.content)
-    assert "line3" in text
-    assert '"truncated":false' in text  # truncated=False
+    payload = _payload(result)
+    assert payload["content"] == _MULTI_3
+    assert payload["truncated"] is False
 
 
-async def test_read_content_tool_max_lines_one(temp_fs):
+async def test_read_content_tool_max_lines_one(temp_fs, seed):
     """Test read_content with max_lines=1 returns only the first line."""
-    temp_fs.write_file("multi.md", "first\nsecond\nthird")
+    seed("multi.md")
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("read_content")
+    tool = await _get_tool(mcp, "read_content")
     result = await tool.run({"path": "multi.md", "max_lines": 1})
-    text = str(result.content)
-    assert "first" in text
-    assert "second" not in text
-    assert '"truncated":true' in text  # truncated=True
+    payload = _payload(result)
+    assert payload["content"] == "line1\n"
+    assert payload["truncated"] is True
 
 
-async def test_read_content_tool_max_lines_zero_raises(mcp_server):
+async def test_read_content_tool_max_lines_zero_raises(seeded_mcp):
     """Test read_content raises ValueError when max_lines=0."""
-    tool = await mcp_server.get_tool("read_content")
+    tool = await _get_tool(seeded_mcp, "read_content")
     with pytest.raises(ValueError, match="max_lines must be a positive integer"):
         await tool.run({"path": "README.md", "max_lines": 0})
 
@@ -266,180 +523,189 @@ async def test_read_content_tool_max_lines_zero_raises(mcp_server):
 # --- read_content_batch tests ---
 
 
-async def test_read_content_batch_happy_path(mcp_server):
-    """Test read_content_batch returns content and sha for multiple files."""
-    tool = await mcp_server.get_tool("read_content_batch")
-    result = await tool.run({"paths": ["README.md", "data.json"]})
-    text = str(result.content)
-    assert "# Root README" in text
-    assert _sha("# Root README") in text
-    assert "data.json" in text
-    assert _sha('{"key": "value"}') in text
-
-
-async def test_read_content_batch_partial_failure(mcp_server):
-    """Test read_content_batch returns error for missing files without aborting."""
-    tool = await mcp_server.get_tool("read_content_batch")
-    result = await tool.run({"paths": ["README.md", "nonexistent.md"]})
-    text = str(result.content)
-    # Existing file should be returned successfully
-    assert "# Root README" in text
-    assert _sha("# Root README") in text
-    # Missing file should have an error entry
-    assert "nonexistent.md" in text
-    assert "error" in text
-
-
-async def test_read_content_batch_empty_list(mcp_server):
-    """Test read_content_batch rejects empty path list."""
-    tool = await mcp_server.get_tool("read_content_batch")
-    with pytest.raises(ValueError, match="At least one path is required"):
-        await tool.run({"paths": []})
-
-
-async def test_read_content_batch_over_limit(mcp_server):
-    """Test read_content_batch rejects more than 10 paths."""
-    tool = await mcp_server.get_tool("read_content_batch")
-    with pytest.raises(ValueError, match="Maximum 10 files per batch read"):
-        await tool.run({"paths": [f"file{i}.md" for i in range(11)]})
-
-
-async def test_read_content_batch_duplicate_paths(mcp_server):
-    """Test read_content_batch rejects duplicate paths."""
-    tool = await mcp_server.get_tool("read_content_batch")
-    with pytest.raises(ValueError, match="Duplicate paths are not allowed"):
-        await tool.run({"paths": ["README.md", "README.md"]})
-
-
-async def test_read_content_batch_order_preserved(mcp_server, temp_fs):
-    """Test read_content_batch returns results in the same order as input paths."""
-    tool = await mcp_server.get_tool("read_content_batch")
-    result = await tool.run({"paths": ["data.json", "README.md", "docs/README.md"]})
-    # Extract result order from the content string
-    text = str(result.content)
-    pos_data = text.find("data.json")
-    pos_root = text.find('"README.md"')
-    pos_docs = text.find("docs/README.md")
-    assert pos_data < pos_root < pos_docs
+@pytest.mark.parametrize(
+    "paths",
+    [
+        ["README.md", "data.json"],
+        ["README.md", "nonexistent.md"],
+        ["data.json", "README.md", "docs/README.md"],
+        ["missing1.md", "missing2.md"],
+    ],
+    ids=["happy_path", "partial_failure", "order_preserved", "all_missing"],
+)
+async def test_read_content_batch_results(seeded_mcp, paths):
+    """Test read_content_batch returns one entry per path, in input order.
+
+    Existing files carry content and SHA; missing files carry only an error
+    and do not abort the rest of the batch.
+    """
+    tool = await _get_tool(seeded_mcp, "read_content_batch")
+    result = await tool.run({"paths": paths})
+    results = _payload(result)["results"]
+    assert [r["path"] for r in results] == paths
+    for r in results:
+        expected = _SEED_FILES.get(r["path"])
+        if expected is None:
+            assert r["content"] is None
+            assert r["sha"] is None
+            assert r["error"] is not None
+        else:
+            assert r["content"] == expected
+            assert r["sha"] == _sha(expected)
+            assert r["error"] is None
+
+
+@pytest.mark.parametrize(
+    "args, match",
+    [
+        ({"paths": []}, "At least one path is required"),
+        ({"paths": list(_OVERLIMIT_PATHS)}, "Maximum 10 files per batch read"),
+        ({"paths": ["README.md", "README.md"]}, "Duplicate paths are not allowed"),
+        ({"paths": ["README.md"], "max_lines": 0}, "max_lines must be a positive integer"),
+    ],
+    ids=["empty", "over_limit", "duplicates", "max_lines_zero"],
+)
+async def test_read_content_batch_rejects_invalid_args(seeded_mcp, args, match):
+    """Test read_content_batch validates its arguments before reading."""
+    tool = await _get_tool(seeded_mcp, "read_content_batch")
+    with pytest.raises(ValueError, match=match):
+        await tool.run(args)
+
+
+@pytest.mark.parametrize(
+    "max_lines, expected_content, expected_truncated",
+    [
+        (
+            None,
+            ["line1\nline2\nline3\nline4", "alpha\nbeta\ngamma"],
+            [False, False],
+        ),
+        (2, ["line1\nline2\n", "alpha\nbeta\n"], [True, True]),
+        (3, ["line1\nline2\nline3\n", "alpha\nbeta\ngamma"], [True, False]),
+        (
+            100,
+            ["line1\nline2\nline3\nline4", "alpha\nbeta\ngamma"],
+            [False, False],
+        ),
+    ],
+    ids=["default", "truncates_all", "truncates_some", "within_limit"],
+)
+async def test_read_content_batch_max_lines(
+    temp_fs, seed, max_lines, expected_content, expected_truncated
+):
+    """Test read_content_batch truncates each file to max_lines independently."""
+    seed("a.md", "b.md")
+    mcp = create_mcp_server(temp_fs)
+    tool = await _get_tool(mcp, "read_content_batch")
+    args = {"paths": ["a.md", "b.md"]}
+    if max_lines is not None:
+        args["max_lines"] = max_lines
+    results = _payload(await tool.run(args))["results"]
+    assert [r["content"] for r in results] == expected_content
+    assert [r["truncated"] for r in results] == expected_truncated
 
 
-async def test_read_content_batch_all_missing(mcp_server):
-    """Test read_content_batch with all missing files returns errors for each."""
-    tool = await mcp_server.get_tool("read_content_batch")
-    result = await tool.run({"paths": ["missing1.md", "missing2.md"]})
-    text = str(result.content)
-    assert "missing1.md" in text
-    assert "missing2.md" in text
-    # No content should be present, only errors
-    assert "error" in text
-
-
-async def test_read_content_batch_truncated_false_by_default(mcp_server):
-    """Test read_content_batch includes truncated=False by default."""
-    tool = await mcp_server.get_tool("read_content_batch")
-    result = await tool.run({"paths": ["README.md"]})
-    text = str(result.content)
-    assert "truncated" in text
-    assert '"truncated":false' in text
-
-
-async def test_read_content_batch_max_lines_truncates(temp_fs):
-    """Test read_content_batch truncates each file to max_lines."""
-    temp_fs.write_file("a.md", "line1\nline2\nline3\nline4")
-    temp_fs.write_file("b.md", "alpha\nbeta\ngamma")
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("read_content_batch")
-    result = await tool.run({"paths": ["a.md", "b.md"], "max_lines": 2})
-    text = str(result.content)
-    assert "line1" in text
-    assert "line2" in text
-    assert "line3" not in text
-    assert "alpha" in text
-    assert "beta" in text
-    assert "gamma" not in text
-    assert '"truncated":true' in text  # at least one truncated=True
-
-
-async def test_read_content_batch_max_lines_sha_is_full_file(temp_fs):
+async def test_read_content_batch_max_lines_sha_is_full_file(temp_fs, seed):
     """Test read_content_batch SHA is computed on full file even when truncated."""
-    content = "line1\nline2\nline3"
-    temp_fs.write_file("multi.md", content)
+    seed("multi.md")
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("read_content_batch")
+    tool = await _get_tool(mcp, "read_content_batch")
     result = await tool.run({"paths": ["multi.md"], "max_lines": 1})
-    text = str(result.content)
-    assert _sha(content) in text
-
-
-async def test_read_content_batch_max_lines_zero_raises(mcp_server):
-    """Test read_content_batch raises ValueError when max_lines=0."""
-    tool = await mcp_server.get_tool("read_content_batch")
-    with pytest.raises(ValueError, match="max_lines must be a positive integer"):
-        await tool.run({"paths": ["README.md"], "max_lines": 0})
+    assert _payload(result)["results"][0]["sha"] == _SHA_MULTI_3
+
+
+def _overlap_tracking_read(expected: int):
+    """Return a ``FileSystem.read_file`` stand-in and the stats it records.
+
+    Each call blocks until *expected* reads are in flight at once, so serial
+    reads fail with ``BrokenBarrierError`` rather than merely running slowly.
+    ``stats["peak"]`` is the largest number of reads seen in flight together.
+    """
+    original_read = FileSystem.read_file
+    barrier = threading.Barrier(expected, timeout=5)
+    lock = threading.Lock()
+    stats = {"in_flight": 0, "peak": 0}
+
+    def read(self, relative_path):
+        with lock:
+            stats["in_flight"] += 1
+            stats["peak"] = max(stats["peak"], stats["in_flight"])
+        try:
+            barrier.wait()
+        finally:
+            with lock:
+                stats["in_flight"] -= 1
+        return original_read(self, relative_path)
+
+    return read, stats
+
+
+async def test_read_content_batch_is_concurrent(temp_fs):
+    """Test read_content_batch overlaps file reads instead of reading serially."""
+    paths = [f"slow{i}.md" for i in range(5)]
+    temp_fs.write_files({p: p for p in paths})
+    mcp = create_mcp_server(temp_fs)
+    tool = await _get_tool(mcp, "read_content_batch")
+    read, stats = _overlap_tracking_read(len(paths))
 
+    with patch.object(FileSystem, "read_file", read):
+        result = await tool.run({"paths": paths})
 
-async def test_read_content_batch_max_lines_no_truncation_when_within_limit(temp_fs):
-    """Test read_content_batch returns full content when max_lines >= total lines."""
-    content = "line1\nline2\nline3"
-    temp_fs.write_file("multi.md", content)
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("read_content_batch")
-    result = await tool.run({"paths": ["multi.md"], "max_lines": 100})
-    text = str(result.content)
-    assert "line3" in text
-    assert '"truncated":false' in text  # truncated=False
+    assert [r["content"] for r in _payload(result)["results"]] == paths
+    assert stats["peak"] == len(paths)
 
 
-async def test_overwrite_content_tool(mcp_server, temp_fs, mock_context):
+async def test_overwrite_content_tool(mcp_server, temp_fs):
     """Test overwrite_content tool updates an existing file."""
-    tool = await mcp_server.get_tool("overwrite_content")
-    result = await tool.run({"path": "README.md", "content": "# Updated", "sha": _sha("# Root README")})
-    assert "Updated: README.md" in str(result.content)
+    tool = await _get_tool(mcp_server, "overwrite_content")
+    result = await tool.run({"path": "README.md", "content": "# Updated", "sha": _SHA_ROOT_README})
+    assert "Updated: README.md" in result.content[0].text
     assert temp_fs.read_file("README.md") == "# Updated"
 
 
 async def test_delete_content_tool(mcp_server, temp_fs, mock_context):
     """Test delete_content tool deletes a file."""
-    tool = await mcp_server.get_tool("delete_content")
-    result = await tool.run({"path": "README.md", "sha": _sha("# Root README")})
-    assert "Deleted: README.md" in str(result.content)
+    tool = await _get_tool(mcp_server, "delete_content")
+    result = await tool.fn(path="README.md", sha=_SHA_ROOT_README, ctx=mock_context)
+    assert "Deleted: README.md" in result
     assert not temp_fs.file_exists("README.md")
 
 
-async def test_list_content_tool_recursive(mcp_server):
+async def test_list_content_tool_recursive(seeded_mcp):
     """Test list_content tool with recursive option."""
-    tool = await mcp_server.get_tool("list_content")
+    tool = await _get_tool(seeded_mcp, "list_content")
     result = await tool.run({"recursive": True})
-    text = str(result.content)
+    text = result.content[0].text
     assert "README.md" in text
     assert "docs/README.md" in text
     assert "data.json" in text
 
 
-async def test_list_content_tool_non_recursive(mcp_server):
+async def test_list_content_tool_non_recursive(seeded_mcp):
     """Test list_content tool without recursive option."""
-    tool = await mcp_server.get_tool("list_content")
+    tool = await _get_tool(seeded_mcp, "list_content")
     result = await tool.run({"path": "", "recursive": False})
-    text = str(result.content)
+    text = result.content[0].text
     assert "README.md" in text
     assert "docs" in text
 
 
-async def test_move_content_tool(mcp_server, temp_fs, mock_context):
+async def test_move_content_tool(mcp_server, temp_fs):
     """Test move_content tool moves a file."""
-    tool = await mcp_server.get_tool("move_content")
+    tool = await _get_tool(mcp_server, "move_content")
     result = await tool.run({"source_path": "README.md", "dest_path": "moved.md"})
-    assert "Moved: README.md -> moved.md" in str(result.content)
+    assert "Moved: README.md -> moved.md" in result.content[0].text
     assert not temp_fs.file_exists("README.md")
-    assert temp_fs.file_exists("moved.md")
     assert temp_fs.read_file("moved.md") == "# Root README"
 
 
 async def test_move_content_tool_nested_dest(mcp_server, temp_fs, mock_context):
     """Test move_content tool creates missing directories for destination."""
-    tool = await mcp_server.get_tool("move_content")
-    result = await tool.run({"source_path": "data.json", "dest_path": "x/y/z/data.json"})
-    assert "Moved: data.json -> x/y/z/data.json" in str(result.content)
+    tool = await _get_tool(mcp_server, "move_content")
+    result = await tool.fn(
+        source_path="data.json", dest_path="x/y/z/data.json", ctx=mock_context
+    )
+    assert "Moved: data.json -> x/y/z/data.json" in result
     assert not temp_fs.file_exists("data.json")
     assert temp_fs.file_exists("x/y/z/data.json")
 
@@ -447,10 +713,10 @@ async def test_move_content_tool_nested_dest(mcp_server, temp_fs, mock_context):
 # --- Notification tests ---
 
 
-async def test_create_registers_resource(temp_fs, mock_context):
+async def test_create_registers_resource(temp_fs):
     """Test that create_content registers README.md files as resources."""
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("create_content")
+    tool = await _get_tool(mcp, "create_content")
     # Create a README.md file
     await tool.run({"path": "README.md", "content": "# New"})
     resources = await mcp.get_resources()
@@ -466,7 +732,7 @@ async def test_create_registers_resource(temp_fs, mock_context):
 async def test_create_sends_list_changed(temp_fs, mock_context):
     """Test that create_content sends resource_list_changed only for README.md files."""
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("create_content")
+    tool = await _get_tool(mcp, "create_content")
     
     # Creating README.md should send notification
     await tool.run({"path": "README.md", "content": "# New"})
@@ -482,10 +748,10 @@ async def test_create_sends_list_changed(temp_fs, mock_context):
 
 async def test_overwrite_existing_sends_resource_updated(mcp_server, mock_context):
     """Test that overwriting README.md sends resource_updated notification."""
-    tool = await mcp_server.get_tool("overwrite_content")
+    tool = await _get_tool(mcp_server, "overwrite_content")
 
     # Replace README.md should send resource_updated
-    await tool.run({"path": "README.md", "content": "# Changed", "sha": _sha("# Root README")})
+    await tool.run({"path": "README.md", "content": "# Changed", "sha": _SHA_ROOT_README})
     mock_context.session.send_resource_updated.assert_awaited_once()
     call_kwargs = mock_context.session.send_resource_updated.call_args
     assert str(call_kwargs.kwargs["uri"]) == "stash://README.md"
@@ -494,34 +760,34 @@ async def test_overwrite_existing_sends_resource_updated(mcp_server, mock_contex
     mock_context.session.send_resource_updated.reset_mock()
 
     # Replace non-README file should NOT send resource_updated
-    await tool.run({"path": "data.json", "content": '{"updated": true}', "sha": _sha('{"key": "value"}')})
+    await tool.run({"path": "data.json", "content": '{"updated": true}', "sha": _SHA_DATA_JSON})
     mock_context.session.send_resource_updated.assert_not_awaited()
 
 
-async def test_overwrite_content_rejects_nonexistent_file(temp_fs, mock_context):
+async def test_overwrite_content_rejects_nonexistent_file(temp_fs):
     """Test that overwrite_content errors when file does not exist."""
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("overwrite_content")
+    tool = await _get_tool(mcp, "overwrite_content")
 
     with pytest.raises(FileNotFoundError):
         await tool.run({"path": "nonexistent.md", "content": "# New", "sha": "abc"})
 
 
-async def test_overwrite_content_rejects_wrong_sha(mcp_server, temp_fs, mock_context):
+async def test_overwrite_content_rejects_wrong_sha(seeded_mcp):
     """Test that overwrite_content errors when SHA does not match."""
-    tool = await mcp_server.get_tool("overwrite_content")
+    tool = await _get_tool(seeded_mcp, "overwrite_content")
 
     with pytest.raises(ValueError, match="SHA mismatch"):
         await tool.run({"path": "README.md", "content": "# Changed", "sha": "wrong"})
 
 
-async def test_delete_unregisters_resource(mcp_server, temp_fs, mock_context):
+async def test_delete_unregisters_resource(mcp_server, temp_fs):
     """Test that delete_content removes README.md from registry."""
     resources_before = await mcp_server.get_resources()
     assert "stash://README.md" in resources_before
 
-    tool = await mcp_server.get_tool("delete_content")
-    await tool.run({"path": "README.md", "sha": _sha("# Root README")})
+    tool = await _get_tool(mcp_server, "delete_content")
+    await tool.run({"path": "README.md", "sha": _SHA_ROOT_README})
 
     resources_after = await mcp_server.get_resources()
     assert "stash://README.md" not in resources_after
@@ -529,23 +795,23 @@ async def test_delete_unregisters_resource(mcp_server, temp_fs, mock_context):
 
 async def test_delete_sends_list_changed(mcp_server, temp_fs, mock_context):
     """Test that delete_content sends notification only for README.md."""
-    tool = await mcp_server.get_tool("delete_content")
+    tool = await _get_tool(mcp_server, "delete_content")
 
     # Deleting README.md should send notification
-    await tool.run({"path": "README.md", "sha": _sha("# Root README")})
+    await tool.run({"path": "README.md", "sha": _SHA_ROOT_README})
     mock_context.send_resource_list_changed.assert_awaited_once()
 
     # Reset mock
     mock_context.send_resource_list_changed.reset_mock()
 
     # Deleting non-README file should NOT send notification
-    await tool.run({"path": "data.json", "sha": _sha('{"key": "value"}')})
+    await tool.run({"path": "data.json", "sha": _SHA_DATA_JSON})
     mock_context.send_resource_list_changed.assert_not_awaited()
 
 
-async def test_move_updates_resources(mcp_server, temp_fs, mock_context):
+async def test_move_updates_resources(mcp_server, temp_fs):
     """Test that move_content updates resource registry for README.md."""
-    tool = await mcp_server.get_tool("move_content")
+    tool = await _get_tool(mcp_server, "move_content")
     
     # Moving README.md to another README.md location
     await tool.run({"source_path": "README.md", "dest_path": "other/README.md"})
@@ -556,7 +822,7 @@ async def test_move_updates_resources(mcp_server, temp_fs, mock_context):
 
 async def test_move_sends_list_changed(mcp_server, temp_fs, mock_context):
     """Test that move_content sends notification when README.md is involved."""
-    tool = await mcp_server.get_tool("move_content")
+    tool = await _get_tool(mcp_server, "move_content")
     
     # Moving README.md to another location should send notification
     await tool.run({"source_path": "README.md", "dest_path": "other/README.md"})
@@ -570,11 +836,13 @@ async def test_move_sends_list_changed(mcp_server, temp_fs, mock_context):
     mock_context.send_resource_list_changed.assert_not_awaited()
 
 
-async def test_move_content_directory_tool(mcp_server, temp_fs, mock_context):
+async def test_move_content_directory_tool(mcp_server, temp_fs):
     """Test move_content_directory tool moves an entire directory tree."""
-    temp_fs.write_file("srcdir/a.txt", "A")
-    temp_fs.write_file("srcdir/sub/b.txt", "B")
-    tool = await mcp_server.get_tool("move_content_directory")
+    temp_fs.write_files({
+        "srcdir/a.txt": "A",
+        "srcdir/sub/b.txt": "B",
+    })
+    tool = await _get_tool(mcp_server, "move_content_directory")
     result = await tool.run({"source_path": "srcdir", "dest_path": "dstdir"})
     content = result.content
     assert not (temp_fs.content_dir / "srcdir").exists()
@@ -585,16 +853,17 @@ async def test_move_content_directory_tool(mcp_server, temp_fs, mock_context):
 
 async def test_move_content_directory_tool_with_readme(mcp_server, temp_fs, mock_context):
     """Test that move_content_directory updates resource registry for README.md files."""
-    temp_fs.write_file("docs/README.md", "# Docs")
-    temp_fs.write_file("docs/guide.md", "# Guide")
+    temp_fs.write_files({
+        "docs/README.md": "# Docs",
+        "docs/guide.md": "# Guide",
+    })
     # Register the README.md resource first by creating a fresh server
-    from stash_mcp.mcp_server import create_mcp_server
     mcp = create_mcp_server(temp_fs)
     resources_before = await mcp._list_resources()
     uris_before = {str(r.uri) for r in resources_before}
     assert "stash://docs/README.md" in uris_before
 
-    tool = await mcp.get_tool("move_content_directory")
+    tool = await _get_tool(mcp, "move_content_directory")
     await tool.run({"source_path": "docs", "dest_path": "archive/docs"})
 
     resources_after = await mcp._list_resources()
@@ -607,26 +876,27 @@ async def test_move_content_directory_tool_with_readme(mcp_server, temp_fs, mock
 async def test_move_content_directory_tool_no_notification_for_non_readme(temp_fs, mock_context):
     """Test that move_content_directory does not send notification when no README.md is involved."""
     temp_fs.write_file("srcdir/file.txt", "content")
-    from stash_mcp.mcp_server import create_mcp_server
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("move_content_directory")
+    tool = await _get_tool(mcp, "move_content_directory")
     await tool.run({"source_path": "srcdir", "dest_path": "dstdir"})
     mock_context.send_resource_list_changed.assert_not_awaited()
 
 
-async def test_move_content_directory_tool_into_itself(mcp_server, temp_fs, mock_context):
+async def test_move_content_directory_tool_into_itself(mcp_server, temp_fs):
     """Test that move_content_directory rejects moving a directory into a subdirectory of itself."""
     temp_fs.write_file("src/file.txt", "content")
-    tool = await mcp_server.get_tool("move_content_directory")
+    tool = await _get_tool(mcp_server, "move_content_directory")
     with pytest.raises(Exception, match="subdirectory of itself"):
         await tool.run({"source_path": "src", "dest_path": "src/child/src"})
 
 
-async def test_move_content_directory_tool_dest_exists(mcp_server, temp_fs, mock_context):
+async def test_move_content_directory_tool_dest_exists(mcp_server, temp_fs):
     """Test that move_content_directory rejects an already-existing destination."""
-    temp_fs.write_file("src/file.txt", "content")
-    temp_fs.write_file("dst/other.txt", "other")
-    tool = await mcp_server.get_tool("move_content_directory")
+    temp_fs.write_files({
+        "src/file.txt": "content",
+        "dst/other.txt": "other",
+    })
+    tool = await _get_tool(mcp_server, "move_content_directory")
     with pytest.raises(Exception, match="already exists"):
         await tool.run({"source_path": "src", "dest_path": "dst"})
 
@@ -634,20 +904,23 @@ async def test_move_content_directory_tool_dest_exists(mcp_server, temp_fs, mock
 # --- move_content_batch tests ---
 
 
-async def test_move_content_batch_happy_path(mcp_server, temp_fs, mock_context):
+async def test_move_content_batch_happy_path(mcp_server, temp_fs):
     """Test move_content_batch moves multiple files successfully."""
-    temp_fs.write_file("a.txt", "A")
-    temp_fs.write_file("b.txt", "B")
-    tool = await mcp_server.get_tool("move_content_batch")
+    temp_fs.write_files({
+        "a.txt": "A",
+        "b.txt": "B",
+    })
+    tool = await _get_tool(mcp_server, "move_content_batch")
     result = await tool.run({
         "moves": [
             MoveOperation(source_path="a.txt", dest_path="moved_a.txt"),
             MoveOperation(source_path="b.txt", dest_path="moved_b.txt"),
         ],
     })
-    text = str(result.content)
-    assert "moved_a.txt" in text
-    assert "moved_b.txt" in text
+    assert _payload(result)["results"] == [
+        {"source": "a.txt", "destination": "moved_a.txt", "result": "ok"},
+        {"source": "b.txt", "destination": "moved_b.txt", "result": "ok"},
+    ]
     assert not temp_fs.file_exists("a.txt")
     assert not temp_fs.file_exists("b.txt")
     assert temp_fs.file_exists("moved_a.txt")
@@ -656,25 +929,24 @@ async def test_move_content_batch_happy_path(mcp_server, temp_fs, mock_context):
     assert temp_fs.read_file("moved_b.txt") == "B"
 
 
-async def test_move_content_batch_empty_list(mcp_server, temp_fs, mock_context):
+async def test_move_content_batch_empty_list(seeded_mcp):
     """Test move_content_batch rejects an empty list."""
-    tool = await mcp_server.get_tool("move_content_batch")
+    tool = await _get_tool(seeded_mcp, "move_content_batch")
     with pytest.raises(ValueError, match="At least one move operation is required"):
         await tool.run({"moves": []})
 
 
-async def test_move_content_batch_over_limit(mcp_server, temp_fs, mock_context):
+async def test_move_content_batch_over_limit(seeded_mcp):
     """Test move_content_batch rejects more than 10 moves."""
-    tool = await mcp_server.get_tool("move_content_batch")
-    moves = [MoveOperation(source_path=f"src{i}.txt", dest_path=f"dst{i}.txt") for i in range(11)]
+    tool = await _get_tool(seeded_mcp, "move_content_batch")
     with pytest.raises(ValueError, match="Maximum 10 moves per batch"):
-        await tool.run({"moves": moves})
+        await tool.run({"moves": list(_OVERLIMIT_MOVES)})
 
 
-async def test_move_content_batch_duplicate_sources(mcp_server, temp_fs, mock_context):
+async def test_move_content_batch_duplicate_sources(mcp_server, temp_fs):
     """Test move_content_batch rejects duplicate source paths."""
     temp_fs.write_file("a.txt", "A")
-    tool = await mcp_server.get_tool("move_content_batch")
+    tool = await _get_tool(mcp_server, "move_content_batch")
     with pytest.raises(ValueError, match="Duplicate source paths"):
         await tool.run({
             "moves": [
@@ -684,11 +956,13 @@ async def test_move_content_batch_duplicate_sources(mcp_server, temp_fs, mock_co
         })
 
 
-async def test_move_content_batch_duplicate_destinations(mcp_server, temp_fs, mock_context):
+async def test_move_content_batch_duplicate_destinations(mcp_server, temp_fs):
     """Test move_content_batch rejects duplicate destination paths."""
-    temp_fs.write_file("a.txt", "A")
-    temp_fs.write_file("b.txt", "B")
-    tool = await mcp_server.get_tool("move_content_batch")
+    temp_fs.write_files({
+        "a.txt": "A",
+        "b.txt": "B",
+    })
+    tool = await _get_tool(mcp_server, "move_content_batch")
     with pytest.raises(ValueError, match="Duplicate destination paths"):
         await tool.run({
             "moves": [
@@ -698,11 +972,13 @@ async def test_move_content_batch_duplicate_destinations(mcp_server, temp_fs, mo
         })
 
 
-async def test_move_content_batch_source_dest_overlap(mcp_server, temp_fs, mock_context):
+async def test_move_content_batch_source_dest_overlap(mcp_server, temp_fs):
     """Test move_content_batch rejects paths that appear as both source and destination."""
-    temp_fs.write_file("a.txt", "A")
-    temp_fs.write_file("b.txt", "B")
-    tool = await mcp_server.get_tool("move_content_batch")
+    temp_fs.write_files({
+        "a.txt": "A",
+        "b.txt": "B",
+    })
+    tool = await _get_tool(mcp_server, "move_content_batch")
     with pytest.raises(ValueError, match="both source and destination"):
         await tool.run({
             "moves": [
@@ -712,9 +988,9 @@ async def test_move_content_batch_source_dest_overlap(mcp_server, temp_fs, mock_
         })
 
 
-async def test_move_content_batch_missing_source(mcp_server, temp_fs, mock_context):
+async def test_move_content_batch_missing_source(seeded_mcp):
     """Test move_content_batch rejects a missing source file."""
-    tool = await mcp_server.get_tool("move_content_batch")
+    tool = await _get_tool(seeded_mcp, "move_content_batch")
     with pytest.raises(ValueError, match="Source file not found"):
         await tool.run({
             "moves": [
@@ -723,11 +999,13 @@ async def test_move_content_batch_missing_source(mcp_server, temp_fs, mock_conte
         })
 
 
-async def test_move_content_batch_dest_exists(mcp_server, temp_fs, mock_context):
+async def test_move_content_batch_dest_exists(mcp_server, temp_fs):
     """Test move_content_batch rejects when destination already exists."""
-    temp_fs.write_file("src.txt", "source")
-    temp_fs.write_file("dst.txt", "destination")
-    tool = await mcp_server.get_tool("move_content_batch")
+    temp_fs.write_files({
+        "src.txt": "source",
+        "dst.txt": "destination",
+    })
+    tool = await _get_tool(mcp_server, "move_content_batch")
     with pytest.raises(ValueError, match="Destination already exists"):
         await tool.run({
             "moves": [
@@ -736,10 +1014,10 @@ async def test_move_content_batch_dest_exists(mcp_server, temp_fs, mock_context)
         })
 
 
-async def test_move_content_batch_validation_all_or_nothing(mcp_server, temp_fs, mock_context):
+async def test_move_content_batch_validation_all_or_nothing(mcp_server, temp_fs):
     """Test move_content_batch aborts all moves when any validation fails."""
     temp_fs.write_file("a.txt", "A")
-    tool = await mcp_server.get_tool("move_content_batch")
+    tool = await _get_tool(mcp_server, "move_content_batch")
     with pytest.raises(ValueError):
         await tool.run({
             "moves": [
@@ -752,12 +1030,14 @@ async def test_move_content_batch_validation_all_or_nothing(mcp_server, temp_fs,
     assert not temp_fs.file_exists("moved_a.txt")
 
 
-async def test_move_content_batch_resource_registration(temp_fs, mock_context):
+async def test_move_content_batch_resource_registration(temp_fs):
     """Test move_content_batch updates resource registry for README.md files."""
-    temp_fs.write_file("README.md", "# Root")
-    temp_fs.write_file("docs/README.md", "# Docs")
+    temp_fs.write_files({
+        "README.md": "# Root",
+        "docs/README.md": "# Docs",
+    })
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("move_content_batch")
+    tool = await _get_tool(mcp, "move_content_batch")
     await tool.run({
         "moves": [
             MoveOperation(source_path="README.md", dest_path="archive/README.md"),
@@ -776,7 +1056,7 @@ async def test_move_content_batch_sends_resource_list_changed(temp_fs, mock_cont
     """Test move_content_batch sends resource_list_changed when README.md is involved."""
     temp_fs.write_file("README.md", "# Root")
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("move_content_batch")
+    tool = await _get_tool(mcp, "move_content_batch")
     await tool.run({
         "moves": [
             MoveOperation(source_path="README.md", dest_path="archive/README.md"),
@@ -789,7 +1069,7 @@ async def test_move_content_batch_no_notification_for_non_readme(temp_fs, mock_c
     """Test move_content_batch does not send notification when no README.md is involved."""
     temp_fs.write_file("a.txt", "A")
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("move_content_batch")
+    tool = await _get_tool(mcp, "move_content_batch")
     await tool.run({
         "moves": [
             MoveOperation(source_path="a.txt", dest_path="moved_a.txt"),
@@ -798,80 +1078,71 @@ async def test_move_content_batch_no_notification_for_non_readme(temp_fs, mock_c
     mock_context.send_resource_list_changed.assert_not_awaited()
 
 
-async def test_move_content_batch_emits_events(temp_fs, mock_context):
+async def test_move_content_batch_emits_events(temp_fs, captured_emits):
     """Test move_content_batch emits CONTENT_MOVED events for each file."""
-    temp_fs.write_file("a.txt", "A")
-    temp_fs.write_file("b.txt", "B")
+    temp_fs.write_files({
+        "a.txt": "A",
+        "b.txt": "B",
+    })
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("move_content_batch")
-    with patch("stash_mcp.mcp_server.emit") as mock_emit:
-        await tool.run({
-            "moves": [
-                MoveOperation(source_path="a.txt", dest_path="moved_a.txt"),
-                MoveOperation(source_path="b.txt", dest_path="moved_b.txt"),
-            ],
-        })
-    assert mock_emit.call_count == 2
-    mock_emit.assert_any_call("content_moved", "moved_a.txt", source_path="a.txt")
-    mock_emit.assert_any_call("content_moved", "moved_b.txt", source_path="b.txt")
+    tool = await _get_tool(mcp, "move_content_batch")
+    await tool.run({
+        "moves": [
+            MoveOperation(source_path="a.txt", dest_path="moved_a.txt"),
+            MoveOperation(source_path="b.txt", dest_path="moved_b.txt"),
+        ],
+    })
+    assert captured_emits == [
+        ("content_moved", "moved_a.txt", {"source_path": "a.txt"}),
+        ("content_moved", "moved_b.txt", {"source_path": "b.txt"}),
+    ]
 
 
-async def test_tools_emit_events(mcp_server, temp_fs, mock_context):
+async def test_tools_emit_events(mcp_server, captured_emits):
     """Test that MCP tools emit events via the event bus."""
-    with patch("stash_mcp.mcp_server.emit") as mock_emit:
-        # Test create
-        tool = await mcp_server.get_tool("create_content")
-        await tool.run({"path": "evt.md", "content": "event test"})
-        mock_emit.assert_called_with("content_created", "evt.md")
-
-        mock_emit.reset_mock()
-
-        # Test overwrite (existing file)
-        tool = await mcp_server.get_tool("overwrite_content")
-        await tool.run({"path": "evt.md", "content": "updated", "sha": _sha("event test")})
-        mock_emit.assert_called_with("content_updated", "evt.md")
-
-        mock_emit.reset_mock()
-
-        # Test move
-        tool = await mcp_server.get_tool("move_content")
-        await tool.run({"source_path": "evt.md", "dest_path": "evt2.md"})
-        mock_emit.assert_called_with("content_moved", "evt2.md", source_path="evt.md")
-
-        mock_emit.reset_mock()
-
-        # Test delete
-        tool = await mcp_server.get_tool("delete_content")
-        await tool.run({"path": "evt2.md", "sha": _sha("updated")})
-        mock_emit.assert_called_with("content_deleted", "evt2.md")
+    # Each step acts on the file left by the previous one.
+    steps = [
+        ("create_content", {"path": "evt.md", "content": "event test"},
+         ("content_created", "evt.md", {})),
+        ("overwrite_content", {"path": "evt.md", "content": "updated", "sha": _SHA_EVENT_TEST},
+         ("content_updated", "evt.md", {})),
+        ("move_content", {"source_path": "evt.md", "dest_path": "evt2.md"},
+         ("content_moved", "evt2.md", {"source_path": "evt.md"})),
+        ("delete_content", {"path": "evt2.md", "sha": _sha("updated")},
+         ("content_deleted", "evt2.md", {})),
+    ]
+    for name, args, expected in steps:
+        tool = await _get_tool(mcp_server, name)
+        await tool.run(args)
+        assert captured_emits == [expected], name
+        captured_emits.clear()
 
 
 # --- edit_content tests ---
 
 
-async def test_edit_content_single_replacement(mcp_server, temp_fs, mock_context):
+async def test_edit_content_single_replacement(mcp_server, temp_fs):
     """Test edit_content with a single replacement."""
-    tool = await mcp_server.get_tool("edit_content")
-    original = "# Root README"
+    tool = await _get_tool(mcp_server, "edit_content")
     result = await tool.run({
         "file_path": "README.md",
-        "sha": _sha(original),
+        "sha": _SHA_ROOT_README,
         "edits": [EditOperation(old_string="Root", new_string="Updated")],
     })
-    text = str(result.content)
-    assert '"result": "ok"' in text or "ok" in text
     assert temp_fs.read_file("README.md") == "# Updated README"
-    new_sha = _sha("# Updated README")
-    assert new_sha in text
+    data = _payload(result)
+    assert data == {
+        "path": "README.md", "result": "ok", "new_sha": _sha("# Updated README"),
+    }
+    assert data["new_sha"] == _sha_file(temp_fs.content_dir / "README.md")
 
 
-async def test_edit_content_multiple_sequential_edits(mcp_server, temp_fs, mock_context):
+async def test_edit_content_multiple_sequential_edits(mcp_server, temp_fs):
     """Test edit_content with multiple edits applied sequentially."""
-    tool = await mcp_server.get_tool("edit_content")
-    original = "# Root README"
+    tool = await _get_tool(mcp_server, "edit_content")
     result = await tool.run({
         "file_path": "README.md",
-        "sha": _sha(original),
+        "sha": _SHA_ROOT_README,
         "edits": [
             EditOperation(old_string="Root", new_string="My"),
             EditOperation(old_string="README", new_string="Document"),
@@ -880,22 +1151,22 @@ async def test_edit_content_multiple_sequential_edits(mcp_server, temp_fs, mock_
     assert temp_fs.read_file("README.md") == "# My Document"
 
 
-async def test_edit_content_replace_all(mcp_server, temp_fs, mock_context):
+async def test_edit_content_replace_all(mcp_server, temp_fs):
     """Test edit_content with replace_all=True for multiple occurrences."""
-    temp_fs.write_file("repeat.md", "foo bar foo baz foo")
+    temp_fs.write_file("repeat.md", _REPEAT)
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("edit_content")
+    tool = await _get_tool(mcp, "edit_content")
     await tool.run({
         "file_path": "repeat.md",
-        "sha": _sha("foo bar foo baz foo"),
+        "sha": _SHA_REPEAT,
         "edits": [EditOperation(old_string="foo", new_string="qux", replace_all=True)],
     })
     assert temp_fs.read_file("repeat.md") == "qux bar qux baz qux"
 
 
-async def test_edit_content_wrong_sha(mcp_server, temp_fs, mock_context):
+async def test_edit_content_wrong_sha(seeded_mcp):
     """Test edit_content rejects wrong SHA."""
-    tool = await mcp_server.get_tool("edit_content")
+    tool = await _get_tool(seeded_mcp, "edit_content")
     with pytest.raises(ValueError, match="SHA mismatch"):
         await tool.run({
             "file_path": "README.md",
@@ -904,22 +1175,22 @@ async def test_edit_content_wrong_sha(mcp_server, temp_fs, mock_context):
         })
 
 
-async def test_edit_content_old_string_not_found(mcp_server, temp_fs, mock_context):
+async def test_edit_content_old_string_not_found(seeded_mcp):
     """Test edit_content raises when old_string is not in file."""
-    tool = await mcp_server.get_tool("edit_content")
+    tool = await _get_tool(seeded_mcp, "edit_content")
     with pytest.raises(ValueError, match="old_string not found"):
         await tool.run({
             "file_path": "README.md",
-            "sha": _sha("# Root README"),
-            "edits": [EditOperation(old_string="NONEXISTENT", new_string="X")],
+            "sha": _SHA_ROOT_README,
+            "edits": [_EDIT_NOT_FOUND],
         })
 
 
-async def test_edit_content_ambiguous_match(mcp_server, temp_fs, mock_context):
+async def test_edit_content_ambiguous_match(mcp_server, temp_fs):
     """Test edit_content raises on ambiguous match when replace_all=False."""
     temp_fs.write_file("dup.md", "aaa bbb aaa")
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("edit_content")
+    tool = await _get_tool(mcp, "edit_content")
     with pytest.raises(ValueError, match="appears 2 times"):
         await tool.run({
             "file_path": "dup.md",
@@ -928,9 +1199,9 @@ async def test_edit_content_ambiguous_match(mcp_server, temp_fs, mock_context):
         })
 
 
-async def test_edit_content_nonexistent_file(mcp_server, temp_fs, mock_context):
+async def test_edit_content_nonexistent_file(seeded_mcp):
     """Test edit_content raises FileNotFoundError for missing file."""
-    tool = await mcp_server.get_tool("edit_content")
+    tool = await _get_tool(seeded_mcp, "edit_content")
     with pytest.raises(FileNotFoundError):
         await tool.run({
             "file_path": "nonexistent.md",
@@ -941,12 +1212,12 @@ async def test_edit_content_nonexistent_file(mcp_server, temp_fs, mock_context):
 
 async def test_edit_content_sends_resource_updated_for_readme(mcp_server, temp_fs, mock_context):
     """Test edit_content sends resource_updated for README.md but not other files."""
-    tool = await mcp_server.get_tool("edit_content")
+    tool = await _get_tool(mcp_server, "edit_content")
 
     # Edit README.md should send resource_updated
     await tool.run({
         "file_path": "README.md",
-        "sha": _sha("# Root README"),
+        "sha": _SHA_ROOT_README,
         "edits": [EditOperation(old_string="Root", new_string="Edited")],
     })
     mock_context.session.send_resource_updated.assert_awaited_once()
@@ -956,61 +1227,55 @@ async def test_edit_content_sends_resource_updated_for_readme(mcp_server, temp_f
     # Edit non-README file should NOT send resource_updated
     await tool.run({
         "file_path": "data.json",
-        "sha": _sha('{"key": "value"}'),
+        "sha": _SHA_DATA_JSON,
         "edits": [EditOperation(old_string="value", new_string="updated")],
     })
     mock_context.session.send_resource_updated.assert_not_awaited()
 
 
-async def test_edit_content_emits_event(mcp_server, temp_fs, mock_context):
+async def test_edit_content_emits_event(mcp_server, temp_fs, captured_emits):
     """Test edit_content emits CONTENT_UPDATED event."""
-    with patch("stash_mcp.mcp_server.emit") as mock_emit:
-        tool = await mcp_server.get_tool("edit_content")
-        await tool.run({
-            "file_path": "README.md",
-            "sha": _sha("# Root README"),
-            "edits": [EditOperation(old_string="Root", new_string="Evt")],
-        })
-        mock_emit.assert_called_with("content_updated", "README.md")
+    tool = await _get_tool(mcp_server, "edit_content")
+    await tool.run({
+        "file_path": "README.md",
+        "sha": _SHA_ROOT_README,
+        "edits": [EditOperation(old_string="Root", new_string="Evt")],
+    })
+    assert captured_emits[-1] == ("content_updated", "README.md", {})
 
 
 # --- edit_content_batch tests ---
 
 
-async def test_edit_content_batch_two_files(mcp_server, temp_fs, mock_context):
+async def test_edit_content_batch_two_files(mcp_server, temp_fs):
     """Test edit_content_batch edits two files successfully."""
-    tool = await mcp_server.get_tool("edit_content_batch")
+    tool = await _get_tool(mcp_server, "edit_content_batch")
     result = await tool.run({
         "edit_operations": [
             FileEditOperation(
                 file_path="README.md",
-                sha=_sha("# Root README"),
+                sha=_SHA_ROOT_README,
                 edits=[EditOperation(old_string="Root", new_string="Multi")],
             ),
             FileEditOperation(
                 file_path="data.json",
-                sha=_sha('{"key": "value"}'),
+                sha=_SHA_DATA_JSON,
                 edits=[EditOperation(old_string="value", new_string="new_value")],
             ),
         ],
     })
     assert temp_fs.read_file("README.md") == "# Multi README"
     assert temp_fs.read_file("data.json") == '{"key": "new_value"}'
-    text = str(result.content)
-    assert "ok" in text
+    assert [r["result"] for r in _payload(result)["results"]] == ["ok", "ok"]
 
 
-async def test_edit_content_batch_atomicity_bad_sha(mcp_server, temp_fs, mock_context):
+async def test_edit_content_batch_atomicity_bad_sha(mcp_server, temp_fs):
     """Test edit_content_batch aborts all if one file has bad SHA."""
-    tool = await mcp_server.get_tool("edit_content_batch")
+    tool = await _get_tool(mcp_server, "edit_content_batch")
     with pytest.raises(ValueError, match="SHA mismatch"):
         await tool.run({
             "edit_operations": [
-                FileEditOperation(
-                    file_path="README.md",
-                    sha=_sha("# Root README"),
-                    edits=[EditOperation(old_string="Root", new_string="Changed")],
-                ),
+                _FILE_EDIT_ROOT_CHANGED,
                 FileEditOperation(
                     file_path="data.json",
                     sha="wrong_sha",
@@ -1023,21 +1288,17 @@ async def test_edit_content_batch_atomicity_bad_sha(mcp_server, temp_fs, mock_co
     assert temp_fs.read_file("data.json") == '{"key": "value"}'
 
 
-async def test_edit_content_batch_atomicity_bad_edit(mcp_server, temp_fs, mock_context):
+async def test_edit_content_batch_atomicity_bad_edit(mcp_server, temp_fs):
     """Test edit_content_batch aborts all if one file's edit fails."""
-    tool = await mcp_server.get_tool("edit_content_batch")
+    tool = await _get_tool(mcp_server, "edit_content_batch")
     with pytest.raises(ValueError, match="old_string not found"):
         await tool.run({
             "edit_operations": [
-                FileEditOperation(
-                    file_path="README.md",
-                    sha=_sha("# Root README"),
-                    edits=[EditOperation(old_string="Root", new_string="Changed")],
-                ),
+                _FILE_EDIT_ROOT_CHANGED,
                 FileEditOperation(
                     file_path="data.json",
-                    sha=_sha('{"key": "value"}'),
-                    edits=[EditOperation(old_string="NONEXISTENT", new_string="x")],
+                    sha=_SHA_DATA_JSON,
+                    edits=[_EDIT_NOT_FOUND],
                 ),
             ],
         })
@@ -1046,53 +1307,56 @@ async def test_edit_content_batch_atomicity_bad_edit(mcp_server, temp_fs, mock_c
     assert temp_fs.read_file("data.json") == '{"key": "value"}'
 
 
-async def test_edit_content_batch_duplicate_paths(mcp_server, temp_fs, mock_context):
+async def test_edit_content_batch_duplicate_paths(seeded_mcp):
     """Test edit_content_batch rejects duplicate file paths."""
-    tool = await mcp_server.get_tool("edit_content_batch")
+    tool = await _get_tool(seeded_mcp, "edit_content_batch")
     with pytest.raises(ValueError, match="Duplicate"):
         await tool.run({
             "edit_operations": [
                 FileEditOperation(
                     file_path="README.md",
-                    sha=_sha("# Root README"),
+                    sha=_SHA_ROOT_README,
                     edits=[EditOperation(old_string="Root", new_string="A")],
                 ),
                 FileEditOperation(
                     file_path="README.md",
-                    sha=_sha("# Root README"),
+                    sha=_SHA_ROOT_README,
                     edits=[EditOperation(old_string="Root", new_string="B")],
                 ),
             ],
         })
 
 
-async def test_edit_content_batch_returns_per_file_results(mcp_server, temp_fs, mock_context):
+async def test_edit_content_batch_returns_per_file_results(mcp_server, temp_fs):
     """Test edit_content_batch returns correct per-file result structure."""
-    tool = await mcp_server.get_tool("edit_content_batch")
+    tool = await _get_tool(mcp_server, "edit_content_batch")
     result = await tool.run({
         "edit_operations": [
             FileEditOperation(
                 file_path="README.md",
-                sha=_sha("# Root README"),
+                sha=_SHA_ROOT_README,
                 edits=[EditOperation(old_string="Root", new_string="Result")],
             ),
             FileEditOperation(
                 file_path="data.json",
-                sha=_sha('{"key": "value"}'),
+                sha=_SHA_DATA_JSON,
                 edits=[EditOperation(old_string="value", new_string="done")],
             ),
         ],
     })
-    text = str(result.content)
-    assert "README.md" in text
-    assert "data.json" in text
-    assert _sha("# Result README") in text
-    assert _sha('{"key": "done"}') in text
+    results = _payload(result)["results"]
+    assert results == [
+        {"path": "README.md", "result": "ok", "new_sha": _sha("# Result README")},
+        {"path": "data.json", "result": "ok", "new_sha": _sha('{"key": "done"}')},
+    ]
+    # The reported SHAs describe the bytes that actually landed on disk.
+    for r in results:
+        assert r["new_sha"] == _sha_file(temp_fs.content_dir / r["path"])
 
 
 # --- Read-only mode tests ---
 
-WRITE_TOOL_NAMES = {
+WRITE_TOOL_NAMES = frozenset({
     "create_content",
     "overwrite_content",
     "edit_content",
@@ -1101,68 +1365,49 @@ WRITE_TOOL_NAMES = {
     "move_content",
     "move_content_directory",
     "move_content_batch",
-}
+})
 # search_content is omitted here because it is only registered when a
 # search_engine is passed to create_mcp_server(); it is not a write tool.
-READ_TOOL_NAMES = {"read_content", "read_content_batch", "list_content"}
+READ_TOOL_NAMES = frozenset({"read_content", "read_content_batch", "list_content"})
 
 
 async def test_read_only_mode_omits_write_tools(temp_fs):
     """Test that write tools are not registered when READ_ONLY=True."""
     with patch("stash_mcp.mcp_server.Config.READ_ONLY", True):
         mcp = create_mcp_server(temp_fs)
-        tools = await mcp.list_tools()
-        tool_names = {t.name for t in tools}
-        for name in WRITE_TOOL_NAMES:
-            assert name not in tool_names, f"Write tool '{name}' should not be in read-only mode"
-        for name in READ_TOOL_NAMES:
-            assert name in tool_names, f"Read tool '{name}' should be registered in read-only mode"
+        tool_names = set(await mcp.get_tools())
+        leaked = WRITE_TOOL_NAMES & tool_names
+        assert not leaked, f"Write tools {sorted(leaked)} should not be in read-only mode"
+        missing = READ_TOOL_NAMES - tool_names
+        assert not missing, f"Read tools {sorted(missing)} should be registered in read-only mode"
 
 
 async def test_default_mode_includes_all_tools(temp_fs):
     """Test that all tools are registered when READ_ONLY=False (default)."""
     with patch("stash_mcp.mcp_server.Config.READ_ONLY", False):
         mcp = create_mcp_server(temp_fs)
-        tools = await mcp.list_tools()
-        tool_names = {t.name for t in tools}
-        for name in WRITE_TOOL_NAMES | READ_TOOL_NAMES:
-            assert name in tool_names, f"Tool '{name}' should be registered in default mode"
+        tool_names = set(await mcp.get_tools())
+        missing = (WRITE_TOOL_NAMES | READ_TOOL_NAMES) - tool_names
+        assert not missing, f"Tools {sorted(missing)} should be registered in default mode"
 
 
 # --- Server name config tests ---
 
 
-def test_server_name_from_env():
-    """Test that STASH_SERVER_NAME env var is reflected in Config.SERVER_NAME."""
-    import importlib
-
-    import stash_mcp.config as config_module
-
-    with patch.dict("os.environ", {"STASH_SERVER_NAME": "my-custom-server"}):
-        importlib.reload(config_module)
-        assert config_module.Config.SERVER_NAME == "my-custom-server"
-    importlib.reload(config_module)
-
-
-def test_server_name_default():
-    """Test that SERVER_NAME defaults to 'stash-mcp' when env var is not set."""
-    import importlib
-    import os
+def test_server_name_from_env(monkeypatch):
+    """Test that Config.SERVER_NAME reads STASH_SERVER_NAME when accessed."""
+    monkeypatch.delenv("STASH_SERVER_NAME", raising=False)
+    assert Config.SERVER_NAME == "stash-mcp"
 
-    import stash_mcp.config as config_module
+    monkeypatch.setenv("STASH_SERVER_NAME", "my-custom-server")
+    assert Config.SERVER_NAME == "my-custom-server"
 
-    env = {k: v for k, v in os.environ.items() if k != "STASH_SERVER_NAME"}
-    with patch.dict("os.environ", env, clear=True):
-        importlib.reload(config_module)
-        assert config_module.Config.SERVER_NAME == "stash-mcp"
-    importlib.reload(config_module)
 
-
-async def test_server_name_used_in_mcp_server(temp_fs):
+async def test_server_name_used_in_mcp_server(temp_fs, monkeypatch):
     """Test that the MCP server uses Config.SERVER_NAME."""
-    with patch("stash_mcp.mcp_server.Config.SERVER_NAME", "test-server"):
-        mcp = create_mcp_server(temp_fs)
-        assert mcp.name == "test-server"
+    monkeypatch.setattr("stash_mcp.mcp_server.Config.SERVER_NAME", "test-server")
+    mcp = create_mcp_server(temp_fs)
+    assert mcp.name == "test-server"
 
 
 # --- inspect_content_structure tests ---
@@ -1231,185 +1476,154 @@ def test_build_heading_tree_multiple_top_level():
     assert tree[1]["heading"] == "B"
 
 
-async def test_inspect_content_structure_tool_typical(temp_fs):
+async def test_inspect_content_structure_tool_typical(shared_mcp):
     """Test inspect_content_structure returns correct nested structure."""
-    content = "# Title\n\n## Section 1\n\n### Subsection\n\n## Section 2\n"
-    temp_fs.write_file("doc.md", content)
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure")
+    tool = await _get_tool(shared_mcp, "inspect_content_structure")
     result = await tool.run({"path": "doc.md"})
-    text = str(result.content)
-    assert "Title" in text
-    assert "Section 1" in text
-    assert "Subsection" in text
-    assert "Section 2" in text
+    data = _payload(result)
+    assert data["title"] == "Title"
+    (title,) = data["sections"]
+    assert title["heading"] == "Title"
+    assert [c["heading"] for c in title["children"]] == ["Section 1", "Section 2"]
+    assert [c["heading"] for c in title["children"][0]["children"]] == ["Subsection"]
 
 
-async def test_inspect_content_structure_tool_title_field(temp_fs):
+async def test_inspect_content_structure_tool_title_field(shared_mcp):
     """Test inspect_content_structure returns title from first h1."""
-    temp_fs.write_file("titled.md", "# My Title\n\n## Sub\n")
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure")
+    tool = await _get_tool(shared_mcp, "inspect_content_structure")
     result = await tool.run({"path": "titled.md"})
-    text = str(result.content)
-    assert '"title":"My Title"' in text or "My Title" in text
+    assert _payload(result)["title"] == "My Title"
 
 
-async def test_inspect_content_structure_tool_no_h1_title_null(temp_fs):
+async def test_inspect_content_structure_tool_no_h1_title_null(shared_mcp):
     """Test inspect_content_structure returns null title when no h1 exists."""
-    temp_fs.write_file("no_h1.md", "## Section\n\n### Subsection\n")
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure")
+    tool = await _get_tool(shared_mcp, "inspect_content_structure")
     result = await tool.run({"path": "no_h1.md"})
-    text = str(result.content)
-    assert '"title":null' in text
+    assert _payload(result)["title"] is None
 
 
-async def test_inspect_content_structure_tool_rejects_non_markdown(temp_fs):
+async def test_inspect_content_structure_tool_rejects_non_markdown(shared_mcp):
     """Test inspect_content_structure raises ValueError for non-markdown files."""
-    temp_fs.write_file("data.json", '{"key": "value"}')
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure")
+    tool = await _get_tool(shared_mcp, "inspect_content_structure")
     with pytest.raises(ValueError, match="only supports markdown files"):
         await tool.run({"path": "data.json"})
 
 
-async def test_inspect_content_structure_tool_file_not_found(temp_fs):
+async def test_inspect_content_structure_tool_file_not_found(shared_mcp):
     """Test inspect_content_structure raises FileNotFoundError for missing files."""
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure")
+    tool = await _get_tool(shared_mcp, "inspect_content_structure")
     with pytest.raises(FileNotFoundError):
         await tool.run({"path": "missing.md"})
 
 
-async def test_inspect_content_structure_tool_path_in_result(temp_fs):
+async def test_inspect_content_structure_tool_path_in_result(shared_mcp):
     """Test inspect_content_structure includes the path in the result."""
-    temp_fs.write_file("docs/guide.md", "# Guide\n")
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure")
+    tool = await _get_tool(shared_mcp, "inspect_content_structure")
     result = await tool.run({"path": "docs/guide.md"})
-    text = str(result.content)
-    assert "docs/guide.md" in text
+    assert _payload(result)["path"] == "docs/guide.md"
 
 
 # --- inspect_content_structure_batch tests ---
 
 
-@pytest.mark.anyio
-async def test_inspect_content_structure_batch_happy_path(temp_fs):
+async def test_inspect_content_structure_batch_happy_path(shared_mcp):
     """Test inspect_content_structure_batch returns structure for multiple files."""
-    temp_fs.write_file("a.md", "# Alpha\n\n## Section A\n")
-    temp_fs.write_file("b.md", "# Beta\n\n## Section B\n")
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure_batch")
+    tool = await _get_tool(shared_mcp, "inspect_content_structure_batch")
     result = await tool.run({"paths": ["a.md", "b.md"]})
-    text = str(result.content)
-    assert "Alpha" in text
-    assert "Beta" in text
-    assert "Section A" in text
-    assert "Section B" in text
+    results = _payload(result)["results"]
+    assert [r["title"] for r in results] == ["Alpha", "Beta"]
+    assert [r["sections"][0]["children"][0]["heading"] for r in results] == [
+        "Section A", "Section B",
+    ]
+    assert all(r["error"] is None for r in results)
 
 
-@pytest.mark.anyio
-async def test_inspect_content_structure_batch_empty_list(temp_fs):
+async def test_inspect_content_structure_batch_empty_list(shared_mcp):
     """Test inspect_content_structure_batch rejects empty path list."""
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure_batch")
+    tool = await _get_tool(shared_mcp, "inspect_content_structure_batch")
     with pytest.raises(ValueError, match="At least one path is required"):
         await tool.run({"paths": []})
 
 
-@pytest.mark.anyio
-async def test_inspect_content_structure_batch_over_limit(temp_fs):
+async def test_inspect_content_structure_batch_over_limit(shared_mcp):
     """Test inspect_content_structure_batch rejects more than 10 paths."""
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure_batch")
-    paths = [f"file{i}.md" for i in range(11)]
+    tool = await _get_tool(shared_mcp, "inspect_content_structure_batch")
     with pytest.raises(ValueError, match="Maximum 10 files per batch"):
-        await tool.run({"paths": paths})
+        await tool.run({"paths": list(_OVERLIMIT_PATHS)})
 
 
-@pytest.mark.anyio
-async def test_inspect_content_structure_batch_duplicate_paths(temp_fs):
+async def test_inspect_content_structure_batch_duplicate_paths(shared_mcp):
     """Test inspect_content_structure_batch rejects duplicate paths."""
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure_batch")
+    tool = await _get_tool(shared_mcp, "inspect_content_structure_batch")
     with pytest.raises(ValueError, match="Duplicate paths are not allowed"):
         await tool.run({"paths": ["a.md", "a.md"]})
 
 
-@pytest.mark.anyio
-async def test_inspect_content_structure_batch_partial_failure(temp_fs):
+async def test_inspect_content_structure_batch_partial_failure(shared_mcp):
     """Test inspect_content_structure_batch returns error for missing files without aborting."""
-    temp_fs.write_file("exists.md", "# Exists\n")
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure_batch")
+    tool = await _get_tool(shared_mcp, "inspect_content_structure_batch")
     result = await tool.run({"paths": ["exists.md", "missing.md"]})
-    text = str(result.content)
-    assert "Exists" in text
-    assert "missing.md" in text
-    assert "error" in text.lower()
+    ok, missing = _payload(result)["results"]
+    assert ok["title"] == "Exists"
+    assert ok["error"] is None
+    assert missing["path"] == "missing.md"
+    assert missing["sections"] is None
+    assert missing["error"]
 
 
-@pytest.mark.anyio
-async def test_inspect_content_structure_batch_non_markdown(temp_fs):
+async def test_inspect_content_structure_batch_non_markdown(shared_mcp):
     """Test inspect_content_structure_batch returns error for non-markdown files without aborting."""
-    temp_fs.write_file("doc.md", "# Doc\n")
-    temp_fs.write_file("data.json", '{"key": "value"}')
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure_batch")
+    tool = await _get_tool(shared_mcp, "inspect_content_structure_batch")
     result = await tool.run({"paths": ["doc.md", "data.json"]})
-    text = str(result.content)
-    assert "Doc" in text
-    assert "only supports markdown files" in text
+    doc, data = _payload(result)["results"]
+    assert doc["title"] == "Title"
+    assert "only supports markdown files" in data["error"]
 
 
-@pytest.mark.anyio
-async def test_inspect_content_structure_batch_order_preserved(temp_fs):
+async def test_inspect_content_structure_batch_order_preserved(shared_mcp):
     """Test inspect_content_structure_batch preserves result order matching input paths."""
-    temp_fs.write_file("first.md", "# First\n")
-    temp_fs.write_file("second.md", "# Second\n")
-    temp_fs.write_file("third.md", "# Third\n")
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure_batch")
-    import json
+    tool = await _get_tool(shared_mcp, "inspect_content_structure_batch")
     result = await tool.run({"paths": ["third.md", "first.md", "second.md"]})
-    data = json.loads(str(result.content[0].text))
+    data = _payload(result)
     paths = [r["path"] for r in data["results"]]
     assert paths == ["third.md", "first.md", "second.md"]
 
 
-@pytest.mark.anyio
-async def test_inspect_content_structure_batch_title_field(temp_fs):
-    """Test inspect_content_structure_batch extracts title from first h1."""
-    temp_fs.write_file("titled.md", "# My Title\n\n## Sub\n")
+async def test_inspect_content_structure_batch_is_concurrent(temp_fs):
+    """Test inspect_content_structure_batch overlaps file reads."""
+    paths = [f"slow{i}.md" for i in range(5)]
+    temp_fs.write_files({p: f"# {p}\n" for p in paths})
     mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure_batch")
+    tool = await _get_tool(mcp, "inspect_content_structure_batch")
+    read, stats = _overlap_tracking_read(len(paths))
+
+    with patch.object(FileSystem, "read_file", read):
+        result = await tool.run({"paths": paths})
+
+    assert [r["title"] for r in _payload(result)["results"]] == paths
+    assert stats["peak"] == len(paths)
+
+
+async def test_inspect_content_structure_batch_title_field(shared_mcp):
+    """Test inspect_content_structure_batch extracts title from first h1."""
+    tool = await _get_tool(shared_mcp, "inspect_content_structure_batch")
     result = await tool.run({"paths": ["titled.md"]})
-    text = str(result.content)
-    assert "My Title" in text
+    assert _payload(result)["results"][0]["title"] == "My Title"
 
 
-@pytest.mark.anyio
-async def test_inspect_content_structure_batch_no_h1_title_null(temp_fs):
+async def test_inspect_content_structure_batch_no_h1_title_null(shared_mcp):
     """Test inspect_content_structure_batch returns null title when no h1 exists."""
-    temp_fs.write_file("no_h1.md", "## Section\n\n### Subsection\n")
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure_batch")
-    import json
+    tool = await _get_tool(shared_mcp, "inspect_content_structure_batch")
     result = await tool.run({"paths": ["no_h1.md"]})
-    data = json.loads(str(result.content[0].text))
+    data = _payload(result)
     assert data["results"][0]["title"] is None
 
 
-@pytest.mark.anyio
-async def test_inspect_content_structure_batch_all_missing(temp_fs):
+async def test_inspect_content_structure_batch_all_missing(shared_mcp):
     """Test inspect_content_structure_batch returns errors for all missing files."""
-    mcp = create_mcp_server(temp_fs)
-    tool = await mcp.get_tool("inspect_content_structure_batch")
-    import json
+    tool = await _get_tool(shared_mcp, "inspect_content_structure_batch")
     result = await tool.run({"paths": ["missing1.md", "missing2.md"]})
-    data = json.loads(str(result.content[0].text))
+    data = _payload(result)
     for r in data["results"]:
         assert r["title"] is None
         assert r["sections"] is None
@@ -1,30 +1,40 @@
 """Tests for MetricsCollector."""
 
 import os
+import time
 from datetime import UTC, datetime, timedelta
-from tempfile import TemporaryDirectory
 
 import pytest
 
-from stash_mcp.metrics import MetricsCollector, get_metrics, init_metrics
+from stash_mcp.metrics import (
+    MEMORY_DB_PATH,
+    MetricsCollector,
+    _file_extension,
+    _status_class,
+    get_metrics,
+    init_metrics,
+)
 
 
-@pytest.fixture
-def metrics_dir():
-    """Provide a temporary directory for the metrics DB."""
-    with TemporaryDirectory() as tmpdir:
-        yield tmpdir
+@pytest.fixture(scope="module")
+def metrics_dir(tmp_path_factory):
+    """Provide a temporary directory for the CSV-backed tests.
+
+    Shared by the whole module, so each test must use its own file name.
+    """
+    return tmp_path_factory.mktemp("metrics")
 
 
 @pytest.fixture
-def collector(metrics_dir):
-    """A fresh enabled MetricsCollector backed by a temp CSV file."""
-    db_path = os.path.join(metrics_dir, "metrics.csv")
-    return MetricsCollector(db_path=db_path, enabled=True, retention_days=0)
+def collector():
+    """A fresh enabled MetricsCollector backed by in-memory storage."""
+    c = MetricsCollector(db_path=MEMORY_DB_PATH, enabled=True, retention_days=0)
+    yield c
+    c.close()
 
 
 @pytest.fixture
-def disabled_collector(metrics_dir):
+def disabled_collector():
     """A disabled MetricsCollector (no-op)."""
     return MetricsCollector(db_path="", enabled=False)
 
@@ -73,6 +83,7 @@ class TestDisabledMode:
 class TestInsert:
     def test_record_tool_call_success(self, collector):
         collector.record_tool_call("read_content", 12.5, True, transport="http")
+        collector.flush()
         results = collector._db.all()
         assert len(results) == 1
         pt = results[0]
@@ -84,6 +95,7 @@ class TestInsert:
 
     def test_record_tool_call_failure(self, collector):
         collector.record_tool_call("create_content", 5.0, False, error_type="ValueError")
+        collector.flush()
         results = collector._db.all()
         assert len(results) == 1
         pt = results[0]
@@ -92,6 +104,7 @@ class TestInsert:
 
     def test_record_request(self, collector):
         collector.record_request("POST", "/api/content/test.md", 201, 8.3)
+        collector.flush()
         results = collector._db.all()
         assert len(results) == 1
         pt = results[0]
@@ -102,6 +115,7 @@ class TestInsert:
 
     def test_record_content_event(self, collector):
         collector.record_content_event("created", "docs/hello.md", size_bytes=512)
+        collector.flush()
         results = collector._db.all()
         assert len(results) == 1
         pt = results[0]
@@ -112,6 +126,7 @@ class TestInsert:
 
     def test_record_search_query(self, collector):
         collector.record_search_query("hello world", "local", 3, 42.0)
+        collector.flush()
         results = collector._db.all()
         assert len(results) == 1
         pt = results[0]
@@ -122,6 +137,7 @@ class TestInsert:
 
     def test_record_server_event(self, collector):
         collector.record_server_event("startup", uptime_seconds=0)
+        collector.flush()
         results = collector._db.all()
         assert len(results) == 1
         pt = results[0]
@@ -131,8 +147,74 @@ class TestInsert:
     def test_multiple_points_accumulate(self, collector):
         for i in range(5):
             collector.record_tool_call(f"tool_{i}", float(i), True)
+        collector.flush()
         assert len(collector._db.all()) == 5
 
+    def test_points_buffered_until_flush(self, metrics_dir):
+        db_path = os.path.join(metrics_dir, "buffered.csv")
+        c = MetricsCollector(db_path=db_path, enabled=True, retention_days=0, flush_interval=3600)
+        c.record_tool_call("read_content", 1.0, True)
+        assert c._db.all() == []
+        c.flush()
+        assert len(c._db.all()) == 1
+        c.close()
+
+    def test_full_batch_is_written(self, metrics_dir):
+        db_path = os.path.join(metrics_dir, "batch.csv")
+        c = MetricsCollector(
+            db_path=db_path, enabled=True, retention_days=0, max_batch=3, flush_interval=3600
+        )
+        for i in range(3):
+            c.record_tool_call(f"tool_{i}", float(i), True)
+        # A full batch wakes the writer thread without waiting for the interval.
+        deadline = time.monotonic() + 5
+        while c._buffer and time.monotonic() < deadline:
+            time.sleep(0.01)
+        with c._write_lock:
+            tools = [pt.tags["tool"] for pt in c._db.all()]
+        assert tools == ["tool_0", "tool_1", "tool_2"]
+        c.close()
+
+    def test_full_buffer_drops_points(self):
+        c = MetricsCollector(
+            db_path=MEMORY_DB_PATH, enabled=True, retention_days=0,
+            max_batch=100, max_buffer=2, flush_interval=3600,
+        )
+        for i in range(3):
+            c.record_tool_call(f"tool_{i}", float(i), True)
+        assert c.dropped == 1
+        c.flush()
+        assert len(c._db.all()) == 2
+        c.close()
+
+    def test_close_stops_writer_thread(self, collector):
+        writer = collector._writer
+        assert writer.is_alive()
+        collector.close()
+        assert not writer.is_alive()
+
+    def test_close_flushes_buffer(self, metrics_dir):
+        from tinyflux import TinyFlux
+
+        db_path = os.path.join(metrics_dir, "close.csv")
+        c = MetricsCollector(db_path=db_path, enabled=True, retention_days=0)
+        c.record_server_event("shutdown")
+        c.close()
+        assert len(TinyFlux(db_path).all()) == 1
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [("docs/hello.md", ".md"), ("Notes.TXT", ".txt"), ("README", "none"), (".env", "none")],
+)
+def test_file_extension_tag(path, expected):
+    assert _file_extension(path) == expected
+
+
+@pytest.mark.parametrize("code, expected", [(200, "2xx"), (201, "2xx"), (404, "4xx"), (503, "5xx")])
+def test_status_class_tag(code, expected):
+    assert _status_class(code) == expected
+
 
 # ---------------------------------------------------------------------------
 # Pruning
@@ -146,29 +228,30 @@ class TestPruning:
         db_path = os.path.join(metrics_dir, "prune_test.csv")
         db = TinyFlux(db_path)
         old_time = datetime.now(UTC) - timedelta(days=100)
-        db.insert(
+        db.insert_multiple([
             Point(
                 time=old_time,
                 measurement="tool_call",
                 tags={"tool": "old_tool", "success": "true"},
                 fields={"duration_ms": 1.0},
-            )
-        )
-        db.insert(
+            ),
             Point(
                 time=datetime.now(UTC),
                 measurement="tool_call",
                 tags={"tool": "new_tool", "success": "true"},
                 fields={"duration_ms": 1.0},
-            )
-        )
+            ),
+        ])
         db.close()
 
         # Re-open with retention_days=90 → should prune the old point
         c = MetricsCollector(db_path=db_path, enabled=True, retention_days=90)
-        results = c._db.all()
-        assert len(results) == 1
-        assert results[0].tags["tool"] == "new_tool"
+        try:
+            results = c._db.all()
+            assert len(results) == 1
+            assert results[0].tags["tool"] == "new_tool"
+        finally:
+            c.close()
 
     def test_retention_zero_keeps_all(self, metrics_dir):
         from tinyflux import Point, TinyFlux
@@ -188,7 +271,21 @@ class TestPruning:
 
         # retention_days=0 → keep everything
         c = MetricsCollector(db_path=db_path, enabled=True, retention_days=0)
-        assert len(c._db.all()) == 1
+        try:
+            assert len(c._db.all()) == 1
+        finally:
+            c.close()
+
+    def test_retention_zero_skips_prune(self, monkeypatch):
+        def fail(self, retention_days):
+            raise AssertionError("_prune should not run when retention_days=0")
+
+        monkeypatch.setattr(MetricsCollector, "_prune", fail)
+        c = MetricsCollector(db_path=MEMORY_DB_PATH, enabled=True, retention_days=0)
+        try:
+            assert c._db is not None
+        finally:
+            c.close()
 
 
 # ---------------------------------------------------------------------------
@@ -197,29 +294,44 @@ class TestPruning:
 
 
 class TestSingleton:
+    @pytest.fixture(autouse=True)
+    def _reset_singleton(self):
+        """Start each test without a singleton and close whatever it installs."""
+        import stash_mcp.metrics as metrics_module
+
+        original = metrics_module._collector
+        metrics_module._collector = None
+        yield
+        if metrics_module._collector is not None:
+            metrics_module._collector.close()
+        metrics_module._collector = original
+
+    def test_init_metrics_replaces_and_closes_previous(self, metrics_dir):
+        first = init_metrics(
+            db_path=os.path.join(metrics_dir, "replaced.csv"), enabled=True, retention_days=0
+        )
+        second = init_metrics(
+            db_path=os.path.join(metrics_dir, "replacement.csv"), enabled=True, retention_days=0
+        )
+        assert get_metrics() is second
+        assert first._db is None
+
     def test_init_metrics_returns_collector(self, metrics_dir):
         db_path = os.path.join(metrics_dir, "singleton.csv")
         c = init_metrics(db_path=db_path, enabled=True, retention_days=0)
-        assert isinstance(c, MetricsCollector)
+        assert type(c) is MetricsCollector
         assert c.enabled is True
 
     def test_get_metrics_returns_singleton(self, metrics_dir):
         db_path = os.path.join(metrics_dir, "singleton2.csv")
         init_metrics(db_path=db_path, enabled=True, retention_days=0)
         c = get_metrics()
-        assert isinstance(c, MetricsCollector)
+        assert type(c) is MetricsCollector
         assert c.enabled is True
 
     def test_get_metrics_before_init_returns_disabled(self):
-        import stash_mcp.metrics as metrics_module
-
-        original = metrics_module._collector
-        metrics_module._collector = None
-        try:
-            c = get_metrics()
-            assert not c.enabled
-        finally:
-            metrics_module._collector = original
+        c = get_metrics()
+        assert not c.enabled
 
 
 # ---------------------------------------------------------------------------
@@ -236,3 +348,4 @@ class TestClose:
         collector.close()
         # Must not raise after close
         collector.record_tool_call("any_tool", 1.0, True)
+        assert collector._buffer == []
@@ -1,12 +1,13 @@
 """Tests for semantic search module."""
 
+import functools
 from pathlib import Path
-from tempfile import TemporaryDirectory
 
 import pytest
 
 from stash_mcp.search import (
     IndexMeta,
+    Int8VectorStore,
     SearchEngine,
     SearchResult,
     VectorStore,
@@ -18,6 +19,22 @@ from stash_mcp.search import (
 
 # --- Mock embedding function (deterministic, no API calls) ---
 
+_KEYWORDS = (
+    "auth", "oauth", "flow", "meeting", "notes",
+    "config", "database", "test", "search", "content",
+    "section", "project", "file", "data", "code", "doc",
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _embed_one(text: str) -> tuple[float, ...]:
+    """Keyword-count vector for one text (cached, so it is a tuple)."""
+    text_lower = text.lower()
+    vec = [float(text_lower.count(kw)) for kw in _KEYWORDS]
+    # Add a small constant to avoid zero vectors
+    vec[0] += 0.1
+    return tuple(vec)
+
 
 async def mock_embed(texts: list[str]) -> list[list[float]]:
     """Deterministic mock embedding: keyword-based 16-dim vectors.
@@ -25,22 +42,7 @@ async def mock_embed(texts: list[str]) -> list[list[float]]:
     Uses a simple keyword-counting approach to produce somewhat meaningful
     embeddings for testing, ensuring related texts produce similar vectors.
     """
-    keywords = [
-        "auth", "oauth", "flow", "meeting", "notes",
-        "config", "database", "test", "search", "content",
-        "section", "project", "file", "data", "code", "doc",
-    ]
-    embeddings = []
-    for text in texts:
-        text_lower = text.lower()
-        vec = []
-        for kw in keywords:
-            count = text_lower.count(kw)
-            vec.append(float(count))
-        # Add a small constant to avoid zero vectors
-        vec[0] += 0.1
-        embeddings.append(vec)
-    return embeddings
+    return [list(_embed_one(text)) for text in texts]
 
 
 # --- VectorStore tests ---
@@ -48,136 +50,277 @@ async def mock_embed(texts: list[str]) -> list[list[float]]:
 
 class TestVectorStore:
 
-    def test_empty_store(self):
+    def test_empty_store(self, tmp_path):
         """Test that a new store is empty."""
-        with TemporaryDirectory() as tmpdir:
-            store = VectorStore(Path(tmpdir) / "vectors.pkl")
-            assert store.count == 0
-            assert store.search([1.0, 0.0, 0.0]) == []
+        store = VectorStore(tmp_path / "vectors.npy")
+        assert store.count == 0
+        assert store.search([1.0, 0.0, 0.0]) == []
 
-    def test_add_and_search(self):
+    def test_add_and_search(self, tmp_path):
         """Test adding vectors and searching."""
-        with TemporaryDirectory() as tmpdir:
-            store = VectorStore(Path(tmpdir) / "vectors.pkl")
-            embeddings = [
-                [1.0, 0.0, 0.0],
-                [0.0, 1.0, 0.0],
-                [0.0, 0.0, 1.0],
-            ]
-            metadata = [
-                {"file_path": "a.md", "chunk_index": 0, "content": "about A"},
-                {"file_path": "b.md", "chunk_index": 0, "content": "about B"},
-                {"file_path": "c.md", "chunk_index": 0, "content": "about C"},
-            ]
-            store.add(embeddings, metadata)
-            assert store.count == 3
-
-            # Search for vector close to first embedding
-            results = store.search([0.9, 0.1, 0.0], top_n=2)
-            assert len(results) == 2
-            assert results[0]["file_path"] == "a.md"
-            assert "score" in results[0]
+        store = VectorStore(tmp_path / "vectors.npy")
+        embeddings = [
+            [1.0, 0.0, 0.0],
+            [0.0, 1.0, 0.0],
+            [0.0, 0.0, 1.0],
+        ]
+        metadata = [
+            {"file_path": "a.md", "chunk_index": 0, "content": "about A"},
+            {"file_path": "b.md", "chunk_index": 0, "content": "about B"},
+            {"file_path": "c.md", "chunk_index": 0, "content": "about C"},
+        ]
+        store.add(embeddings, metadata)
+        assert store.count == 3
+
+        # Search for vector close to first embedding
+        results = store.search([0.9, 0.1, 0.0], top_n=2)
+        assert len(results) == 2
+        assert results[0]["file_path"] == "a.md"
+        assert "score" in results[0]
+
+    def test_top_n_returns_best_in_order(self, tmp_path):
+        """Test that search returns exactly the top_n best rows, best first."""
+        import math
+
+        store = VectorStore(tmp_path / "vectors.npy")
+        angles = [0.1 * i for i in range(10)]
+        store.add(
+            [[math.cos(a), math.sin(a)] for a in reversed(angles)],
+            [{"file_path": f"{i}.md"} for i in reversed(range(10))],
+        )
+        results = store.search([1.0, 0.0], top_n=3)
+        assert [r["file_path"] for r in results] == ["0.md", "1.md", "2.md"]
+        assert store.search([1.0, 0.0], top_n=0) == []
 
-    def test_persistence(self):
+    def test_persistence(self, tmp_path):
         """Test that store persists across instances."""
-        with TemporaryDirectory() as tmpdir:
-            store_path = Path(tmpdir) / "vectors.pkl"
-            store = VectorStore(store_path)
-            store.add(
-                [[1.0, 0.0], [0.0, 1.0]],
-                [
-                    {"file_path": "a.md", "chunk_index": 0},
-                    {"file_path": "b.md", "chunk_index": 0},
-                ],
-            )
-            store.save()
+        store_path = tmp_path / "vectors.npy"
+        store = VectorStore(store_path)
+        store.add(
+            [[1.0, 0.0], [0.0, 1.0]],
+            [
+                {"file_path": "a.md", "chunk_index": 0},
+                {"file_path": "b.md", "chunk_index": 0},
+            ],
+        )
+        store.save()
 
-            # Reload
-            store2 = VectorStore(store_path)
-            assert store2.count == 2
-            results = store2.search([1.0, 0.0])
-            assert len(results) > 0
+        # Reload
+        store2 = VectorStore(store_path)
+        assert store2.count == 2
+        results = store2.search([1.0, 0.0])
+        assert len(results) > 0
 
-    def test_remove_by_file(self):
+    def test_reload_is_memory_mapped(self, tmp_path):
+        """Test that a reloaded store maps the matrix and can be saved over."""
+        import numpy as np
+
+        store_path = tmp_path / "vectors.npy"
+        store = VectorStore(store_path)
+        store.add(
+            [[1.0, 0.0], [0.0, 1.0]],
+            [
+                {"file_path": "a.md", "chunk_index": 0},
+                {"file_path": "b.md", "chunk_index": 0},
+            ],
+        )
+        store.save()
+
+        store2 = VectorStore(store_path)
+        assert isinstance(store2._vectors, np.memmap)
+        store2.remove_by_file("a.md")
+        store2.save()
+
+        store3 = VectorStore(store_path)
+        assert store3.count == 1
+        assert store3.search([0.0, 1.0])[0]["file_path"] == "b.md"
+
+    def test_legacy_pickle_is_never_loaded(self, tmp_path):
+        """Test that an old vectors.pkl is ignored rather than unpickled."""
+        import pickle
+
+        marker = tmp_path / "unpickled"
+
+        class Payload:
+            def __reduce__(self):
+                return (marker.touch, ())
+
+        (tmp_path / "vectors.pkl").write_bytes(pickle.dumps({"vectors": Payload()}))
+        store = VectorStore(tmp_path / "vectors.npy")
+        assert store.count == 0
+        assert not marker.exists()
+
+    def test_search_batch(self, tmp_path):
+        """Test that search_batch answers each query like search does."""
+        store = VectorStore(tmp_path / "vectors.npy")
+        store.add(
+            [[1.0, 0.0], [0.0, 1.0], [0.7, 0.7]],
+            [{"file_path": f"{c}.md", "chunk_index": 0} for c in "abc"],
+        )
+        queries = [[1.0, 0.1], [0.0, 0.0], [0.1, 1.0]]
+        batched = store.search_batch(queries, top_n=2)
+        assert batched == [store.search(q, top_n=2) for q in queries]
+        assert [r["file_path"] for r in batched[0]] == ["a.md", "c.md"]
+        assert batched[1] == []
+        assert [r["file_path"] for r in batched[2]] == ["b.md", "c.md"]
+
+    def test_remove_by_file(self, tmp_path):
         """Test removing vectors by file path."""
-        with TemporaryDirectory() as tmpdir:
-            store = VectorStore(Path(tmpdir) / "vectors.pkl")
-            store.add(
-                [[1.0, 0.0], [0.0, 1.0], [0.5, 0.5]],
-                [
-                    {"file_path": "a.md", "chunk_index": 0},
-                    {"file_path": "a.md", "chunk_index": 1},
-                    {"file_path": "b.md", "chunk_index": 0},
-                ],
-            )
-            assert store.count == 3
+        store = VectorStore(tmp_path / "vectors.npy")
+        store.add(
+            [[1.0, 0.0], [0.0, 1.0], [0.5, 0.5]],
+            [
+                {"file_path": "a.md", "chunk_index": 0},
+                {"file_path": "a.md", "chunk_index": 1},
+                {"file_path": "b.md", "chunk_index": 0},
+            ],
+        )
+        assert store.count == 3
 
-            removed = store.remove_by_file("a.md")
-            assert removed == 2
-            assert store.count == 1
+        removed = store.remove_by_file("a.md")
+        assert removed == 2
+        assert store.count == 1
 
-            results = store.search([1.0, 0.0])
-            assert len(results) == 1
-            assert results[0]["file_path"] == "b.md"
+        results = store.search([1.0, 0.0])
+        assert len(results) == 1
+        assert results[0]["file_path"] == "b.md"
 
-    def test_remove_by_file_nonexistent(self):
+    def test_remove_by_file_nonexistent(self, tmp_path):
         """Test removing a file that doesn't exist returns 0."""
-        with TemporaryDirectory() as tmpdir:
-            store = VectorStore(Path(tmpdir) / "vectors.pkl")
-            store.add(
-                [[1.0, 0.0]],
-                [{"file_path": "a.md", "chunk_index": 0}],
-            )
-            removed = store.remove_by_file("nonexistent.md")
-            assert removed == 0
-            assert store.count == 1
+        store = VectorStore(tmp_path / "vectors.npy")
+        store.add(
+            [[1.0, 0.0]],
+            [{"file_path": "a.md", "chunk_index": 0}],
+        )
+        removed = store.remove_by_file("nonexistent.md")
+        assert removed == 0
+        assert store.count == 1
 
-    def test_clear(self):
+    def test_clear(self, tmp_path):
         """Test clearing the store."""
-        with TemporaryDirectory() as tmpdir:
-            store = VectorStore(Path(tmpdir) / "vectors.pkl")
-            store.add(
-                [[1.0, 0.0]],
-                [{"file_path": "a.md", "chunk_index": 0}],
-            )
-            store.clear()
-            assert store.count == 0
+        store = VectorStore(tmp_path / "vectors.npy")
+        store.add(
+            [[1.0, 0.0]],
+            [{"file_path": "a.md", "chunk_index": 0}],
+        )
+        store.clear()
+        assert store.count == 0
 
-    def test_add_mismatched_lengths_raises(self):
+    def test_add_mismatched_lengths_raises(self, tmp_path):
         """Test that mismatched embeddings/metadata lengths raise ValueError."""
-        with TemporaryDirectory() as tmpdir:
-            store = VectorStore(Path(tmpdir) / "vectors.pkl")
-            with pytest.raises(ValueError, match="same length"):
-                store.add(
-                    [[1.0, 0.0]],
-                    [
-                        {"file_path": "a.md"},
-                        {"file_path": "b.md"},
-                    ],
-                )
-
-    def test_search_zero_vector(self):
-        """Test searching with a zero query vector returns empty."""
-        with TemporaryDirectory() as tmpdir:
-            store = VectorStore(Path(tmpdir) / "vectors.pkl")
+        store = VectorStore(tmp_path / "vectors.npy")
+        with pytest.raises(ValueError, match="same length"):
             store.add(
                 [[1.0, 0.0]],
-                [{"file_path": "a.md", "chunk_index": 0}],
+                [
+                    {"file_path": "a.md"},
+                    {"file_path": "b.md"},
+                ],
             )
-            results = store.search([0.0, 0.0])
-            assert results == []
 
-    def test_remove_all_vectors(self):
+    def test_search_zero_vector(self, tmp_path):
+        """Test searching with a zero query vector returns empty."""
+        store = VectorStore(tmp_path / "vectors.npy")
+        store.add(
+            [[1.0, 0.0]],
+            [{"file_path": "a.md", "chunk_index": 0}],
+        )
+        results = store.search([0.0, 0.0])
+        assert results == []
+
+    def test_remove_all_vectors(self, tmp_path):
         """Test removing all vectors leaves store empty."""
-        with TemporaryDirectory() as tmpdir:
-            store = VectorStore(Path(tmpdir) / "vectors.pkl")
-            store.add(
-                [[1.0, 0.0]],
-                [{"file_path": "a.md", "chunk_index": 0}],
-            )
-            store.remove_by_file("a.md")
-            assert store.count == 0
-            assert store.search([1.0, 0.0]) == []
+        store = VectorStore(tmp_path / "vectors.npy")
+        store.add(
+            [[1.0, 0.0]],
+            [{"file_path": "a.md", "chunk_index": 0}],
+        )
+        store.remove_by_file("a.md")
+        assert store.count == 0
+        assert store.search([1.0, 0.0]) == []
+
+    def test_rows_normalized_at_ingest(self, tmp_path):
+        """Test that stored rows are unit length so scores are dot products."""
+        import numpy as np
+
+        store = VectorStore(tmp_path / "vectors.npy")
+        store.add(
+            [[3.0, 4.0], [0.0, 2.0], [0.0, 0.0]],
+            [
+                {"file_path": "a.md", "chunk_index": 0},
+                {"file_path": "b.md", "chunk_index": 0},
+                {"file_path": "c.md", "chunk_index": 0},
+            ],
+        )
+        assert np.linalg.norm(store._vectors, axis=1).tolist() == pytest.approx(
+            [1.0, 1.0, 0.0]
+        )
+
+        results = store.search([1.0, 0.0])
+        assert [r["file_path"] for r in results] == ["a.md"]
+        assert results[0]["score"] == pytest.approx(0.6)
+
+
+class TestInt8VectorStore:
+
+    def test_stores_int8_and_ranks_like_float(self, tmp_path):
+        """Test that quantized storage keeps ranking and approximate scores."""
+        import numpy as np
+
+        embeddings = [[0.9, 0.1, 0.0], [0.1, 0.8, 0.3], [0.0, 0.2, 1.0]]
+        metadata = [{"file_path": f"{c}.md", "chunk_index": 0} for c in "abc"]
+        exact = VectorStore(tmp_path / "vectors.npy")
+        exact.add(embeddings, metadata)
+        store = Int8VectorStore(tmp_path / "vectors.int8.npy")
+        store.add(embeddings, metadata)
+        assert store._vectors.dtype == np.int8
+
+        query = [0.2, 0.7, 0.4]
+        expected = exact.search(query)
+        results = store.search(query)
+        assert [r["file_path"] for r in results] == [
+            r["file_path"] for r in expected
+        ]
+        for r, e in zip(results, expected):
+            assert r["score"] == pytest.approx(e["score"], abs=0.01)
+
+    def test_persistence(self, tmp_path):
+        """Test that the int8 matrix round-trips through disk."""
+        import numpy as np
+
+        store_path = tmp_path / "vectors.int8.npy"
+        store = Int8VectorStore(store_path)
+        store.add(
+            [[1.0, 0.0], [0.0, 0.0]],
+            [{"file_path": "a.md"}, {"file_path": "b.md"}],
+        )
+        store.save()
+
+        store2 = Int8VectorStore(store_path)
+        assert store2._vectors.dtype == np.int8
+        assert store2._vectors.tolist() == [[127, 0], [0, 0]]
+
+
+class TestSimilarityBackends:
+
+    @pytest.mark.parametrize("store_cls", [VectorStore, Int8VectorStore])
+    def test_simsimd_matches_numpy(self, store_cls, monkeypatch, tmp_path):
+        """Test that the SimSIMD path scores like the numpy fallback."""
+        pytest.importorskip("simsimd")
+        embeddings = [[0.9, 0.1, 0.0], [0.1, 0.8, 0.3], [0.0, 0.0, 0.0]]
+        metadata = [{"file_path": f"{c}.md", "chunk_index": 0} for c in "abc"]
+        store = store_cls(tmp_path / "vectors.npy")
+        store.add(embeddings, metadata)
+
+        query = [0.2, 0.7, 0.4]
+        fast = store.search(query)
+        monkeypatch.setattr("stash_mcp.search._optional_module", lambda name: None)
+        slow = store.search(query)
+
+        assert [r["file_path"] for r in fast] == ["b.md", "a.md"]
+        assert [r["file_path"] for r in fast] == [r["file_path"] for r in slow]
+        for f, s in zip(fast, slow):
+            assert f["score"] == pytest.approx(s["score"], abs=0.01)
 
 
 # --- Chunking tests ---
@@ -253,34 +396,60 @@ class TestChunking:
         assert _chunk_text("") == []
         assert _chunk_text("Hello world") == ["Hello world"]
 
+    def test_chunk_text_splits_on_boundaries(self):
+        """Test the legacy chunker's heading, paragraph and sentence splits."""
+        text = "# One\n\n" + "a" * 40 + "\n\n## Two\n\n" + "b" * 40
+        assert _chunk_text(text, max_chunk_size=60) == [
+            "# One\n\n" + "a" * 40,
+            "## Two\n\n" + "b" * 40,
+        ]
+        assert _chunk_text("x" * 30 + "\n\n" + "y" * 30, max_chunk_size=40) == [
+            "x" * 30,
+            "y" * 30,
+        ]
+        assert _chunk_text("First one. Second one. Third.", max_chunk_size=12) == [
+            "First one.",
+            "Second one.",
+            "Third.",
+        ]
+
 
 # --- IndexMeta tests ---
 
 
 class TestIndexMeta:
 
-    def test_save_and_load(self):
+    def test_save_and_load(self, tmp_path):
         """Test saving and loading index metadata."""
-        with TemporaryDirectory() as tmpdir:
-            path = Path(tmpdir) / "meta.json"
-            meta = IndexMeta(
-                file_hashes={"a.md": "abc123"},
-                chunk_counts={"a.md": 3},
-                embedder_model="test-model",
-            )
-            meta.save(path)
+        path = tmp_path / "meta.json"
+        meta = IndexMeta(
+            file_hashes={"a.md": "abc123"},
+            chunk_counts={"a.md": 3},
+            embedder_model="test-model",
+        )
+        meta.save(path)
+
+        loaded = IndexMeta.load(path)
+        assert loaded.file_hashes == {"a.md": "abc123"}
+        assert loaded.chunk_counts == {"a.md": 3}
+        assert loaded.embedder_model == "test-model"
 
-            loaded = IndexMeta.load(path)
-            assert loaded.file_hashes == {"a.md": "abc123"}
-            assert loaded.chunk_counts == {"a.md": 3}
-            assert loaded.embedder_model == "test-model"
+    def test_json_fallback_reads_orjson_output(self, monkeypatch, tmp_path):
+        """Test that meta written with orjson loads through the stdlib fallback."""
+        pytest.importorskip("orjson")
+        path = tmp_path / "meta.json"
+        IndexMeta(file_hashes={"a.md": "abc123"}, chunk_counts={"a.md": 3}).save(path)
 
-    def test_load_missing_file(self):
+        monkeypatch.setattr("stash_mcp.search._optional_module", lambda name: None)
+        loaded = IndexMeta.load(path)
+        assert loaded.file_hashes == {"a.md": "abc123"}
+        assert loaded.chunk_counts == {"a.md": 3}
+
+    def test_load_missing_file(self, tmp_path):
         """Test loading from a missing file returns empty."""
-        with TemporaryDirectory() as tmpdir:
-            meta = IndexMeta.load(Path(tmpdir) / "nonexistent_meta.json")
-            assert meta.file_hashes == {}
-            assert meta.chunk_counts == {}
+        meta = IndexMeta.load(tmp_path / "nonexistent_meta.json")
+        assert meta.file_hashes == {}
+        assert meta.chunk_counts == {}
 
 
 # --- Content hash tests ---
@@ -303,17 +472,18 @@ class TestContentHash:
 class TestSearchEngine:
 
     @pytest.fixture
-    def engine_dirs(self):
+    def engine_dirs(self, tmp_path):
         """Create temporary content and index directories."""
-        with TemporaryDirectory() as content_dir:
-            with TemporaryDirectory() as index_dir:
-                yield Path(content_dir), Path(index_dir)
-
-    @pytest.fixture
-    def engine(self, engine_dirs):
-        """Create a SearchEngine with mock embeddings."""
-        content_dir, index_dir = engine_dirs
-        # Create sample content
+        content_dir = tmp_path / "content"
+        content_dir.mkdir()
+        index_dir = tmp_path / "index"
+        index_dir.mkdir()
+        return content_dir, index_dir
+
+    @pytest.fixture(scope="class")
+    def engine_content(self, tmp_path_factory):
+        """Sample content shared by the class; tests using it must not modify it."""
+        content_dir = tmp_path_factory.mktemp("engine-content")
         (content_dir / "docs").mkdir()
         (content_dir / "docs" / "auth.md").write_text(
             "# Authentication\n\nThe OAuth2 flow begins with a redirect."
@@ -324,9 +494,14 @@ class TestSearchEngine:
         (content_dir / "config.py").write_text(
             "# Configuration\nDB_HOST = 'localhost'\nDB_PORT = 5432\n"
         )
+        return content_dir
+
+    @pytest.fixture
+    def engine(self, engine_content, tmp_path):
+        """Create a SearchEngine with mock embeddings and its own empty index."""
         return SearchEngine(
-            content_dir=content_dir,
-            index_dir=index_dir,
+            content_dir=engine_content,
+            index_dir=tmp_path / "index",
             embed_fn=mock_embed,
         )
 
@@ -347,6 +522,42 @@ class TestSearchEngine:
         assert all(isinstance(r, SearchResult) for r in results)
         assert all(r.score > 0 for r in results)
 
+    async def test_search_batch_matches_single_searches(self, engine):
+        """Test that search_batch returns what per-query search would."""
+        await engine.build_index(["docs/auth.md", "notes.md", "config.py"])
+        queries = ["authentication oauth flow", "meeting notes project", "config"]
+
+        batched = await engine.search_batch(queries, max_results=2)
+        assert len(batched) == 3
+        for query, results in zip(queries, batched):
+            single = await engine.search(query, max_results=2)
+            assert [(r.file_path, r.score) for r in results] == [
+                (r.file_path, r.score) for r in single
+            ]
+        assert batched[0][0].file_path == "docs/auth.md"
+        assert batched[1][0].file_path == "notes.md"
+
+    async def test_search_batch_embeds_queries_once(self, engine_dirs):
+        """Test that search_batch embeds all queries with one embed call."""
+        content_dir, index_dir = engine_dirs
+        (content_dir / "test.md").write_text("# Test\n\nSearch content.")
+        calls = []
+
+        async def counting_embed(texts):
+            calls.append(list(texts))
+            return await mock_embed(texts)
+
+        engine = SearchEngine(
+            content_dir=content_dir, index_dir=index_dir, embed_fn=counting_embed,
+        )
+        await engine.build_index(["test.md"])
+        calls.clear()
+
+        results = await engine.search_batch(["search", "content", "nothing"])
+        assert calls == [["search", "content", "nothing"]]
+        assert [len(r) for r in results] == [1, 1, 1]
+        assert await engine.search_batch([]) == []
+
     async def test_search_empty_index(self, engine):
         """Test searching an empty index."""
         results = await engine.search("anything")
@@ -387,6 +598,66 @@ class TestSearchEngine:
         total = await engine.build_index(["docs/auth.md"])
         assert total == first_count
 
+    async def test_build_index_hashes_each_file_once(self, engine, monkeypatch):
+        """Test that build_index reuses its change-detection hash when indexing."""
+        from stash_mcp import search
+
+        hashed = []
+
+        def counting_hash(content):
+            hashed.append(content)
+            return _content_hash(content)
+
+        monkeypatch.setattr(search, "_content_hash", counting_hash)
+        await engine.build_index(["docs/auth.md", "notes.md"])
+        assert len(hashed) == 2
+
+    async def test_build_index_embeds_files_in_one_call(self, engine_dirs):
+        """Test that build_index batches chunks from several files per embed call."""
+        content_dir, index_dir = engine_dirs
+        for name in ("a.md", "b.md", "c.md"):
+            (content_dir / name).write_text(f"# {name}\n\nSearch content.")
+
+        calls = []
+
+        async def counting_embed(texts):
+            calls.append(len(texts))
+            return await mock_embed(texts)
+
+        engine = SearchEngine(
+            content_dir=content_dir, index_dir=index_dir, embed_fn=counting_embed,
+        )
+        total = await engine.build_index(["a.md", "b.md", "c.md"])
+        assert calls == [3]
+        assert total == 3
+        assert engine.meta.chunk_counts == {"a.md": 1, "b.md": 1, "c.md": 1}
+        results = await engine.search("search content", max_results=3)
+        assert {r.file_path for r in results} == {"a.md", "b.md", "c.md"}
+
+    async def test_build_index_caps_inputs_per_embed_call(self, engine_dirs, monkeypatch):
+        """Test that a file with more chunks than the cap is embedded in several calls."""
+        from stash_mcp import search
+
+        content_dir, index_dir = engine_dirs
+        (content_dir / "big.md").write_text("Search content here. " * 100)
+        monkeypatch.setattr(search, "MAX_EMBED_BATCH_SIZE", 8)
+
+        calls = []
+
+        async def counting_embed(texts):
+            calls.append(len(texts))
+            return await mock_embed(texts)
+
+        engine = SearchEngine(
+            content_dir=content_dir, index_dir=index_dir, embed_fn=counting_embed,
+            chunk_size=50, chunk_overlap=0,
+        )
+        total = await engine.build_index(["big.md"])
+        assert total > 8
+        assert len(calls) > 1
+        assert max(calls) <= 8
+        assert sum(calls) == total == engine.store.count
+
     async def test_reindex(self, engine):
         """Test full reindex."""
         await engine.build_index(["docs/auth.md"])
@@ -394,6 +665,49 @@ class TestSearchEngine:
         assert total > 0
         assert engine.indexed_files == 3  # All files in content dir
 
+    async def test_reindex_only_embeds_changed_files(self, engine_dirs):
+        """Test that reindex re-embeds changed files and drops deleted ones."""
+        content_dir, index_dir = engine_dirs
+        for name in ("a.md", "b.md", "c.md"):
+            (content_dir / name).write_text(f"# {name}\n\nSearch content.")
+        embedded = []
+
+        async def recording_embed(texts):
+            embedded.extend(texts)
+            return await mock_embed(texts)
+
+        engine = SearchEngine(
+            content_dir=content_dir, index_dir=index_dir, embed_fn=recording_embed,
+        )
+        await engine.reindex()
+        assert len(embedded) == 3
+
+        embedded.clear()
+        (content_dir / "a.md").write_text("# a.md\n\nUpdated data.")
+        (content_dir / "c.md").unlink()
+        total = await engine.reindex()
+        assert embedded == ["# a.md\n\nUpdated data."]
+        assert total == 2
+        assert set(engine.meta.file_hashes) == {"a.md", "b.md"}
+        assert engine.store.count == 2
+
+        embedded.clear()
+        assert await engine.reindex(full=True) == 2
+        assert len(embedded) == 2
+
+    async def test_emptied_file_leaves_index_meta(self, engine_dirs):
+        """Test that a file emptied of content is dropped from the index meta."""
+        content_dir, index_dir = engine_dirs
+        (content_dir / "notes.md").write_text("# Notes\n\nMeeting notes.")
+        engine = SearchEngine(
+            content_dir=content_dir, index_dir=index_dir, embed_fn=mock_embed,
+        )
+        await engine.build_index(["notes.md"])
+        (content_dir / "notes.md").write_text("")
+        await engine.build_index(["notes.md"])
+        assert "notes.md" not in engine.meta.file_hashes
+        assert engine.indexed_chunks == 0
+
     async def test_index_nonexistent_file(self, engine):
         """Test indexing a nonexistent file."""
         chunks = await engine.index_file("nonexistent.md")
@@ -458,6 +772,56 @@ class TestSearchEngine:
         assert engine2.ready
         assert engine2.store.count > 0
 
+    async def test_quantize_uses_int8_store(self, engine_dirs):
+        """Test that quantize=True indexes into an Int8VectorStore."""
+        content_dir, index_dir = engine_dirs
+        (content_dir / "test.md").write_text("# Test\n\nSearch content here.")
+
+        engine = SearchEngine(
+            content_dir=content_dir, index_dir=index_dir,
+            embed_fn=mock_embed, quantize=True,
+        )
+        assert isinstance(engine.store, Int8VectorStore)
+        await engine.build_index(["test.md"])
+        results = await engine.search("search content")
+        assert results[0].file_path == "test.md"
+
+    async def test_switching_store_format_rebuilds(self, engine_dirs):
+        """Test that an index built for another store format is re-embedded."""
+        content_dir, index_dir = engine_dirs
+        (content_dir / "test.md").write_text("# Test\n\nContent here.")
+
+        engine1 = SearchEngine(
+            content_dir=content_dir, index_dir=index_dir, embed_fn=mock_embed,
+        )
+        await engine1.build_index(["test.md"])
+
+        engine2 = SearchEngine(
+            content_dir=content_dir, index_dir=index_dir,
+            embed_fn=mock_embed, quantize=True,
+        )
+        assert engine2.meta.file_hashes == {}
+        assert await engine2.build_index(["test.md"]) > 0
+        assert engine2.store.count > 0
+
+    async def test_legacy_pickle_index_is_rebuilt(self, engine_dirs):
+        """Test that an index left in the pickle format is re-embedded."""
+        content_dir, index_dir = engine_dirs
+        (content_dir / "test.md").write_text("# Test\n\nContent here.")
+        (index_dir / "vectors.pkl").write_bytes(b"not loaded")
+        IndexMeta(
+            file_hashes={"test.md": _content_hash("# Test\n\nContent here.")},
+            chunk_counts={"test.md": 1},
+            embedder_model="sentence-transformers:all-MiniLM-L6-v2",
+        ).save(index_dir / "index_meta.json")
+
+        engine = SearchEngine(
+            content_dir=content_dir, index_dir=index_dir, embed_fn=mock_embed,
+        )
+        assert engine.meta.file_hashes == {}
+        assert await engine.build_index(["test.md"]) == 1
+        assert engine.store.count == 1
+
     async def test_indexing_flag_during_build(self, engine_dirs):
         """Test that indexing property is True during build_index."""
         content_dir, index_dir = engine_dirs
@@ -534,35 +898,51 @@ class TestSearchEngine:
 
 class TestSearchAPI:
 
-    @pytest.fixture
-    def search_client(self):
-        """Create a test client with search engine enabled."""
+    @pytest.fixture(scope="class")
+    def search_fs(self, tmp_path_factory):
+        """Content shared by the class's tests, which only read it."""
+        from stash_mcp.filesystem import FileSystem
+
+        fs = FileSystem(tmp_path_factory.mktemp("content"))
+        fs.write_file("docs/auth.md", "# Auth\n\nOAuth2 flow here.")
+        fs.write_file("notes.md", "# Notes\n\nMeeting notes.")
+        return fs
+
+    @pytest.fixture(scope="class")
+    def search_engine(self, search_fs, tmp_path_factory):
+        """A SearchEngine with the shared content already indexed."""
         import asyncio
 
+        engine = SearchEngine(
+            content_dir=search_fs.content_dir,
+            index_dir=tmp_path_factory.mktemp("index"),
+            embed_fn=mock_embed,
+        )
+
+        # Build index directly since reindex endpoint is now non-blocking
+        asyncio.run(engine.build_index(["docs/auth.md", "notes.md"]))
+        return engine
+
+    @pytest.fixture(scope="class")
+    def search_client(self, search_fs, search_engine):
+        """Create a test client with search engine enabled."""
         from fastapi.testclient import TestClient
 
         from stash_mcp.api import create_api
-        from stash_mcp.filesystem import FileSystem
 
-        with TemporaryDirectory() as content_dir:
-            with TemporaryDirectory() as index_dir:
-                fs = FileSystem(Path(content_dir))
-                fs.write_file("docs/auth.md", "# Auth\n\nOAuth2 flow here.")
-                fs.write_file("notes.md", "# Notes\n\nMeeting notes.")
+        return TestClient(create_api(search_fs, search_engine=search_engine))
 
-                engine = SearchEngine(
-                    content_dir=Path(content_dir),
-                    index_dir=Path(index_dir),
-                    embed_fn=mock_embed,
-                )
-
-                # Build index directly since reindex endpoint is now non-blocking
-                asyncio.run(engine.build_index(["docs/auth.md", "notes.md"]))
+    @pytest.fixture
+    def reindex_calls(self, search_engine, monkeypatch):
+        """Record reindex calls instead of rebuilding the shared index."""
+        calls = []
 
-                app = create_api(fs, search_engine=engine)
-                client = TestClient(app)
+        async def fake_reindex(**kwargs):
+            calls.append(kwargs)
+            return 0
 
-                yield client
+        monkeypatch.setattr(search_engine, "reindex", fake_reindex)
+        return calls
 
     def test_search_endpoint(self, search_client):
         """Test GET /api/search returns results."""
@@ -584,13 +964,21 @@ class TestSearchAPI:
         assert "indexed_files" in data
         assert "indexed_chunks" in data
 
-    def test_reindex_endpoint(self, search_client):
+    def test_reindex_endpoint(self, search_client, reindex_calls):
         """Test POST /api/search/reindex returns in_progress status."""
         response = search_client.post("/api/search/reindex")
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "in_progress"
         assert data["message"] == "Reindex started"
+        assert reindex_calls == [{"full": False}]
+
+    def test_full_reindex_endpoint(self, search_client, reindex_calls):
+        """Test POST /api/search/reindex?full=true is accepted."""
+        response = search_client.post("/api/search/reindex", params={"full": "true"})
+        assert response.status_code == 200
+        assert response.json()["status"] == "in_progress"
+        assert reindex_calls == [{"full": True}]
 
     def test_search_with_file_types(self, search_client):
         """Test search with file_types filter."""
@@ -609,23 +997,22 @@ class TestSearchAPI:
 
 class TestAPIWithoutSearch:
 
-    def test_no_search_endpoints_when_disabled(self):
+    def test_no_search_endpoints_when_disabled(self, tmp_path):
         """Test that search endpoints are not registered when engine is None."""
         from fastapi.testclient import TestClient
 
         from stash_mcp.api import create_api
         from stash_mcp.filesystem import FileSystem
 
-        with TemporaryDirectory() as tmpdir:
-            fs = FileSystem(Path(tmpdir))
-            app = create_api(fs)  # No search_engine
-            client = TestClient(app)
+        fs = FileSystem(tmp_path)
+        app = create_api(fs)  # No search_engine
+        client = TestClient(app)
 
-            response = client.get("/api/search", params={"q": "test"})
-            assert response.status_code == 404
+        response = client.get("/api/search", params={"q": "test"})
+        assert response.status_code == 404
 
-            response = client.get("/api/search/status")
-            assert response.status_code == 404
+        response = client.get("/api/search/status")
+        assert response.status_code == 404
 
 
 # --- MCP search tool tests ---
@@ -633,35 +1020,38 @@ class TestAPIWithoutSearch:
 
 class TestMCPSearchTool:
 
-    async def test_search_tool_registered_when_engine_present(self):
+    async def test_search_tool_registered_when_engine_present(self, tmp_path):
         """Test that search_content tool is registered when engine is given."""
         from stash_mcp.filesystem import FileSystem
         from stash_mcp.mcp_server import create_mcp_server
 
-        with TemporaryDirectory() as content_dir:
-            with TemporaryDirectory() as index_dir:
-                fs = FileSystem(Path(content_dir))
-                engine = SearchEngine(
-                    content_dir=Path(content_dir),
-                    index_dir=Path(index_dir),
-                    embed_fn=mock_embed,
-                )
-                mcp = create_mcp_server(fs, search_engine=engine)
-                tools = await mcp.get_tools()
-                assert "search_content" in tools
-
-    async def test_search_tool_not_registered_without_engine(self):
+        content_dir = tmp_path / "content"
+        content_dir.mkdir()
+        index_dir = tmp_path / "index"
+        index_dir.mkdir()
+        fs = FileSystem(content_dir)
+        engine = SearchEngine(
+            content_dir=content_dir,
+            index_dir=index_dir,
+            embed_fn=mock_embed,
+        )
+        mcp = create_mcp_server(fs, search_engine=engine)
+        tools = await mcp.get_tools()
+        assert "search_content" in tools
+
+    async def test_search_tool_not_registered_without_engine(self, tmp_path):
         """Test that search_content tool is NOT registered without engine."""
         from stash_mcp.filesystem import FileSystem
         from stash_mcp.mcp_server import create_mcp_server
 
-        with TemporaryDirectory() as content_dir:
-            fs = FileSystem(Path(content_dir))
-            mcp = create_mcp_server(fs)
-            tools = await mcp.get_tools()
-            assert "search_content" not in tools
+        content_dir = tmp_path / "content"
+        content_dir.mkdir()
+        fs = FileSystem(content_dir)
+        mcp = create_mcp_server(fs)
+        tools = await mcp.get_tools()
+        assert "search_content" not in tools
 
-    async def test_search_tool_returns_results(self):
+    async def test_search_tool_returns_results(self, tmp_path):
         """Test search_content tool returns formatted results."""
         from unittest.mock import AsyncMock, MagicMock
 
@@ -670,33 +1060,35 @@ class TestMCPSearchTool:
         from stash_mcp.filesystem import FileSystem
         from stash_mcp.mcp_server import create_mcp_server
 
-        with TemporaryDirectory() as content_dir:
-            with TemporaryDirectory() as index_dir:
-                fs = FileSystem(Path(content_dir))
-                fs.write_file("test.md", "# Test\n\nSome searchable content.")
-
-                engine = SearchEngine(
-                    content_dir=Path(content_dir),
-                    index_dir=Path(index_dir),
-                    embed_fn=mock_embed,
-                )
-                await engine.build_index(["test.md"])
-
-                mcp = create_mcp_server(fs, search_engine=engine)
-                tool = await mcp.get_tool("search_content")
-
-                # Set up mock context
-                ctx = MagicMock(spec=Context)
-                ctx.session = AsyncMock()
-                token = _current_context.set(ctx)
-                try:
-                    result = await tool.run({"query": "searchable content"})
-                    text = str(result.content)
-                    assert "test.md" in text
-                finally:
-                    _current_context.reset(token)
-
-    async def test_search_tool_empty_index(self):
+        content_dir = tmp_path / "content"
+        content_dir.mkdir()
+        index_dir = tmp_path / "index"
+        index_dir.mkdir()
+        fs = FileSystem(content_dir)
+        fs.write_file("test.md", "# Test\n\nSome searchable content.")
+
+        engine = SearchEngine(
+            content_dir=content_dir,
+            index_dir=index_dir,
+            embed_fn=mock_embed,
+        )
+        await engine.build_index(["test.md"])
+
+        mcp = create_mcp_server(fs, search_engine=engine)
+        tool = await mcp.get_tool("search_content")
+
+        # Set up mock context
+        ctx = MagicMock(spec=Context)
+        ctx.session = AsyncMock()
+        token = _current_context.set(ctx)
+        try:
+            result = await tool.run({"query": "searchable content"})
+            text = str(result.content)
+            assert "test.md" in text
+        finally:
+            _current_context.reset(token)
+
+    async def test_search_tool_empty_index(self, tmp_path):
         """Test search_content tool with empty index."""
         from unittest.mock import AsyncMock, MagicMock
 
@@ -705,25 +1097,27 @@ class TestMCPSearchTool:
         from stash_mcp.filesystem import FileSystem
         from stash_mcp.mcp_server import create_mcp_server
 
-        with TemporaryDirectory() as content_dir:
-            with TemporaryDirectory() as index_dir:
-                fs = FileSystem(Path(content_dir))
-                engine = SearchEngine(
-                    content_dir=Path(content_dir),
-                    index_dir=Path(index_dir),
-                    embed_fn=mock_embed,
-                )
-                mcp = create_mcp_server(fs, search_engine=engine)
-                tool = await mcp.get_tool("search_content")
-
-                ctx = MagicMock(spec=Context)
-                ctx.session = AsyncMock()
-                token = _current_context.set(ctx)
-                try:
-                    result = await tool.run({"query": "anything"})
-                    assert "No results found" in str(result.content)
-                finally:
-                    _current_context.reset(token)
+        content_dir = tmp_path / "content"
+        content_dir.mkdir()
+        index_dir = tmp_path / "index"
+        index_dir.mkdir()
+        fs = FileSystem(content_dir)
+        engine = SearchEngine(
+            content_dir=content_dir,
+            index_dir=index_dir,
+            embed_fn=mock_embed,
+        )
+        mcp = create_mcp_server(fs, search_engine=engine)
+        tool = await mcp.get_tool("search_content")
+
+        ctx = MagicMock(spec=Context)
+        ctx.session = AsyncMock()
+        token = _current_context.set(ctx)
+        try:
+            result = await tool.run({"query": "anything"})
+            assert "No results found" in str(result.content)
+        finally:
+            _current_context.reset(token)
 
 
 # --- Startup index build via lifespan ---
@@ -731,7 +1125,7 @@ class TestMCPSearchTool:
 
 class TestStartupIndexBuild:
 
-    def test_lifespan_builds_index_for_preexisting_files(self, monkeypatch):
+    def test_lifespan_builds_index_for_preexisting_files(self, monkeypatch, tmp_path):
         """Test that create_app's lifespan builds the search index for files
         that already exist when the server starts.
 
@@ -742,66 +1136,66 @@ class TestStartupIndexBuild:
 
         from fastapi.testclient import TestClient
 
-        with TemporaryDirectory() as content_dir, TemporaryDirectory() as index_dir:
-            cd = Path(content_dir)
-            idx = Path(index_dir)
-
-            # Pre-populate content
-            (cd / "docs").mkdir()
-            (cd / "docs" / "auth.md").write_text(
-                "# Authentication\n\nThe OAuth2 flow begins."
-            )
-            (cd / "notes.md").write_text(
-                "# Meeting Notes\n\nDiscussed project timeline."
-            )
+        cd = tmp_path / "content"
+        cd.mkdir()
+        idx = tmp_path / "index"
 
-            monkeypatch.setattr("stash_mcp.config.Config.CONTENT_DIR", cd)
-            monkeypatch.setattr("stash_mcp.config.Config.SEARCH_ENABLED", True)
-            monkeypatch.setattr("stash_mcp.config.Config.SEARCH_INDEX_DIR", idx)
-            monkeypatch.setattr("stash_mcp.config.Config.CONTENT_PATHS", None)
+        # Pre-populate content
+        (cd / "docs").mkdir()
+        (cd / "docs" / "auth.md").write_text(
+            "# Authentication\n\nThe OAuth2 flow begins."
+        )
+        (cd / "notes.md").write_text(
+            "# Meeting Notes\n\nDiscussed project timeline."
+        )
 
-            # Patch _create_search_engine to use mock_embed
-            from stash_mcp import main as main_mod
+        monkeypatch.setattr("stash_mcp.config.Config.CONTENT_DIR", cd)
+        monkeypatch.setattr("stash_mcp.config.Config.SEARCH_ENABLED", True)
+        monkeypatch.setattr("stash_mcp.config.Config.SEARCH_INDEX_DIR", idx)
+        monkeypatch.setattr("stash_mcp.config.Config.CONTENT_PATHS", None)
 
-            _original = main_mod._create_search_engine
+        # Patch _create_search_engine to use mock_embed
+        from stash_mcp import main as main_mod
 
-            def _patched():
-                engine = SearchEngine(
-                    content_dir=cd,
-                    index_dir=idx,
-                    embed_fn=mock_embed,
-                )
-                return engine
+        _original = main_mod._create_search_engine
 
-            monkeypatch.setattr(main_mod, "_create_search_engine", _patched)
+        def _patched():
+            engine = SearchEngine(
+                content_dir=cd,
+                index_dir=idx,
+                embed_fn=mock_embed,
+            )
+            return engine
 
-            from stash_mcp.main import create_app
+        monkeypatch.setattr(main_mod, "_create_search_engine", _patched)
 
-            app = create_app()
+        from stash_mcp.main import create_app
 
-            # TestClient triggers the lifespan (startup + shutdown)
-            with TestClient(app) as client:
-                # Poll for background index build to complete
-                import time
-                for _ in range(50):
-                    resp = client.get("/api/search/status")
-                    data = resp.json()
-                    if resp.status_code == 200 and data.get("ready") is True:
-                        break
-                    time.sleep(0.1)
+        app = create_app()
 
-                # Verify search status shows indexed files
+        # TestClient triggers the lifespan (startup + shutdown)
+        with TestClient(app) as client:
+            # Poll for background index build to complete
+            import time
+            for _ in range(50):
                 resp = client.get("/api/search/status")
-                assert resp.status_code == 200
                 data = resp.json()
-                assert data["ready"] is True
-                assert data["indexed_files"] == 2
+                if resp.status_code == 200 and data.get("ready") is True:
+                    break
+                time.sleep(0.1)
 
-                # Verify search returns results
-                resp = client.get("/api/search", params={"q": "authentication"})
-                assert resp.status_code == 200
-                data = resp.json()
-                assert data["total"] > 0
+            # Verify search status shows indexed files
+            resp = client.get("/api/search/status")
+            assert resp.status_code == 200
+            data = resp.json()
+            assert data["ready"] is True
+            assert data["indexed_files"] == 2
+
+            # Verify search returns results
+            resp = client.get("/api/search", params={"q": "authentication"})
+            assert resp.status_code == 200
+            data = resp.json()
+            assert data["total"] > 0
 
 
 class TestSearchConfig:
@@ -829,6 +1223,23 @@ class TestSearchConfig:
 
         assert Config.MODEL_CACHE_DIR == Path("/data/models")
 
+    def test_stdio_server_passes_quantize(self, tmp_path, monkeypatch):
+        """Test that the stdio server forwards STASH_SEARCH_QUANTIZE to the engine."""
+        from unittest.mock import patch
+
+        from stash_mcp.filesystem import FileSystem
+        from stash_mcp.server import _create_search_engine
+
+        monkeypatch.setattr("stash_mcp.config.Config.CONTENT_DIR", tmp_path)
+        monkeypatch.setattr("stash_mcp.config.Config.SEARCH_ENABLED", True)
+        monkeypatch.setattr("stash_mcp.config.Config.SEARCH_QUANTIZE", True)
+
+        with patch("stash_mcp.search.SearchEngine") as engine_cls:
+            engine = _create_search_engine(FileSystem(tmp_path))
+
+        assert engine is engine_cls.return_value
+        assert engine_cls.call_args.kwargs["quantize"] is True
+
 
 # --- Path normalization tests ---
 
@@ -870,24 +1281,23 @@ class TestNormalizePath:
 class TestSearchIndexIntegrity:
 
     @pytest.fixture
-    def engine_with_files(self):
+    def engine_with_files(self, tmp_path):
         """Create a SearchEngine with pre-indexed files."""
-        with TemporaryDirectory() as content_dir:
-            with TemporaryDirectory() as index_dir:
-                cd = Path(content_dir)
-                (cd / "docs").mkdir()
-                (cd / "docs" / "auth.md").write_text(
-                    "# Authentication\n\nThe OAuth2 flow is used for authorization."
-                )
-                (cd / "notes.md").write_text(
-                    "# Meeting Notes\n\nDiscussed project milestones and deliverables."
-                )
-                engine = SearchEngine(
-                    content_dir=cd,
-                    index_dir=Path(index_dir),
-                    embed_fn=mock_embed,
-                )
-                yield engine, cd
+        cd = tmp_path / "content"
+        cd.mkdir()
+        (cd / "docs").mkdir()
+        (cd / "docs" / "auth.md").write_text(
+            "# Authentication\n\nThe OAuth2 flow is used for authorization."
+        )
+        (cd / "notes.md").write_text(
+            "# Meeting Notes\n\nDiscussed project milestones and deliverables."
+        )
+        engine = SearchEngine(
+            content_dir=cd,
+            index_dir=tmp_path / "index",
+            embed_fn=mock_embed,
+        )
+        return engine, cd
 
     async def test_delete_file_removed_from_search(self, engine_with_files):
         """Test that deleted files no longer appear in search results."""
@@ -961,35 +1371,36 @@ class TestSearchIndexIntegrity:
         assert "docs/auth.md" not in engine.meta.file_hashes
         assert "docs/auth-guide.md" in engine.meta.file_hashes
 
-    async def test_embedder_loaded_at_init(self):
+    async def test_embedder_loaded_at_init(self, tmp_path):
         """Test that the embedder is None when embed_fn is provided (not lazily created)."""
-        with TemporaryDirectory() as content_dir:
-            with TemporaryDirectory() as index_dir:
-                engine = SearchEngine(
-                    content_dir=Path(content_dir),
-                    index_dir=Path(index_dir),
-                    embed_fn=mock_embed,
-                )
-                # With embed_fn, _embedder should be None (no model to load)
-                assert engine._embedder is None
-
-    async def test_path_normalization_in_vector_store(self):
+        content_dir = tmp_path / "content"
+        content_dir.mkdir()
+        index_dir = tmp_path / "index"
+        index_dir.mkdir()
+        engine = SearchEngine(
+            content_dir=content_dir,
+            index_dir=index_dir,
+            embed_fn=mock_embed,
+        )
+        # With embed_fn, _embedder should be None (no model to load)
+        assert engine._embedder is None
+
+    async def test_path_normalization_in_vector_store(self, tmp_path):
         """Test that remove_by_file normalizes paths for correct matching."""
-        with TemporaryDirectory() as tmpdir:
-            store = VectorStore(Path(tmpdir) / "vectors.pkl")
-            store.add(
-                [[1.0, 0.0], [0.0, 1.0]],
-                [
-                    {"file_path": "docs/api.md", "chunk_index": 0},
-                    {"file_path": "notes.md", "chunk_index": 0},
-                ],
-            )
-            assert store.count == 2
+        store = VectorStore(tmp_path / "vectors.npy")
+        store.add(
+            [[1.0, 0.0], [0.0, 1.0]],
+            [
+                {"file_path": "docs/api.md", "chunk_index": 0},
+                {"file_path": "notes.md", "chunk_index": 0},
+            ],
+        )
+        assert store.count == 2
 
-            # Remove with leading slash - should still match "docs/api.md"
-            removed = store.remove_by_file("/docs/api.md")
-            assert removed == 1
-            assert store.count == 1
+        # Remove with leading slash - should still match "docs/api.md"
+        removed = store.remove_by_file("/docs/api.md")
+        assert removed == 1
+        assert store.count == 1
 
-            results = store.search([0.0, 1.0])
-            assert results[0]["file_path"] == "notes.md"
+        results = store.search([0.0, 1.0])
+        assert results[0]["file_path"] == "notes.md"
@@ -1,14 +1,22 @@
 """Tests for TransactionManager and git backend transaction methods."""
 
 import asyncio
+import os
+import re
+import shutil
 import subprocess
+import uuid
+import weakref
+import zlib
 from pathlib import Path
-from tempfile import TemporaryDirectory
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from fastmcp.server.context import _current_context
 
 from stash_mcp.filesystem import FileSystem
+from stash_mcp.git_backend import GitBackend
+from stash_mcp.mcp_server import create_mcp_server
 from stash_mcp.transactions import TransactionError, TransactionManager
 
 
@@ -16,36 +24,171 @@ from stash_mcp.transactions import TransactionError, TransactionManager
 # Helpers
 # ---------------------------------------------------------------------------
 
+# Environment for the git commands run directly by these tests: skip reading the
+# user's global and system config, which they neither need nor should depend on.
+_GIT_ENV = {
+    **os.environ,
+    "GIT_CONFIG_GLOBAL": os.devnull,
+    "GIT_CONFIG_SYSTEM": os.devnull,
+    "GIT_CONFIG_NOSYSTEM": "1",
+}
+
 
 def _init_repo(path: Path) -> None:
     """Initialise a bare git repo at *path* with a single commit."""
-    subprocess.run(["git", "init", str(path)], check=True, capture_output=True)
+    (path / "README.md").write_text("# Test\n")
     subprocess.run(
-        ["git", "-C", str(path), "config", "user.email", "test@example.com"],
+        ["git", "init", "-q", str(path)],
         check=True,
-        capture_output=True,
+        stdout=subprocess.DEVNULL,
+        env=_GIT_ENV,
     )
+    # Written straight into the repo config rather than via ``git config``;
+    # the initial commit and GitBackend.commit() in the copies both use it.
+    with (path / ".git" / "config").open("a") as config:
+        config.write("[user]\n\temail = test@example.com\n\tname = Test User\n")
     subprocess.run(
-        ["git", "-C", str(path), "config", "user.name", "Test User"],
+        ["git", "-C", str(path), "add", "."],
         check=True,
-        capture_output=True,
+        stdout=subprocess.DEVNULL,
+        env=_GIT_ENV,
     )
-    (path / "README.md").write_text("# Test\n")
-    subprocess.run(["git", "-C", str(path), "add", "."], check=True, capture_output=True)
     subprocess.run(
-        ["git", "-C", str(path), "commit", "-m", "Initial commit"],
+        ["git", "-C", str(path), "commit", "-q", "-m", "Initial commit"],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        env=_GIT_ENV,
+    )
+
+
+def _restore_repo(path: Path) -> None:
+    """Return the working tree at *path* to its committed state."""
+    subprocess.run(
+        ["git", "-C", str(path), "reset", "-q", "--hard"],
         check=True,
-        capture_output=True,
+        stdout=subprocess.DEVNULL,
+        env=_GIT_ENV,
     )
+    subprocess.run(
+        ["git", "-C", str(path), "clean", "-fdq"],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        env=_GIT_ENV,
+    )
+
+
+def _head_commit(repo: Path) -> dict[str, str]:
+    """Read the ``HEAD`` commit of *repo* in-process.
+
+    Returns the ``author`` (``"Name <email>"``) and the commit ``message``.
+    HEAD may be detached or a branch ref, loose or in ``packed-refs``; the
+    commit itself must be a loose object, which holds for every commit the
+    tests make (nothing here runs ``git gc``).
+    """
+    git_dir = repo / ".git"
+    head = (git_dir / "HEAD").read_text().strip()
+    if head.startswith("ref: "):
+        ref = head[len("ref: ") :]
+        ref_file = git_dir / ref
+        if ref_file.is_file():
+            head = ref_file.read_text().strip()
+        else:
+            packed = (git_dir / "packed-refs").read_text().splitlines()
+            head = next(line.split()[0] for line in packed if line.endswith(f" {ref}"))
+    obj = git_dir / "objects" / head[:2] / head[2:]
+    if not obj.is_file():
+        pytest.fail(f"HEAD commit {head} of {repo} is not a loose object")
+    raw = zlib.decompress(obj.read_bytes())
+    headers, _, message = raw.split(b"\0", 1)[1].decode().partition("\n\n")
+    author = next(line for line in headers.splitlines() if line.startswith("author "))
+    return {
+        "author": author[len("author ") :].rsplit(" ", 2)[0],
+        "message": message.strip(),
+    }
+
+
+async def _wait_for(predicate, timeout: float = 2.0, step: float = 0.005) -> None:
+    """Poll *predicate* until it is true, failing the test after *timeout* seconds."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not predicate():
+        if loop.time() >= deadline:
+            pytest.fail(f"condition not met within {timeout}s")
+        await asyncio.sleep(step)
 
 
-def _make_tm(tmpdir: Path) -> tuple[TransactionManager, FileSystem]:
-    """Create a TransactionManager backed by a real git repo."""
-    from stash_mcp.git_backend import GitBackend
+_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+# Tools are fixed once create_mcp_server returns, so list them once per server.
+_TOOL_NAMES: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+async def _tool_names(mcp) -> set[str]:
+    """Return the names of the tools registered on *mcp*."""
+    names = _TOOL_NAMES.get(mcp)
+    if names is None:
+        names = _TOOL_NAMES[mcp] = set(await mcp.get_tools())
+    return names
+
+
+class _SessionStub:
+    """Stands in for the MCP session; only notifications are exercised."""
+
+    def __init__(self) -> None:
+        self.send_resource_updated = AsyncMock()
+
+
+class _ContextStub:
+    """Minimal stand-in for :class:`fastmcp.Context` as used by the tools."""
+
+    __slots__ = ("session", "send_resource_list_changed")
+
+    def __init__(self, session: _SessionStub) -> None:
+        self.session = session
+        self.send_resource_list_changed = AsyncMock()
+
+
+def _clone_repo(src: Path, dst: Path) -> None:
+    """Copy the repo at *src* to *dst*, hard-linking its object store.
+
+    Git never rewrites an object file in place, so ``.git/objects`` can be
+    shared safely; the working tree, index and refs are copied because tests
+    modify them.
+    """
+    objects = src / ".git" / "objects"
+
+    def link_or_copy(source: str, target: str) -> None:
+        if Path(source).is_relative_to(objects):
+            try:
+                os.link(source, target)
+                return
+            except OSError:
+                pass
+        shutil.copy2(source, target)
+
+    shutil.copytree(src, dst, copy_function=link_or_copy)
 
-    _init_repo(tmpdir)
-    fs = FileSystem(tmpdir)
-    git = GitBackend(tmpdir)
+
+@pytest.fixture(scope="session")
+def golden_repo(tmp_path_factory) -> Path:
+    """An initialised repo built once and copied into each test's ``repo``."""
+    path = tmp_path_factory.mktemp("golden")
+    _init_repo(path)
+    return path
+
+
+@pytest.fixture
+def repo(golden_repo: Path, tmp_path: Path) -> Path:
+    """A private copy of :func:`golden_repo` for a single test."""
+    path = tmp_path / "repo"
+    _clone_repo(golden_repo, path)
+    return path
+
+
+def _make_tm(repo: Path) -> tuple[TransactionManager, FileSystem]:
+    """Create a TransactionManager backed by the git repo at *repo*."""
+    fs = FileSystem(repo)
+    git = GitBackend(repo)
     return TransactionManager(fs, git), fs
 
 
@@ -55,70 +198,34 @@ def _make_tm(tmpdir: Path) -> tuple[TransactionManager, FileSystem]:
 
 
 class TestGitBackendNewMethods:
-    def test_commit_stages_and_commits(self):
-        with TemporaryDirectory() as tmpdir:
-            path = Path(tmpdir)
-            _init_repo(path)
-            from stash_mcp.git_backend import GitBackend
-
-            git = GitBackend(path)
-            (path / "new.txt").write_text("hello")
-            git.commit("Add new.txt")
-            result = subprocess.run(
-                ["git", "-C", tmpdir, "log", "--oneline"],
-                capture_output=True,
-                text=True,
-            )
-            assert "Add new.txt" in result.stdout
-
-    def test_commit_with_author(self):
-        with TemporaryDirectory() as tmpdir:
-            path = Path(tmpdir)
-            _init_repo(path)
-            from stash_mcp.git_backend import GitBackend
-
-            git = GitBackend(path)
-            (path / "authored.txt").write_text("authored content")
-            git.commit("Add authored file", author="Custom Author <custom@example.com>")
-            result = subprocess.run(
-                ["git", "-C", tmpdir, "log", "--format=%an <%ae>", "-1"],
-                capture_output=True,
-                text=True,
-            )
-            assert "Custom Author" in result.stdout
-            assert "custom@example.com" in result.stdout
-
-    def test_reset_hard_discards_changes(self):
-        with TemporaryDirectory() as tmpdir:
-            path = Path(tmpdir)
-            _init_repo(path)
-            from stash_mcp.git_backend import GitBackend
-
-            git = GitBackend(path)
-            (path / "README.md").write_text("changed content")
-            git.reset_hard()
-            assert (path / "README.md").read_text() == "# Test\n"
-
-    def test_commit_raises_on_nothing_to_commit(self):
-        with TemporaryDirectory() as tmpdir:
-            path = Path(tmpdir)
-            _init_repo(path)
-            from stash_mcp.git_backend import GitBackend
-
-            git = GitBackend(path)
-            # Nothing changed — commit should fail
-            with pytest.raises(RuntimeError, match="git commit failed"):
-                git.commit("Empty commit")
-
-    def test_push_raises_on_no_remote(self):
-        with TemporaryDirectory() as tmpdir:
-            path = Path(tmpdir)
-            _init_repo(path)
-            from stash_mcp.git_backend import GitBackend
-
-            git = GitBackend(path)
-            with pytest.raises(RuntimeError, match="git push failed"):
-                git.push("nonexistent-remote", "main")
+    def test_commit_stages_and_commits(self, repo):
+        git = GitBackend(repo)
+        (repo / "new.txt").write_text("hello")
+        git.commit("Add new.txt")
+        assert _head_commit(repo)["message"] == "Add new.txt"
+
+    def test_commit_with_author(self, repo):
+        git = GitBackend(repo)
+        (repo / "authored.txt").write_text("authored content")
+        git.commit("Add authored file", author="Custom Author <custom@example.com>")
+        assert _head_commit(repo)["author"] == "Custom Author <custom@example.com>"
+
+    def test_reset_hard_discards_changes(self, repo):
+        git = GitBackend(repo)
+        (repo / "README.md").write_text("changed content")
+        git.reset_hard()
+        assert (repo / "README.md").read_text() == "# Test\n"
+
+    def test_commit_raises_on_nothing_to_commit(self, repo):
+        git = GitBackend(repo)
+        # Nothing changed — commit should fail
+        with pytest.raises(RuntimeError, match="git commit failed"):
+            git.commit("Empty commit")
+
+    def test_push_raises_on_no_remote(self, repo):
+        git = GitBackend(repo)
+        with pytest.raises(RuntimeError, match="git push failed"):
+            git.push("nonexistent-remote", "main")
 
 
 # ---------------------------------------------------------------------------
@@ -127,170 +234,163 @@ class TestGitBackendNewMethods:
 
 
 class TestTransactionManagerWriteGating:
-    @pytest.mark.asyncio
-    async def test_write_blocked_without_transaction(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, fs = _make_tm(Path(tmpdir))
-            with pytest.raises(TransactionError, match="No active transaction"):
-                tm.write_file("test.txt", "content")
+    """None of these tests start a transaction, so one manager serves them all."""
 
-    @pytest.mark.asyncio
-    async def test_delete_blocked_without_transaction(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, fs = _make_tm(Path(tmpdir))
-            fs.write_file("README.md", "x")  # write directly to fs
-            with pytest.raises(TransactionError, match="No active transaction"):
-                tm.delete_file("README.md")
+    @pytest.fixture(scope="class")
+    def gated(self, golden_repo, tmp_path_factory):
+        repo = tmp_path_factory.mktemp("gating") / "repo"
+        _clone_repo(golden_repo, repo)
+        tm, fs = _make_tm(repo)
+        return tm, fs, repo
 
-    @pytest.mark.asyncio
-    async def test_move_blocked_without_transaction(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, fs = _make_tm(Path(tmpdir))
-            fs.write_file("README.md", "x")
-            with pytest.raises(TransactionError, match="No active transaction"):
-                tm.move_file("README.md", "moved.md")
+    @pytest.fixture(autouse=True)
+    def _restore(self, gated):
+        """Undo any direct filesystem writes the test made."""
+        yield
+        tm, _, repo = gated
+        assert tm._active_session is None, "test left a transaction open"
+        _restore_repo(repo)
 
     @pytest.mark.asyncio
-    async def test_read_passes_without_transaction(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, fs = _make_tm(Path(tmpdir))
-            # README.md created by _init_repo
-            content = tm.read_file("README.md")
-            assert "Test" in content
+    async def test_write_blocked_without_transaction(self, gated):
+        tm, fs, _ = gated
+        with pytest.raises(TransactionError, match="No active transaction"):
+            tm.write_file("test.txt", "content")
 
     @pytest.mark.asyncio
-    async def test_list_passes_without_transaction(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, fs = _make_tm(Path(tmpdir))
-            files = tm.list_all_files()
-            assert "README.md" in files
+    async def test_write_files_blocked_without_transaction(self, gated):
+        tm, fs, _ = gated
+        with pytest.raises(TransactionError, match="No active transaction"):
+            tm.write_files({"a.txt": "A", "b.txt": "B"})
+        assert not fs.file_exists("a.txt")
 
     @pytest.mark.asyncio
-    async def test_file_exists_passes_without_transaction(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, fs = _make_tm(Path(tmpdir))
-            assert tm.file_exists("README.md")
-
-
-# ---------------------------------------------------------------------------
-# TransactionManager — lifecycle
-# ---------------------------------------------------------------------------
-
+    async def test_delete_blocked_without_transaction(self, gated):
+        tm, fs, _ = gated
+        fs.write_file("README.md", "x")  # write directly to fs
+        with pytest.raises(TransactionError, match="No active transaction"):
+            tm.delete_file("README.md")
 
-class TestTransactionManagerLifecycle:
     @pytest.mark.asyncio
-    async def test_start_returns_uuid(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
-            txn_id = await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            assert isinstance(txn_id, str)
-            import uuid as _uuid
-            # Verify it's a valid UUID
-            assert _uuid.UUID(txn_id)
-            await tm.abort_transaction("session-1")
+    async def test_move_blocked_without_transaction(self, gated):
+        tm, fs, _ = gated
+        fs.write_file("README.md", "x")
+        with pytest.raises(TransactionError, match="No active transaction"):
+            tm.move_file("README.md", "moved.md")
 
     @pytest.mark.asyncio
-    async def test_write_allowed_during_transaction(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, fs = _make_tm(Path(tmpdir))
-            await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            # Should not raise
-            tm.write_file("new.txt", "hello")
-            assert fs.file_exists("new.txt")
-            await tm.abort_transaction("session-1")
+    async def test_read_passes_without_transaction(self, gated):
+        tm, fs, _ = gated
+        # README.md committed in golden_repo
+        content = tm.read_file("README.md")
+        assert "Test" in content
 
     @pytest.mark.asyncio
-    async def test_end_transaction_commits(self):
-        with TemporaryDirectory() as tmpdir:
-            path = Path(tmpdir)
-            tm, fs = _make_tm(path)
-            await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            tm.write_file("committed.txt", "content")
-            await tm.end_transaction("session-1", "Add committed.txt")
-            result = subprocess.run(
-                ["git", "-C", tmpdir, "log", "--oneline"],
-                capture_output=True,
-                text=True,
-            )
-            assert "Add committed.txt" in result.stdout
+    async def test_list_passes_without_transaction(self, gated):
+        tm, fs, _ = gated
+        files = tm.list_all_files()
+        assert "README.md" in files
 
     @pytest.mark.asyncio
-    async def test_end_transaction_commits_with_author(self):
-        with TemporaryDirectory() as tmpdir:
-            path = Path(tmpdir)
-            tm, fs = _make_tm(path)
-            await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            tm.write_file("authored.txt", "content")
-            await tm.end_transaction(
-                "session-1",
-                "Add authored file",
-                author="Agent Smith <agent@example.com>",
-            )
-            result = subprocess.run(
-                ["git", "-C", tmpdir, "log", "--format=%an <%ae>", "-1"],
-                capture_output=True,
-                text=True,
-            )
-            assert "Agent Smith" in result.stdout
-            assert "agent@example.com" in result.stdout
+    async def test_file_exists_passes_without_transaction(self, gated):
+        tm, fs, _ = gated
+        assert tm.file_exists("README.md")
 
-    @pytest.mark.asyncio
-    async def test_abort_transaction_resets(self):
-        with TemporaryDirectory() as tmpdir:
-            path = Path(tmpdir)
-            tm, fs = _make_tm(path)
-            original = (path / "README.md").read_text()
-            await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            tm.write_file("README.md", "corrupted")
-            await tm.abort_transaction("session-1")
-            assert (path / "README.md").read_text() == original
 
-    @pytest.mark.asyncio
-    async def test_lock_released_after_end(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
-            await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            await tm.abort_transaction("session-1")
-            assert not tm._lock.locked()
+# ---------------------------------------------------------------------------
+# TransactionManager — lifecycle
+# ---------------------------------------------------------------------------
+
 
+class TestTransactionManagerLifecycle:
     @pytest.mark.asyncio
-    async def test_cannot_start_second_transaction_same_session(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
+    async def test_start_returns_uuid(self, repo):
+        tm, _ = _make_tm(repo)
+        txn_id = await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+        assert isinstance(txn_id, str)
+        # Verify it's a valid UUID
+        assert uuid.UUID(txn_id)
+        await tm.abort_transaction("session-1")
+
+    @pytest.mark.asyncio
+    async def test_write_allowed_during_transaction(self, repo):
+        tm, fs = _make_tm(repo)
+        await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+        # Should not raise
+        tm.write_file("new.txt", "hello")
+        assert fs.file_exists("new.txt")
+        await tm.abort_transaction("session-1")
+
+    @pytest.mark.asyncio
+    async def test_end_transaction_commits(self, repo):
+        tm, fs = _make_tm(repo)
+        await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+        tm.write_file("committed.txt", "content")
+        await tm.end_transaction("session-1", "Add committed.txt")
+        assert _head_commit(repo)["message"] == "Add committed.txt"
+
+    @pytest.mark.asyncio
+    async def test_end_transaction_commits_with_author(self, repo):
+        tm, fs = _make_tm(repo)
+        await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+        tm.write_file("authored.txt", "content")
+        await tm.end_transaction(
+            "session-1",
+            "Add authored file",
+            author="Agent Smith <agent@example.com>",
+        )
+        assert _head_commit(repo)["author"] == "Agent Smith <agent@example.com>"
+
+    @pytest.mark.asyncio
+    async def test_abort_transaction_resets(self, repo):
+        tm, fs = _make_tm(repo)
+        original = (repo / "README.md").read_text()
+        await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+        tm.write_file("README.md", "corrupted")
+        await tm.abort_transaction("session-1")
+        assert (repo / "README.md").read_text() == original
+
+    @pytest.mark.asyncio
+    async def test_lock_released_after_end(self, repo):
+        tm, _ = _make_tm(repo)
+        await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+        await tm.abort_transaction("session-1")
+        assert not tm._lock.locked()
+
+    @pytest.mark.asyncio
+    async def test_cannot_start_second_transaction_same_session(self, repo):
+        tm, _ = _make_tm(repo)
+        await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+        with pytest.raises(TransactionError, match="already active"):
             await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            with pytest.raises(TransactionError, match="already active"):
-                await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            await tm.abort_transaction("session-1")
+        await tm.abort_transaction("session-1")
 
     @pytest.mark.asyncio
-    async def test_second_session_waits_for_lock(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
-            await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+    async def test_second_session_waits_for_lock(self, repo):
+        tm, _ = _make_tm(repo)
+        await tm.start_transaction("session-1", timeout=30, lock_wait=5)
 
-            # Session 2 should time out because session 1 holds the lock
-            with pytest.raises(TransactionError, match="unavailable"):
-                await tm.start_transaction("session-2", timeout=30, lock_wait=0.1)
+        # Session 2 should time out because session 1 holds the lock
+        with pytest.raises(TransactionError, match="unavailable"):
+            await tm.start_transaction("session-2", timeout=30, lock_wait=0.1)
 
-            await tm.abort_transaction("session-1")
+        await tm.abort_transaction("session-1")
 
     @pytest.mark.asyncio
-    async def test_end_by_wrong_session_raises(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
-            await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            with pytest.raises(TransactionError, match="No active transaction for this session"):
-                await tm.end_transaction("session-2", "should fail")
-            await tm.abort_transaction("session-1")
+    async def test_end_by_wrong_session_raises(self, repo):
+        tm, _ = _make_tm(repo)
+        await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+        with pytest.raises(TransactionError, match="No active transaction for this session"):
+            await tm.end_transaction("session-2", "should fail")
+        await tm.abort_transaction("session-1")
 
     @pytest.mark.asyncio
-    async def test_abort_by_wrong_session_raises(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
-            await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            with pytest.raises(TransactionError, match="No active transaction for this session"):
-                await tm.abort_transaction("session-2")
-            await tm.abort_transaction("session-1")
+    async def test_abort_by_wrong_session_raises(self, repo):
+        tm, _ = _make_tm(repo)
+        await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+        with pytest.raises(TransactionError, match="No active transaction for this session"):
+            await tm.abort_transaction("session-2")
+        await tm.abort_transaction("session-1")
 
 
 # ---------------------------------------------------------------------------
@@ -300,30 +400,27 @@ class TestTransactionManagerLifecycle:
 
 class TestTransactionManagerTimeout:
     @pytest.mark.asyncio
-    async def test_transaction_auto_aborts_on_timeout(self):
-        with TemporaryDirectory() as tmpdir:
-            path = Path(tmpdir)
-            tm, fs = _make_tm(path)
-            original = (path / "README.md").read_text()
-            await tm.start_transaction("session-1", timeout=0.1, lock_wait=5)
-            tm.write_file("README.md", "should be reverted")
-            # Wait for auto-abort
-            await asyncio.sleep(0.5)
-            assert (path / "README.md").read_text() == original
-            assert not tm._lock.locked()
-            assert tm._active_id is None
-
-    @pytest.mark.asyncio
-    async def test_second_session_acquires_lock_after_timeout(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
-            await tm.start_transaction("session-1", timeout=0.1, lock_wait=5)
-            # Wait for auto-abort
-            await asyncio.sleep(0.5)
-            # Session 2 should now be able to acquire
-            txn_id = await tm.start_transaction("session-2", timeout=30, lock_wait=5)
-            assert txn_id is not None
-            await tm.abort_transaction("session-2")
+    async def test_transaction_auto_aborts_on_timeout(self, repo):
+        tm, fs = _make_tm(repo)
+        original = (repo / "README.md").read_text()
+        await tm.start_transaction("session-1", timeout=0.1, lock_wait=5)
+        tm.write_file("README.md", "should be reverted")
+        # Wait for auto-abort
+        await _wait_for(lambda: not tm._lock.locked())
+        assert (repo / "README.md").read_text() == original
+        assert not tm._lock.locked()
+        assert tm._active_id is None
+
+    @pytest.mark.asyncio
+    async def test_second_session_acquires_lock_after_timeout(self, repo):
+        tm, _ = _make_tm(repo)
+        await tm.start_transaction("session-1", timeout=0.1, lock_wait=5)
+        # Wait for auto-abort
+        await _wait_for(lambda: not tm._lock.locked())
+        # Session 2 should now be able to acquire
+        txn_id = await tm.start_transaction("session-2", timeout=30, lock_wait=5)
+        assert txn_id is not None
+        await tm.abort_transaction("session-2")
 
 
 # ---------------------------------------------------------------------------
@@ -333,49 +430,46 @@ class TestTransactionManagerTimeout:
 
 class TestTransactionManagerSyncCallbacks:
     @pytest.mark.asyncio
-    async def test_pause_called_on_start(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
-            pause = MagicMock()
-            resume = MagicMock()
-            tm.set_sync_callbacks(pause, resume)
-            await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            pause.assert_called_once()
-            resume.assert_not_called()
-            await tm.abort_transaction("session-1")
-
-    @pytest.mark.asyncio
-    async def test_resume_called_on_end(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
-            pause = MagicMock()
-            resume = MagicMock()
-            tm.set_sync_callbacks(pause, resume)
-            await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            await tm.abort_transaction("session-1")
-            resume.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_resume_called_on_abort(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
-            pause = MagicMock()
-            resume = MagicMock()
-            tm.set_sync_callbacks(pause, resume)
-            await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            await tm.abort_transaction("session-1")
-            resume.assert_called_once()
-
-    @pytest.mark.asyncio
-    async def test_resume_called_on_timeout(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
-            pause = MagicMock()
-            resume = MagicMock()
-            tm.set_sync_callbacks(pause, resume)
-            await tm.start_transaction("session-1", timeout=0.1, lock_wait=5)
-            await asyncio.sleep(0.5)
-            resume.assert_called_once()
+    async def test_pause_called_on_start(self, repo):
+        tm, _ = _make_tm(repo)
+        pause = MagicMock()
+        resume = MagicMock()
+        tm.set_sync_callbacks(pause, resume)
+        await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+        pause.assert_called_once()
+        resume.assert_not_called()
+        await tm.abort_transaction("session-1")
+
+    @pytest.mark.asyncio
+    async def test_resume_called_on_end(self, repo):
+        tm, _ = _make_tm(repo)
+        pause = MagicMock()
+        resume = MagicMock()
+        tm.set_sync_callbacks(pause, resume)
+        await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+        tm.write_file("ended.txt", "content")
+        await tm.end_transaction("session-1", "Add ended.txt")
+        resume.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_resume_called_on_abort(self, repo):
+        tm, _ = _make_tm(repo)
+        pause = MagicMock()
+        resume = MagicMock()
+        tm.set_sync_callbacks(pause, resume)
+        await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+        await tm.abort_transaction("session-1")
+        resume.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_resume_called_on_timeout(self, repo):
+        tm, _ = _make_tm(repo)
+        pause = MagicMock()
+        resume = MagicMock()
+        tm.set_sync_callbacks(pause, resume)
+        await tm.start_transaction("session-1", timeout=0.1, lock_wait=5)
+        await _wait_for(lambda: resume.called)
+        resume.assert_called_once()
 
 
 # ---------------------------------------------------------------------------
@@ -386,131 +480,114 @@ class TestTransactionManagerSyncCallbacks:
 class TestMCPTransactionTools:
     """Tests for MCP start/end/abort_content_transaction tools."""
 
-    def _make_mcp(self, tmpdir: Path):
-        from stash_mcp.git_backend import GitBackend
-        from stash_mcp.mcp_server import create_mcp_server
-
-        _init_repo(tmpdir)
-        fs = FileSystem(tmpdir)
-        git = GitBackend(tmpdir)
+    @pytest.fixture(scope="class")
+    def mcp_env(self, golden_repo, tmp_path_factory):
+        """One MCP server over its own repo copy, shared by the whole class."""
+        repo = tmp_path_factory.mktemp("mcp") / "repo"
+        _clone_repo(golden_repo, repo)
+        fs = FileSystem(repo)
+        git = GitBackend(repo)
         tm = TransactionManager(fs, git)
         with (
             patch("stash_mcp.mcp_server.Config.READ_ONLY", False),
             patch("stash_mcp.mcp_server.Config.GIT_SYNC_ENABLED", False),
         ):
             mcp = create_mcp_server(tm, git_backend=git)
-        return mcp, tm, fs
+        return mcp, tm, fs, repo
 
-    def _mock_context(self, session_obj=None):
-        from fastmcp.server.context import Context, _current_context
+    @pytest.fixture(autouse=True)
+    def _clean_repo(self, mcp_env):
+        """Drop whatever a test left in the shared working tree."""
+        yield
+        _, tm, _, repo = mcp_env
+        assert tm._active_session is None, "test left a transaction open"
+        _restore_repo(repo)
 
-        ctx = MagicMock(spec=Context)
-        ctx.session = session_obj or MagicMock()
-        ctx.session.send_resource_updated = AsyncMock()
-        ctx.send_resource_list_changed = AsyncMock()
+    def _mock_context(self, session_obj=None):
+        ctx = _ContextStub(session_obj or _SessionStub())
         token = _current_context.set(ctx)
         return ctx, token
 
     @pytest.mark.asyncio
-    async def test_transaction_tools_registered(self):
-        with TemporaryDirectory() as tmpdir:
-            mcp, tm, fs = self._make_mcp(Path(tmpdir))
-            tool_names = {t.name for t in await mcp.list_tools()}
-            assert "start_content_transaction" in tool_names
-            assert "commit_content_transaction" in tool_names
-            assert "abort_content_transaction" in tool_names
-
-    @pytest.mark.asyncio
-    async def test_start_returns_uuid(self):
-        with TemporaryDirectory() as tmpdir:
-            mcp, tm, fs = self._make_mcp(Path(tmpdir))
-            ctx, token = self._mock_context()
-            try:
-                tool = await mcp.get_tool("start_content_transaction")
-                result = await tool.run({})
-                import uuid as _uuid
-
-                # The result text should contain a valid UUID string
-                text = str(result.content).strip()
-                # UUID may be wrapped in quotes/brackets by the serializer; extract it
-                import re
-
-                uuid_match = re.search(
-                    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}",
-                    text,
-                )
-                assert uuid_match is not None, f"No UUID found in result: {text}"
-                _uuid.UUID(uuid_match.group())
-            finally:
-                from fastmcp.server.context import _current_context
-
-                _current_context.reset(token)
-                if tm._active_session is not None:
-                    await tm.abort_transaction(tm._active_session)
-
-    @pytest.mark.asyncio
-    async def test_write_blocked_without_transaction(self):
-        with TemporaryDirectory() as tmpdir:
-            mcp, tm, fs = self._make_mcp(Path(tmpdir))
-            ctx, token = self._mock_context()
-            try:
-                tool = await mcp.get_tool("create_content")
-                with pytest.raises((ValueError, TransactionError)):
-                    await tool.run({"path": "new.md", "content": "hello"})
-            finally:
-                from fastmcp.server.context import _current_context
-
-                _current_context.reset(token)
-
-    @pytest.mark.asyncio
-    async def test_write_allowed_after_start(self):
-        with TemporaryDirectory() as tmpdir:
-            mcp, tm, fs = self._make_mcp(Path(tmpdir))
-            session_obj = MagicMock()
-            ctx, token = self._mock_context(session_obj)
-            try:
-                start_tool = await mcp.get_tool("start_content_transaction")
-                await start_tool.run({})
-
-                create_tool = await mcp.get_tool("create_content")
-                result = await create_tool.run({"path": "new.md", "content": "hello"})
-                assert "Created" in str(result.content)
-            finally:
-                from fastmcp.server.context import _current_context
-
-                _current_context.reset(token)
-                if tm._active_session is not None:
-                    await tm.abort_transaction(tm._active_session)
-
-    @pytest.mark.asyncio
-    async def test_abort_resets_changes(self):
-        with TemporaryDirectory() as tmpdir:
-            path = Path(tmpdir)
-            mcp, tm, fs = self._make_mcp(path)
-            original = (path / "README.md").read_text()
-            session_obj = MagicMock()
-            ctx, token = self._mock_context(session_obj)
-            try:
-                start_tool = await mcp.get_tool("start_content_transaction")
-                await start_tool.run({})
-
-                overwrite_tool = await mcp.get_tool("overwrite_content")
-                import hashlib
-
-                sha = hashlib.sha256(original.encode()).hexdigest()
-                await overwrite_tool.run(
-                    {"path": "README.md", "content": "corrupted", "sha": sha}
-                )
-
-                abort_tool = await mcp.get_tool("abort_content_transaction")
-                result = await abort_tool.run({})
-                assert "aborted" in str(result.content).lower()
-            finally:
-                from fastmcp.server.context import _current_context
+    async def test_transaction_tools_registered(self, mcp_env):
+        mcp, tm, fs, repo = mcp_env
+        tool_names = await _tool_names(mcp)
+        assert "start_content_transaction" in tool_names
+        assert "commit_content_transaction" in tool_names
+        assert "abort_content_transaction" in tool_names
+
+    @pytest.mark.asyncio
+    async def test_start_returns_uuid(self, mcp_env):
+        mcp, tm, fs, repo = mcp_env
+        ctx, token = self._mock_context()
+        try:
+            tool = await mcp.get_tool("start_content_transaction")
+            result = await tool.run({})
+
+            # The result text should contain a valid UUID string
+            text = str(result.content).strip()
+            # UUID may be wrapped in quotes/brackets by the serializer; extract it
+            uuid_match = _UUID_RE.search(text)
+            assert uuid_match is not None, f"No UUID found in result: {text}"
+            uuid.UUID(uuid_match.group())
+        finally:
+            _current_context.reset(token)
+            if tm._active_session is not None:
+                await tm.abort_transaction(tm._active_session)
+
+    @pytest.mark.asyncio
+    async def test_write_blocked_without_transaction(self, mcp_env):
+        mcp, tm, fs, repo = mcp_env
+        ctx, token = self._mock_context()
+        try:
+            tool = await mcp.get_tool("create_content")
+            with pytest.raises((ValueError, TransactionError)):
+                await tool.run({"path": "new.md", "content": "hello"})
+        finally:
+            _current_context.reset(token)
+
+    @pytest.mark.asyncio
+    async def test_write_allowed_after_start(self, mcp_env):
+        mcp, tm, fs, repo = mcp_env
+        session_obj = _SessionStub()
+        ctx, token = self._mock_context(session_obj)
+        try:
+            start_tool = await mcp.get_tool("start_content_transaction")
+            await start_tool.run({})
+
+            create_tool = await mcp.get_tool("create_content")
+            result = await create_tool.run({"path": "new.md", "content": "hello"})
+            assert "Created" in str(result.content)
+        finally:
+            _current_context.reset(token)
+            if tm._active_session is not None:
+                await tm.abort_transaction(tm._active_session)
+
+    @pytest.mark.asyncio
+    async def test_abort_resets_changes(self, mcp_env):
+        mcp, tm, fs, repo = mcp_env
+        original = (repo / "README.md").read_text()
+        session_obj = _SessionStub()
+        ctx, token = self._mock_context(session_obj)
+        try:
+            start_tool = await mcp.get_tool("start_content_transaction")
+            await start_tool.run({})
+
+            overwrite_tool = await mcp.get_tool("overwrite_content")
+            import hashlib
+
+            sha = hashlib.sha256(original.encode()).hexdigest()
+            await overwrite_tool.run(
+                {"path": "README.md", "content": "corrupted", "sha": sha}
+            )
 
-                _current_context.reset(token)
+            abort_tool = await mcp.get_tool("abort_content_transaction")
+            result = await abort_tool.run({})
+            assert "aborted" in str(result.content).lower()
+        finally:
+            _current_context.reset(token)
 
-            assert (path / "README.md").read_text() == original
+        assert (repo / "README.md").read_text() == original
 
 
 # ---------------------------------------------------------------------------
@@ -522,48 +599,36 @@ class TestModeMatrix:
     """Verify the mode matrix: transaction tools only appear in the right mode."""
 
     @pytest.mark.asyncio
-    async def test_no_transaction_tools_when_read_only(self):
-        with TemporaryDirectory() as tmpdir:
-            from stash_mcp.git_backend import GitBackend
-            from stash_mcp.mcp_server import create_mcp_server
-
-            _init_repo(Path(tmpdir))
-            fs = FileSystem(Path(tmpdir))
-            git = GitBackend(Path(tmpdir))
-            with patch("stash_mcp.mcp_server.Config.READ_ONLY", True):
-                mcp = create_mcp_server(fs, git_backend=git)
-            tool_names = {t.name for t in await mcp.list_tools()}
-            assert "start_content_transaction" not in tool_names
-            assert "commit_content_transaction" not in tool_names
-            assert "abort_content_transaction" not in tool_names
+    async def test_no_transaction_tools_when_read_only(self, repo):
+        fs = FileSystem(repo)
+        git = GitBackend(repo)
+        with patch("stash_mcp.mcp_server.Config.READ_ONLY", True):
+            mcp = create_mcp_server(fs, git_backend=git)
+        tool_names = await _tool_names(mcp)
+        assert "start_content_transaction" not in tool_names
+        assert "commit_content_transaction" not in tool_names
+        assert "abort_content_transaction" not in tool_names
 
     @pytest.mark.asyncio
-    async def test_no_transaction_tools_without_git_tracking(self):
-        with TemporaryDirectory() as tmpdir:
-            from stash_mcp.mcp_server import create_mcp_server
-
-            fs = FileSystem(Path(tmpdir))
-            with patch("stash_mcp.mcp_server.Config.READ_ONLY", False):
-                # No git_backend passed → no transaction tools
-                mcp = create_mcp_server(fs, git_backend=None)
-            tool_names = {t.name for t in await mcp.list_tools()}
-            assert "start_content_transaction" not in tool_names
+    async def test_no_transaction_tools_without_git_tracking(self, tmp_path):
+        fs = FileSystem(tmp_path)
+        with patch("stash_mcp.mcp_server.Config.READ_ONLY", False):
+            # No git_backend passed → no transaction tools
+            mcp = create_mcp_server(fs, git_backend=None)
+        tool_names = await _tool_names(mcp)
+        assert "start_content_transaction" not in tool_names
 
     @pytest.mark.asyncio
-    async def test_no_transaction_tools_when_plain_filesystem(self):
+    async def test_no_transaction_tools_when_plain_filesystem(self, repo):
         """When git_backend is passed but filesystem is plain FileSystem, no txn tools."""
-        with TemporaryDirectory() as tmpdir:
-            from stash_mcp.git_backend import GitBackend
-            from stash_mcp.mcp_server import create_mcp_server
 
-            _init_repo(Path(tmpdir))
-            fs = FileSystem(Path(tmpdir))
-            git = GitBackend(Path(tmpdir))
-            with patch("stash_mcp.mcp_server.Config.READ_ONLY", False):
-                # filesystem is a plain FileSystem (not TransactionManager)
-                mcp = create_mcp_server(fs, git_backend=git)
-            tool_names = {t.name for t in await mcp.list_tools()}
-            assert "start_content_transaction" not in tool_names
+        fs = FileSystem(repo)
+        git = GitBackend(repo)
+        with patch("stash_mcp.mcp_server.Config.READ_ONLY", False):
+            # filesystem is a plain FileSystem (not TransactionManager)
+            mcp = create_mcp_server(fs, git_backend=git)
+        tool_names = await _tool_names(mcp)
+        assert "start_content_transaction" not in tool_names
 
 
 # ---------------------------------------------------------------------------
@@ -575,69 +640,60 @@ class TestGetTransactionStatus:
     """Unit tests for TransactionManager.get_transaction_status()."""
 
     @pytest.mark.asyncio
-    async def test_no_active_transaction(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
-            status = tm.get_transaction_status()
-            assert status == {"has_active_transaction": False}
+    async def test_no_active_transaction(self, repo):
+        tm, _ = _make_tm(repo)
+        status = tm.get_transaction_status()
+        assert status == {"has_active_transaction": False}
 
     @pytest.mark.asyncio
-    async def test_no_active_transaction_with_session_id(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
-            status = tm.get_transaction_status("some-session")
-            assert status == {"has_active_transaction": False}
+    async def test_no_active_transaction_with_session_id(self, repo):
+        tm, _ = _make_tm(repo)
+        status = tm.get_transaction_status("some-session")
+        assert status == {"has_active_transaction": False}
 
     @pytest.mark.asyncio
-    async def test_active_transaction_owned_by_caller(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
-            txn_id = await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            try:
-                status = tm.get_transaction_status("session-1")
-                assert status["has_active_transaction"] is True
-                assert status["transaction_id"] == txn_id
-                assert status["session_id"] == "session-1"
-                assert status["owned_by_current_session"] is True
-            finally:
-                await tm.abort_transaction("session-1")
-
-    @pytest.mark.asyncio
-    async def test_active_transaction_owned_by_other_session(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
-            txn_id = await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            try:
-                status = tm.get_transaction_status("session-2")
-                assert status["has_active_transaction"] is True
-                assert status["transaction_id"] == txn_id
-                assert status["session_id"] == "session-1"
-                assert status["owned_by_current_session"] is False
-            finally:
-                await tm.abort_transaction("session-1")
-
-    @pytest.mark.asyncio
-    async def test_no_owned_by_field_without_session_id(self):
-        with TemporaryDirectory() as tmpdir:
-            tm, _ = _make_tm(Path(tmpdir))
-            await tm.start_transaction("session-1", timeout=30, lock_wait=5)
-            try:
-                status = tm.get_transaction_status()
-                assert "owned_by_current_session" not in status
-            finally:
-                await tm.abort_transaction("session-1")
+    async def test_active_transaction_owned_by_caller(self, repo):
+        tm, _ = _make_tm(repo)
+        txn_id = await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+        try:
+            status = tm.get_transaction_status("session-1")
+            assert status["has_active_transaction"] is True
+            assert status["transaction_id"] == txn_id
+            assert status["session_id"] == "session-1"
+            assert status["owned_by_current_session"] is True
+        finally:
+            await tm.abort_transaction("session-1")
+
+    @pytest.mark.asyncio
+    async def test_active_transaction_owned_by_other_session(self, repo):
+        tm, _ = _make_tm(repo)
+        txn_id = await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+        try:
+            status = tm.get_transaction_status("session-2")
+            assert status["has_active_transaction"] is True
+            assert status["transaction_id"] == txn_id
+            assert status["session_id"] == "session-1"
+            assert status["owned_by_current_session"] is False
+        finally:
+            await tm.abort_transaction("session-1")
+
+    @pytest.mark.asyncio
+    async def test_no_owned_by_field_without_session_id(self, repo):
+        tm, _ = _make_tm(repo)
+        await tm.start_transaction("session-1", timeout=30, lock_wait=5)
+        try:
+            status = tm.get_transaction_status()
+            assert "owned_by_current_session" not in status
+        finally:
+            await tm.abort_transaction("session-1")
 
 
 class TestListContentTransactionsTool:
     """Integration tests for the list_content_transactions MCP tool."""
 
-    def _make_mcp(self, tmpdir: Path):
-        from stash_mcp.git_backend import GitBackend
-        from stash_mcp.mcp_server import create_mcp_server
-
-        _init_repo(tmpdir)
-        fs = FileSystem(tmpdir)
-        git = GitBackend(tmpdir)
+    def _make_mcp(self, repo: Path):
+        fs = FileSystem(repo)
+        git = GitBackend(repo)
         tm = TransactionManager(fs, git)
         with (
             patch("stash_mcp.mcp_server.Config.READ_ONLY", False),
@@ -647,69 +703,54 @@ class TestListContentTransactionsTool:
         return mcp, tm
 
     def _mock_context(self, session_obj=None):
-        from fastmcp.server.context import Context, _current_context
-
-        ctx = MagicMock(spec=Context)
-        ctx.session = session_obj or MagicMock()
-        ctx.session.send_resource_updated = AsyncMock()
-        ctx.send_resource_list_changed = AsyncMock()
+        ctx = _ContextStub(session_obj or _SessionStub())
         token = _current_context.set(ctx)
         return ctx, token
 
     @pytest.mark.asyncio
-    async def test_tool_registered(self):
-        with TemporaryDirectory() as tmpdir:
-            mcp, _ = self._make_mcp(Path(tmpdir))
-            tool_names = {t.name for t in await mcp.list_tools()}
-            assert "list_content_transactions" in tool_names
-
-    @pytest.mark.asyncio
-    async def test_returns_no_active_transaction(self):
-        with TemporaryDirectory() as tmpdir:
-            mcp, _ = self._make_mcp(Path(tmpdir))
-            ctx, token = self._mock_context()
-            try:
-                tool = await mcp.get_tool("list_content_transactions")
-                result = await tool.run({})
-                text = str(result.content)
-                assert "has_active_transaction" in text
-                assert "false" in text.lower()
-            finally:
-                from fastmcp.server.context import _current_context
-                _current_context.reset(token)
-
-    @pytest.mark.asyncio
-    async def test_returns_active_transaction_owned_by_caller(self):
-        with TemporaryDirectory() as tmpdir:
-            mcp, tm = self._make_mcp(Path(tmpdir))
-            session_obj = MagicMock()
-            ctx, token = self._mock_context(session_obj)
-            try:
-                start_tool = await mcp.get_tool("start_content_transaction")
-                await start_tool.run({})
-
-                list_tool = await mcp.get_tool("list_content_transactions")
-                result = await list_tool.run({})
-                text = str(result.content)
-                assert "has_active_transaction" in text
-                assert "true" in text.lower()
-                assert "owned_by_current_session" in text
-            finally:
-                from fastmcp.server.context import _current_context
-                _current_context.reset(token)
-                if tm._active_session is not None:
-                    await tm.abort_transaction(tm._active_session)
-
-    @pytest.mark.asyncio
-    async def test_not_registered_when_read_only(self):
-        with TemporaryDirectory() as tmpdir:
-            from stash_mcp.git_backend import GitBackend
-            from stash_mcp.mcp_server import create_mcp_server
-
-            _init_repo(Path(tmpdir))
-            fs = FileSystem(Path(tmpdir))
-            git = GitBackend(Path(tmpdir))
-            with patch("stash_mcp.mcp_server.Config.READ_ONLY", True):
-                mcp = create_mcp_server(fs, git_backend=git)
-            tool_names = {t.name for t in await mcp.list_tools()}
-            assert "list_content_transactions" not in tool_names
+    async def test_tool_registered(self, repo):
+        mcp, _ = self._make_mcp(repo)
+        tool_names = await _tool_names(mcp)
+        assert "list_content_transactions" in tool_names
+
+    @pytest.mark.asyncio
+    async def test_returns_no_active_transaction(self, repo):
+        mcp, _ = self._make_mcp(repo)
+        ctx, token = self._mock_context()
+        try:
+            tool = await mcp.get_tool("list_content_transactions")
+            result = await tool.run({})
+            text = str(result.content)
+            assert "has_active_transaction" in text
+            assert "false" in text.lower()
+        finally:
+            _current_context.reset(token)
+
+    @pytest.mark.asyncio
+    async def test_returns_active_transaction_owned_by_caller(self, repo):
+        mcp, tm = self._make_mcp(repo)
+        session_obj = _SessionStub()
+        ctx, token = self._mock_context(session_obj)
+        try:
+            start_tool = await mcp.get_tool("start_content_transaction")
+            await start_tool.run({})
+
+            list_tool = await mcp.get_tool("list_content_transactions")
+            result = await list_tool.run({})
+            text = str(result.content)
+            assert "has_active_transaction" in text
+            assert "true" in text.lower()
+            assert "owned_by_current_session" in text
+        finally:
+            _current_context.reset(token)
+            if tm._active_session is not None:
+                await tm.abort_transaction(tm._active_session)
+
+    @pytest.mark.asyncio
+    async def test_not_registered_when_read_only(self, repo):
+        fs = FileSystem(repo)
+        git = GitBackend(repo)
+        with patch("stash_mcp.mcp_server.Config.READ_ONLY", True):
+            mcp = create_mcp_server(fs, git_backend=git)
+        tool_names = await _tool_names(mcp)
+        assert "list_content_transactions" not in tool_names
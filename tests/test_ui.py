@@ -1,7 +1,7 @@
 """Tests for UI routes."""
 
-from pathlib import Path
-from tempfile import TemporaryDirectory
+import asyncio
+import shutil
 
 import pytest
 from fastapi.testclient import TestClient
@@ -10,37 +10,61 @@ from stash_mcp.api import create_api
 from stash_mcp.filesystem import FileSystem
 from stash_mcp.ui import create_ui_router
 
+_KEYWORDS = (
+    "auth", "oauth", "flow", "meeting", "notes",
+    "config", "database", "test", "search", "content",
+    "section", "project", "file", "data", "code", "doc",
+)
+
 
 # Simple mock embedding for search-enabled UI tests
 async def _mock_embed(texts: list[str]) -> list[list[float]]:
-    keywords = [
-        "auth", "oauth", "flow", "meeting", "notes",
-        "config", "database", "test", "search", "content",
-        "section", "project", "file", "data", "code", "doc",
-    ]
     embeddings = []
     for text in texts:
         text_lower = text.lower()
-        vec = [float(text_lower.count(kw)) for kw in keywords]
+        vec = [float(text_lower.count(kw)) for kw in _KEYWORDS]
         vec[0] += 0.1
         embeddings.append(vec)
     return embeddings
 
 
+@pytest.fixture(scope="session")
+def ui_app(tmp_path_factory):
+    """Build the API + UI app and its test client once for the whole session."""
+    fs = FileSystem(tmp_path_factory.mktemp("ui"))
+    app = create_api(fs)
+    app.include_router(create_ui_router(fs))
+    return fs, TestClient(app)
+
+
+def _reseed(fs: FileSystem) -> None:
+    """Reset *fs* to the three sample files every UI test starts from."""
+    for child in fs.content_dir.iterdir():
+        if child.is_dir():
+            shutil.rmtree(child)
+        else:
+            child.unlink()
+    fs.write_file("hello.md", "# Hello World")
+    fs.write_file("docs/readme.md", "# README\nSome content here.")
+    fs.write_file("data/config.json", '{"key": "value"}')
+
+
 @pytest.fixture
-def ui_client():
-    """Create a test client with UI router and temporary filesystem."""
-    with TemporaryDirectory() as tmpdir:
-        fs = FileSystem(Path(tmpdir))
-        fs.write_file("hello.md", "# Hello World")
-        fs.write_file("docs/readme.md", "# README\nSome content here.")
-        fs.write_file("data/config.json", '{"key": "value"}')
+def ui_client(ui_app):
+    """Shared UI test client over a freshly re-seeded content directory."""
+    fs, client = ui_app
+    _reseed(fs)
+    return client
 
-        app = create_api(fs)
-        router = create_ui_router(fs)
-        app.include_router(router)
-        client = TestClient(app)
-        yield client
+
+@pytest.fixture(scope="module")
+def hello_page(ui_app):
+    """The seeded /ui/browse/hello.md page, fetched once for read-only checks."""
+    fs, client = ui_app
+    _reseed(fs)
+    response = client.get("/ui/browse/hello.md")
+    assert response.status_code == 200
+    return response.text
 
 
 class TestUIHome:
@@ -72,18 +96,24 @@ class TestUIBrowse:
         body = response.text
         assert "readme.md" in body
 
-    def test_browse_file_shows_content(self, ui_client):
-        """GET /ui/browse/hello.md shows file content rendered as markdown."""
-        response = ui_client.get("/ui/browse/hello.md")
-        assert response.status_code == 200
-        body = response.text
-        # Markdown files are rendered to HTML
-        assert "Hello World</h1>" in body
-        assert "markdown-body" in body
-        # Should show metadata panel
-        assert "text/markdown" in body
-        # Should have edit link
-        assert "/ui/edit/hello.md" in body
+    @pytest.mark.parametrize(
+        "needle",
+        [
+            # Markdown files are rendered to HTML
+            "Hello World</h1>",
+            "markdown-body",
+            # Metadata panel
+            "text/markdown",
+            "Document Metadata",
+            "Words",
+            "Characters",
+            # Edit link
+            "/ui/edit/hello.md",
+        ],
+    )
+    def test_browse_file_page_contains(self, hello_page, needle):
+        """GET /ui/browse/hello.md shows rendered content, metadata and an edit link."""
+        assert needle in hello_page
 
     def test_browse_file_no_breadcrumbs(self, ui_client):
         """File view does not include breadcrumb navigation."""
@@ -92,15 +122,6 @@ class TestUIBrowse:
         body = response.text
         assert "breadcrumbs" not in body or 'class="breadcrumbs"' not in body
 
-    def test_browse_file_has_metadata(self, ui_client):
-        """File view shows metadata in right panel."""
-        response = ui_client.get("/ui/browse/hello.md")
-        assert response.status_code == 200
-        body = response.text
-        assert "Document Metadata" in body
-        assert "Words" in body
-        assert "Characters" in body
-
     def test_browse_directory_has_sidebar_tree(self, ui_client):
         """Browse page includes sidebar with file tree."""
         response = ui_client.get("/ui/browse/")
@@ -244,10 +265,9 @@ class TestUIMove:
         assert response.status_code == 303
         assert "/ui/browse/notes/readme.md" in response.headers["location"]
 
-    def test_move_form_present(self, ui_client):
+    def test_move_form_present(self, hello_page):
         """GET browse page for a file shows the rename form."""
-        response = ui_client.get("/ui/browse/hello.md")
-        body = response.text
+        body = hello_page
         assert "Rename / Move" in body
         assert "rename-form" in body
         assert "/ui/move/hello.md" in body
@@ -257,10 +277,9 @@ class TestUIMove:
 class TestUIMarkdown:
     """Tests for markdown rendering."""
 
-    def test_markdown_file_rendered_as_html(self, ui_client):
+    def test_markdown_file_rendered_as_html(self, hello_page):
         """Markdown files should be rendered to HTML, not shown raw."""
-        response = ui_client.get("/ui/browse/hello.md")
-        body = response.text
+        body = hello_page
         assert "markdown-body" in body
         assert "Hello World</h1>" in body
 
@@ -278,6 +297,22 @@ class TestUIMarkdown:
         assert "README</h1>" in body
         assert "Some content here." in body
 
+    def test_markdown_render_cached_per_source(self, ui_client):
+        """Re-viewing an unchanged file reuses the cached render; edits re-render."""
+        from stash_mcp.ui import _convert_markdown
+
+        ui_client.get("/ui/browse/hello.md")
+        hits = _convert_markdown.cache_info().hits
+        ui_client.get("/ui/browse/hello.md")
+        assert _convert_markdown.cache_info().hits == hits + 1
+
+        ui_client.post(
+            "/ui/save",
+            data={"path": "hello.md", "content": "# Changed"},
+            follow_redirects=False,
+        )
+        assert "Changed</h1>" in ui_client.get("/ui/browse/hello.md").text
+
 
 _SAMPLE_OPENAPI = """{
   "openapi": "3.0.0",
@@ -299,53 +334,52 @@ _SAMPLE_OPENAPI = """{
 """
 
 
-@pytest.fixture
-def embed_client():
+@pytest.fixture(scope="module")
+def embed_client(tmp_path_factory):
     """UI client with an OpenAPI spec and markdown documents that embed it."""
-    with TemporaryDirectory() as tmpdir:
-        fs = FileSystem(Path(tmpdir))
-        fs.write_file("specs/orders.json", _SAMPLE_OPENAPI)
-        fs.write_file(
-            "plans/q2.md",
-            "# Q2 Plan\n\n"
-            "```stash-embed\n"
-            "src: /specs/orders.json\n"
-            "tag: orders\n"
-            "```\n\n"
-            "More notes.\n",
-        )
-        fs.write_file(
-            "plans/relative.md",
-            "```stash-embed\n"
-            "src: ../specs/orders.json\n"
-            "path: /health\n"
-            "```\n",
-        )
-        fs.write_file(
-            "plans/missing.md",
-            "```stash-embed\nsrc: specs/nope.json\n```\n",
-        )
-        fs.write_file(
-            "plans/notapi.md",
-            "```stash-embed\nsrc: /plans/q2.md\n```\n",
-        )
-        fs.write_file(
-            "plans/nomatch.md",
-            "```stash-embed\nsrc: /specs/orders.json\ntag: ghost\n```\n",
-        )
-        fs.write_file(
-            "plans/badyaml.md",
-            "```stash-embed\nsrc: /specs/orders.json\n  tag: : :\n  - bad\n```\n",
-        )
-        fs.write_file(
-            "plans/nosrc.md",
-            "```stash-embed\ntag: orders\n```\n",
-        )
-
-        app = create_api(fs)
-        router = create_ui_router(fs)
-        app.include_router(router)
-        yield TestClient(app)
+    fs = FileSystem(tmp_path_factory.mktemp("embed"))
+    fs.write_file("specs/orders.json", _SAMPLE_OPENAPI)
+    fs.write_file(
+        "plans/q2.md",
+        "# Q2 Plan\n\n"
+        "```stash-embed\n"
+        "src: /specs/orders.json\n"
+        "tag: orders\n"
+        "```\n\n"
+        "More notes.\n",
+    )
+    fs.write_file(
+        "plans/relative.md",
+        "```stash-embed\n"
+        "src: ../specs/orders.json\n"
+        "path: /health\n"
+        "```\n",
+    )
+    fs.write_file(
+        "plans/missing.md",
+        "```stash-embed\nsrc: specs/nope.json\n```\n",
+    )
+    fs.write_file(
+        "plans/notapi.md",
+        "```stash-embed\nsrc: /plans/q2.md\n```\n",
+    )
+    fs.write_file(
+        "plans/nomatch.md",
+        "```stash-embed\nsrc: /specs/orders.json\ntag: ghost\n```\n",
+    )
+    fs.write_file(
+        "plans/badyaml.md",
+        "```stash-embed\nsrc: /specs/orders.json\n  tag: : :\n  - bad\n```\n",
+    )
+    fs.write_file(
+        "plans/nosrc.md",
+        "```stash-embed\ntag: orders\n```\n",
+    )
+
+    app = create_api(fs)
+    router = create_ui_router(fs)
+    app.include_router(router)
+    return TestClient(app)
 
 
 class TestUIEmbed:
@@ -398,26 +432,25 @@ class TestUIEmbed:
         assert "Embed error" in body
         assert "src" in body and "field" in body
 
-    def test_embed_src_with_dotdot_segments_is_normalized(self):
+    def test_embed_src_with_dotdot_segments_is_normalized(self, tmp_path):
         """A `src` with `..` segments that stays inside the content root should
         normalize cleanly — no `/ui/raw/plans/../reports/...`-style URLs end
         up in the rendered output (brittle for caches and path-based
         middleware)."""
-        with TemporaryDirectory() as tmpdir:
-            fs = FileSystem(Path(tmpdir))
-            fs.write_file(
-                "reports/q2.html",
-                "<body><div id=\"a\"><img src=\"images/foo.png\"></div></body>",
-            )
-            fs.write_file(
-                "plans/draft.md",
-                # `../reports/q2.html` from plans/ resolves to reports/q2.html
-                # — the `..` should be collapsed before any URL is emitted.
-                "```stash-embed\nsrc: ../reports/q2.html\nselector: \"#a\"\n```\n",
-            )
-            app = create_api(fs)
-            app.include_router(create_ui_router(fs))
-            body = TestClient(app).get("/ui/browse/plans/draft.md").text
+        fs = FileSystem(tmp_path)
+        fs.write_file(
+            "reports/q2.html",
+            "<body><div id=\"a\"><img src=\"images/foo.png\"></div></body>",
+        )
+        fs.write_file(
+            "plans/draft.md",
+            # `../reports/q2.html` from plans/ resolves to reports/q2.html
+            # — the `..` should be collapsed before any URL is emitted.
+            "```stash-embed\nsrc: ../reports/q2.html\nselector: \"#a\"\n```\n",
+        )
+        app = create_api(fs)
+        app.include_router(create_ui_router(fs))
+        body = TestClient(app).get("/ui/browse/plans/draft.md").text
 
         # Resolved URL is clean — no `..` segment leaks through.
         assert 'src="/ui/raw/reports/images/foo.png"' in body
@@ -439,19 +472,26 @@ class TestUIEmbed:
         assert info2.misses == 1
         assert info2.hits >= 1
 
-    def test_embed_src_escaping_content_root_shows_dedicated_error(self):
+    def test_page_chrome_does_not_freeze_static_urls(self, monkeypatch):
+        """The cached page chrome must not pin the asset URLs of the first render."""
+        import stash_mcp.ui as ui_mod
+        ui_mod._page("First", "", "")
+        monkeypatch.setattr(ui_mod, "_static_url", lambda rel: f"/static/{rel}?v=changed")
+        body = ui_mod._page("Second", "", "")
+        assert 'src="/static/vendor/stash-gantt.js?v=changed"' in body
+
+    def test_embed_src_escaping_content_root_shows_dedicated_error(self, tmp_path):
         """A `src` containing `..` segments that escape the content root must
         produce a clean embed error, not leak the raw `InvalidPathError`
         message through the generic exception handler."""
-        with TemporaryDirectory() as tmpdir:
-            fs = FileSystem(Path(tmpdir))
-            fs.write_file(
-                "plans/escape.md",
-                "```stash-embed\nsrc: ../../etc/passwd\n```\n",
-            )
-            app = create_api(fs)
-            app.include_router(create_ui_router(fs))
-            body = TestClient(app).get("/ui/browse/plans/escape.md").text
+        fs = FileSystem(tmp_path)
+        fs.write_file(
+            "plans/escape.md",
+            "```stash-embed\nsrc: ../../etc/passwd\n```\n",
+        )
+        app = create_api(fs)
+        app.include_router(create_ui_router(fs))
+        body = TestClient(app).get("/ui/browse/plans/escape.md").text
 
         assert "Embed error" in body
         assert "outside content directory" in body
@@ -472,53 +512,52 @@ _SAMPLE_HTML = """<!DOCTYPE html>
 """
 
 
-@pytest.fixture
-def html_embed_client():
+@pytest.fixture(scope="module")
+def html_embed_client(tmp_path_factory):
     """UI client with an HTML doc and markdown that embeds slices of it."""
-    with TemporaryDirectory() as tmpdir:
-        fs = FileSystem(Path(tmpdir))
-        fs.write_file("reports/q2.html", _SAMPLE_HTML)
-        fs.write_file(
-            "plans/with_selector.md",
-            "# Plan\n\n"
-            "```stash-embed\n"
-            "src: /reports/q2.html\n"
-            "selector: \"#risks\"\n"
-            "```\n",
-        )
-        fs.write_file(
-            "plans/no_selector.md",
-            "```stash-embed\nsrc: /reports/q2.html\n```\n",
-        )
-        fs.write_file(
-            "plans/no_match.md",
-            "```stash-embed\nsrc: /reports/q2.html\nselector: \"#ghost\"\n```\n",
-        )
-        fs.write_file(
-            "plans/class_selector.md",
-            "```stash-embed\nsrc: /reports/q2.html\nselector: \".callout li\"\n```\n",
-        )
-        # Force a non-html-extension file to be treated as html via the override.
-        fs.write_file("snippets/raw.txt", "<div id=\"note\">forced</div>")
-        fs.write_file(
-            "plans/type_override.md",
-            "```stash-embed\n"
-            "src: /snippets/raw.txt\n"
-            "type: html\n"
-            "selector: \"#note\"\n"
-            "```\n",
-        )
-        # Ambiguous file (plain .txt) without an override should error.
-        fs.write_file("snippets/plain.txt", "just some text")
-        fs.write_file(
-            "plans/ambiguous.md",
-            "```stash-embed\nsrc: /snippets/plain.txt\n```\n",
-        )
-
-        app = create_api(fs)
-        router = create_ui_router(fs)
-        app.include_router(router)
-        yield TestClient(app)
+    fs = FileSystem(tmp_path_factory.mktemp("html-embed"))
+    fs.write_file("reports/q2.html", _SAMPLE_HTML)
+    fs.write_file(
+        "plans/with_selector.md",
+        "# Plan\n\n"
+        "```stash-embed\n"
+        "src: /reports/q2.html\n"
+        "selector: \"#risks\"\n"
+        "```\n",
+    )
+    fs.write_file(
+        "plans/no_selector.md",
+        "```stash-embed\nsrc: /reports/q2.html\n```\n",
+    )
+    fs.write_file(
+        "plans/no_match.md",
+        "```stash-embed\nsrc: /reports/q2.html\nselector: \"#ghost\"\n```\n",
+    )
+    fs.write_file(
+        "plans/class_selector.md",
+        "```stash-embed\nsrc: /reports/q2.html\nselector: \".callout li\"\n```\n",
+    )
+    # Force a non-html-extension file to be treated as html via the override.
+    fs.write_file("snippets/raw.txt", "<div id=\"note\">forced</div>")
+    fs.write_file(
+        "plans/type_override.md",
+        "```stash-embed\n"
+        "src: /snippets/raw.txt\n"
+        "type: html\n"
+        "selector: \"#note\"\n"
+        "```\n",
+    )
+    # Ambiguous file (plain .txt) without an override should error.
+    fs.write_file("snippets/plain.txt", "just some text")
+    fs.write_file(
+        "plans/ambiguous.md",
+        "```stash-embed\nsrc: /snippets/plain.txt\n```\n",
+    )
+
+    app = create_api(fs)
+    router = create_ui_router(fs)
+    app.include_router(router)
+    return TestClient(app)
 
 
 class TestUIEmbedHTML:
@@ -572,30 +611,29 @@ class TestUIEmbedHTML:
         assert "Embed error" in body
         assert "could not determine embed type" in body
 
-    def test_embed_html_rewrites_root_selectors_to_scope(self):
+    def test_embed_html_rewrites_root_selectors_to_scope(self, tmp_path):
         """`body { color }` in the source should become `:scope { color }` so
         it applies to the embed wrapper, not to a (nonexistent) <body> inside
         the embed. Other selectors also get a `:scope ` prefix to gain
         class-level specificity (see test_embed_html_boosts_selector_specificity)."""
-        with TemporaryDirectory() as tmpdir:
-            fs = FileSystem(Path(tmpdir))
-            fs.write_file(
-                "src.html",
-                "<!DOCTYPE html><html><head>"
-                "<style>"
-                "body { color: #1e1e2e; font-family: serif; }"
-                "html, body { margin: 0; }"
-                ":root { --accent: red; }"
-                ".body-text { color: blue; }"
-                "p body { not-a-real-rule: 1; }"
-                "</style></head><body>"
-                "<section id=\"a\">hi</section>"
-                "</body></html>",
-            )
-            fs.write_file("host.md", "```stash-embed\nsrc: /src.html\nselector: \"#a\"\n```\n")
-            app = create_api(fs)
-            app.include_router(create_ui_router(fs))
-            body = TestClient(app).get("/ui/browse/host.md").text
+        fs = FileSystem(tmp_path)
+        fs.write_file(
+            "src.html",
+            "<!DOCTYPE html><html><head>"
+            "<style>"
+            "body { color: #1e1e2e; font-family: serif; }"
+            "html, body { margin: 0; }"
+            ":root { --accent: red; }"
+            ".body-text { color: blue; }"
+            "p body { not-a-real-rule: 1; }"
+            "</style></head><body>"
+            "<section id=\"a\">hi</section>"
+            "</body></html>",
+        )
+        fs.write_file("host.md", "```stash-embed\nsrc: /src.html\nselector: \"#a\"\n```\n")
+        app = create_api(fs)
+        app.include_router(create_ui_router(fs))
+        body = TestClient(app).get("/ui/browse/host.md").text
 
         # Root selectors got rewritten to :scope.
         assert ":scope { color: #1e1e2e; font-family: serif; }" in body
@@ -606,24 +644,23 @@ class TestUIEmbedHTML:
         assert ":scope .body-text { color: blue; }" in body
         assert ":scope p body { not-a-real-rule: 1; }" in body
 
-    def test_embed_html_emits_host_style_reset(self):
+    def test_embed_html_emits_host_style_reset(self, tmp_path):
         """A reset block forces text-bearing elements to revert host styles so
         rules like `.markdown-body th { background }` and `.markdown-body code
         { background }` don't bleed into the embed. The reset uses `all: revert`
         with specificity (0,1,1) — ties host's `.markdown-body <el>` rules and
         wins by source order. Source class rules (0,2,0+) still override it."""
-        with TemporaryDirectory() as tmpdir:
-            fs = FileSystem(Path(tmpdir))
-            fs.write_file(
-                "src.html",
-                "<head><style>body { color: green; } h2 { margin-top: 0; } "
-                ".metric { color: red; }</style></head>"
-                "<body><section id=\"a\"><h2>x</h2></section></body>",
-            )
-            fs.write_file("host.md", "```stash-embed\nsrc: /src.html\nselector: \"#a\"\n```\n")
-            app = create_api(fs)
-            app.include_router(create_ui_router(fs))
-            body = TestClient(app).get("/ui/browse/host.md").text
+        fs = FileSystem(tmp_path)
+        fs.write_file(
+            "src.html",
+            "<head><style>body { color: green; } h2 { margin-top: 0; } "
+            ".metric { color: red; }</style></head>"
+            "<body><section id=\"a\"><h2>x</h2></section></body>",
+        )
+        fs.write_file("host.md", "```stash-embed\nsrc: /src.html\nselector: \"#a\"\n```\n")
+        app = create_api(fs)
+        app.include_router(create_ui_router(fs))
+        body = TestClient(app).get("/ui/browse/host.md").text
 
         # Reset is present and uses `all: revert`.
         reset_idx = body.find(":scope h1, :scope h2")
@@ -640,75 +677,72 @@ class TestUIEmbedHTML:
                       "blockquote", "code", "pre", "strong"]:
             assert f":scope {token}" in body
 
-    def test_embed_html_emits_reset_even_without_source_styles(self):
+    def test_embed_html_emits_reset_even_without_source_styles(self, tmp_path):
         """A source with no <style> block still needs the reset so host
         markdown rules like `.markdown-body code { background: #181825 }`
         don't leak through to bare HTML snippets."""
-        with TemporaryDirectory() as tmpdir:
-            fs = FileSystem(Path(tmpdir))
-            fs.write_file(
-                "snippet.html",
-                "<div id=\"note\">Use <code>x</code> here.</div>",
-            )
-            fs.write_file(
-                "host.md",
-                "```stash-embed\nsrc: /snippet.html\nselector: \"#note\"\n```\n",
-            )
-            app = create_api(fs)
-            app.include_router(create_ui_router(fs))
-            body = TestClient(app).get("/ui/browse/host.md").text
+        fs = FileSystem(tmp_path)
+        fs.write_file(
+            "snippet.html",
+            "<div id=\"note\">Use <code>x</code> here.</div>",
+        )
+        fs.write_file(
+            "host.md",
+            "```stash-embed\nsrc: /snippet.html\nselector: \"#note\"\n```\n",
+        )
+        app = create_api(fs)
+        app.include_router(create_ui_router(fs))
+        body = TestClient(app).get("/ui/browse/host.md").text
 
         # Even with no <style> in the source, the @scope block + reset is emitted.
         assert "<style>@scope (.embed-" in body
         assert "all: revert" in body
         assert ":scope code" in body
 
-    def test_embed_html_boosts_selector_specificity(self):
+    def test_embed_html_boosts_selector_specificity(self, tmp_path):
         """Every non-root selector gets a `:scope ` prefix so source rules tie
         with host rules like `.markdown-body h2 { color: ... }` and win on
         source order. Without this, naked `h2 { ... }` in the source has
         specificity (0,0,1) and loses to the host's (0,1,1)."""
-        with TemporaryDirectory() as tmpdir:
-            fs = FileSystem(Path(tmpdir))
-            fs.write_file(
-                "src.html",
-                "<head><style>"
-                "h2 { color: green; }"
-                "section.callout { background: yellow; }"
-                ".metric { font-weight: 700; }"
-                "</style></head><body>"
-                "<section id=\"a\" class=\"callout\"><h2>hi</h2></section>"
-                "</body>",
-            )
-            fs.write_file("host.md", "```stash-embed\nsrc: /src.html\nselector: \"#a\"\n```\n")
-            app = create_api(fs)
-            app.include_router(create_ui_router(fs))
-            body = TestClient(app).get("/ui/browse/host.md").text
+        fs = FileSystem(tmp_path)
+        fs.write_file(
+            "src.html",
+            "<head><style>"
+            "h2 { color: green; }"
+            "section.callout { background: yellow; }"
+            ".metric { font-weight: 700; }"
+            "</style></head><body>"
+            "<section id=\"a\" class=\"callout\"><h2>hi</h2></section>"
+            "</body>",
+        )
+        fs.write_file("host.md", "```stash-embed\nsrc: /src.html\nselector: \"#a\"\n```\n")
+        app = create_api(fs)
+        app.include_router(create_ui_router(fs))
+        body = TestClient(app).get("/ui/browse/host.md").text
 
         assert ":scope h2 { color: green; }" in body
         assert ":scope section.callout { background: yellow; }" in body
         assert ":scope .metric { font-weight: 700; }" in body
 
-    def test_embed_html_styled_source(self):
+    def test_embed_html_styled_source(self, tmp_path):
         """Standalone test: source with <style> emits a scoped @scope block."""
-        with TemporaryDirectory() as tmpdir:
-            fs = FileSystem(Path(tmpdir))
-            fs.write_file(
-                "src.html",
-                "<!DOCTYPE html><html><head>"
-                "<style>section { border-left: 3px solid red; } "
-                ".callout { background: yellow; }</style>"
-                "</head><body>"
-                "<section id=\"a\" class=\"callout\">hello</section>"
-                "</body></html>",
-            )
-            fs.write_file(
-                "host.md",
-                "```stash-embed\nsrc: /src.html\nselector: \"#a\"\n```\n",
-            )
-            app = create_api(fs)
-            app.include_router(create_ui_router(fs))
-            body = TestClient(app).get("/ui/browse/host.md").text
+        fs = FileSystem(tmp_path)
+        fs.write_file(
+            "src.html",
+            "<!DOCTYPE html><html><head>"
+            "<style>section { border-left: 3px solid red; } "
+            ".callout { background: yellow; }</style>"
+            "</head><body>"
+            "<section id=\"a\" class=\"callout\">hello</section>"
+            "</body></html>",
+        )
+        fs.write_file(
+            "host.md",
+            "```stash-embed\nsrc: /src.html\nselector: \"#a\"\n```\n",
+        )
+        app = create_api(fs)
+        app.include_router(create_ui_router(fs))
+        body = TestClient(app).get("/ui/browse/host.md").text
 
         # The fragment is present.
         assert "hello" in body
@@ -724,31 +758,30 @@ class TestUIEmbedHTML:
         scope_class = scope_match.group(1)
         assert f'class="embedded-html {scope_class}"' in body
 
-    def test_embed_html_preserves_functional_pseudo_classes(self):
+    def test_embed_html_preserves_functional_pseudo_classes(self, tmp_path):
         """Selector lists inside `:is(...)`, `:not(...)`, `:where(...)`,
         `[attr="a,b"]` etc. must NOT be split on their inner commas. A naive
         `s.split(",")` would shred `:is(h1, h2)` into `:is(h1` and `h2)`,
         producing invalid CSS."""
-        with TemporaryDirectory() as tmpdir:
-            fs = FileSystem(Path(tmpdir))
-            fs.write_file(
-                "src.html",
-                "<head><style>"
-                ":is(h1, h2, h3) { color: green; }"
-                ":not(.x, .y) { padding: 0; }"
-                ":where(article, section) p { line-height: 1.5; }"
-                "[data-tag=\"a,b\"] { display: none; }"
-                "li:nth-child(2n+1 of .ok, .also-ok) { background: blue; }"
-                "</style></head>"
-                "<body><section id=\"a\">hi</section></body>",
-            )
-            fs.write_file(
-                "host.md",
-                "```stash-embed\nsrc: /src.html\nselector: \"#a\"\n```\n",
-            )
-            app = create_api(fs)
-            app.include_router(create_ui_router(fs))
-            body = TestClient(app).get("/ui/browse/host.md").text
+        fs = FileSystem(tmp_path)
+        fs.write_file(
+            "src.html",
+            "<head><style>"
+            ":is(h1, h2, h3) { color: green; }"
+            ":not(.x, .y) { padding: 0; }"
+            ":where(article, section) p { line-height: 1.5; }"
+            "[data-tag=\"a,b\"] { display: none; }"
+            "li:nth-child(2n+1 of .ok, .also-ok) { background: blue; }"
+            "</style></head>"
+            "<body><section id=\"a\">hi</section></body>",
+        )
+        fs.write_file(
+            "host.md",
+            "```stash-embed\nsrc: /src.html\nselector: \"#a\"\n```\n",
+        )
+        app = create_api(fs)
+        app.include_router(create_ui_router(fs))
+        body = TestClient(app).get("/ui/browse/host.md").text
 
         # Inner commas preserved; functional pseudo-classes not fractured.
         assert ":scope :is(h1, h2, h3) { color: green; }" in body
@@ -760,27 +793,26 @@ class TestUIEmbedHTML:
         assert ":scope h2, h3)" not in body
         assert ":scope .y)" not in body
 
-    def test_embed_html_preserves_keyframes(self):
+    def test_embed_html_preserves_keyframes(self, tmp_path):
         """`@keyframes` step lists (`0%`, `from`, `to`) are NOT CSS selectors —
         they must not be prefixed with `:scope` or the animation breaks."""
-        with TemporaryDirectory() as tmpdir:
-            fs = FileSystem(Path(tmpdir))
-            fs.write_file(
-                "src.html",
-                "<head><style>"
-                "@keyframes fade { 0% { opacity: 0; } 100% { opacity: 1; } }"
-                "@-webkit-keyframes slide { from { left: 0; } to { left: 10px; } }"
-                ".box { animation: fade 1s; }"
-                "</style></head>"
-                "<body><section id=\"a\"><div class=\"box\">hi</div></section></body>",
-            )
-            fs.write_file(
-                "host.md",
-                "```stash-embed\nsrc: /src.html\nselector: \"#a\"\n```\n",
-            )
-            app = create_api(fs)
-            app.include_router(create_ui_router(fs))
-            body = TestClient(app).get("/ui/browse/host.md").text
+        fs = FileSystem(tmp_path)
+        fs.write_file(
+            "src.html",
+            "<head><style>"
+            "@keyframes fade { 0% { opacity: 0; } 100% { opacity: 1; } }"
+            "@-webkit-keyframes slide { from { left: 0; } to { left: 10px; } }"
+            ".box { animation: fade 1s; }"
+            "</style></head>"
+            "<body><section id=\"a\"><div class=\"box\">hi</div></section></body>",
+        )
+        fs.write_file(
+            "host.md",
+            "```stash-embed\nsrc: /src.html\nselector: \"#a\"\n```\n",
+        )
+        app = create_api(fs)
+        app.include_router(create_ui_router(fs))
+        body = TestClient(app).get("/ui/browse/host.md").text
 
         # Keyframe step lists pass through unchanged — no `:scope` prefix
         # injected into `0%`, `100%`, `from`, `to`.
@@ -797,28 +829,27 @@ class TestUIEmbedHTML:
         # Non-keyframe selectors still get scoped.
         assert ":scope .box" in body
 
-    def test_embed_html_strips_scripts(self):
+    def test_embed_html_strips_scripts(self, tmp_path):
         """`<script>` elements and `on*` event handlers from embedded HTML are
         stripped so they can't execute in the host document's origin (standalone
         `.html` views run in a sandboxed iframe; embeds inject directly)."""
-        with TemporaryDirectory() as tmpdir:
-            fs = FileSystem(Path(tmpdir))
-            fs.write_file(
-                "src.html",
-                "<body>"
-                "<script>window.pwned = 1;</script>"
-                "<div id=\"a\" onclick=\"alert(1)\" onmouseover=\"x()\">"
-                "<a href=\"javascript:alert(2)\">bad</a>"
-                "<a href=\"/safe\">good</a>"
-                "</div></body>",
-            )
-            fs.write_file(
-                "host.md",
-                "```stash-embed\nsrc: /src.html\nselector: \"#a\"\n```\n",
-            )
-            app = create_api(fs)
-            app.include_router(create_ui_router(fs))
-            body = TestClient(app).get("/ui/browse/host.md").text
+        fs = FileSystem(tmp_path)
+        fs.write_file(
+            "src.html",
+            "<body>"
+            "<script>window.pwned = 1;</script>"
+            "<div id=\"a\" onclick=\"alert(1)\" onmouseover=\"x()\">"
+            "<a href=\"javascript:alert(2)\">bad</a>"
+            "<a href=\"/safe\">good</a>"
+            "</div></body>",
+        )
+        fs.write_file(
+            "host.md",
+            "```stash-embed\nsrc: /src.html\nselector: \"#a\"\n```\n",
+        )
+        app = create_api(fs)
+        app.include_router(create_ui_router(fs))
+        body = TestClient(app).get("/ui/browse/host.md").text
 
         # Isolate the embed wrapper — the host UI has its own onclick handlers
         # on sidebar buttons, so we can't assert against the whole page.
@@ -837,27 +868,26 @@ class TestUIEmbedHTML:
         assert 'href="/safe"' in embed
         assert ">good<" in embed
 
-    def test_embed_html_rewrites_relative_urls_to_source_dir(self):
+    def test_embed_html_rewrites_relative_urls_to_source_dir(self, tmp_path):
         """Relative `src`/`href` inside an embedded fragment must resolve
         relative to the *source HTML's* directory, not the embedding markdown's
         directory. Otherwise `<img src="images/foo.png">` in `reports/q2.html`
         embedded from `plans/draft.md` points at `/ui/raw/plans/images/foo.png`."""
-        with TemporaryDirectory() as tmpdir:
-            fs = FileSystem(Path(tmpdir))
-            fs.write_file(
-                "reports/q2.html",
-                "<body><div id=\"a\">"
-                "<img src=\"images/foo.png\">"
-                "<a href=\"sibling.html\">sib</a>"
-                "</div></body>",
-            )
-            fs.write_file(
-                "plans/draft.md",
-                "```stash-embed\nsrc: /reports/q2.html\nselector: \"#a\"\n```\n",
-            )
-            app = create_api(fs)
-            app.include_router(create_ui_router(fs))
-            body = TestClient(app).get("/ui/browse/plans/draft.md").text
+        fs = FileSystem(tmp_path)
+        fs.write_file(
+            "reports/q2.html",
+            "<body><div id=\"a\">"
+            "<img src=\"images/foo.png\">"
+            "<a href=\"sibling.html\">sib</a>"
+            "</div></body>",
+        )
+        fs.write_file(
+            "plans/draft.md",
+            "```stash-embed\nsrc: /reports/q2.html\nselector: \"#a\"\n```\n",
+        )
+        app = create_api(fs)
+        app.include_router(create_ui_router(fs))
+        body = TestClient(app).get("/ui/browse/plans/draft.md").text
 
         # img src rewritten under reports/, not plans/.
         assert 'src="/ui/raw/reports/images/foo.png"' in body
@@ -869,7 +899,7 @@ class TestUIEmbedHTML:
 class TestUIEmbedOpenAPIYamlOverride:
     """Edge case: `type: openapi` with a YAML spec under a non-yaml extension."""
 
-    def test_openapi_yaml_under_txt_with_explicit_type(self):
+    def test_openapi_yaml_under_txt_with_explicit_type(self, tmp_path):
         """YAML 1.1 parses JSON as a subset, so a single `yaml.safe_load` should
         handle openapi specs regardless of file extension when the user sets
         `type: openapi` explicitly."""
@@ -886,21 +916,20 @@ class TestUIEmbedOpenAPIYamlOverride:
             "        '200':\n"
             "          description: OK\n"
         )
-        with TemporaryDirectory() as tmpdir:
-            fs = FileSystem(Path(tmpdir))
-            # Stored under .txt — `_infer_embed_type` would not pick this up
-            # automatically; the user must override with `type: openapi`.
-            fs.write_file("specs/things.txt", yaml_spec)
-            fs.write_file(
-                "plans/use.md",
-                "```stash-embed\n"
-                "src: /specs/things.txt\n"
-                "type: openapi\n"
-                "```\n",
-            )
-            app = create_api(fs)
-            app.include_router(create_ui_router(fs))
-            body = TestClient(app).get("/ui/browse/plans/use.md").text
+        fs = FileSystem(tmp_path)
+        # Stored under .txt — `_infer_embed_type` would not pick this up
+        # automatically; the user must override with `type: openapi`.
+        fs.write_file("specs/things.txt", yaml_spec)
+        fs.write_file(
+            "plans/use.md",
+            "```stash-embed\n"
+            "src: /specs/things.txt\n"
+            "type: openapi\n"
+            "```\n",
+        )
+        app = create_api(fs)
+        app.include_router(create_ui_router(fs))
+        body = TestClient(app).get("/ui/browse/plans/use.md").text
 
         # Parsed correctly: operation appears in the embed.
         assert "Embed error" not in body
@@ -926,88 +955,58 @@ class TestUISearch:
         assert 'data-vector-search="true"' not in body
         assert 'id="search-results"' not in body
 
-    def test_sidebar_with_search_engine_has_vector_search(self):
-        """With search engine, sidebar uses vector search placeholder and container."""
+    @pytest.fixture(scope="class")
+    def search_client(self, tmp_path_factory):
+        """UI client with a search engine whose index is built once for the class."""
         from stash_mcp.search import SearchEngine
 
-        with TemporaryDirectory() as tmpdir, TemporaryDirectory() as idx_dir:
-            fs = FileSystem(Path(tmpdir))
-            fs.write_file("hello.md", "# Hello World")
-            engine = SearchEngine(
-                content_dir=Path(tmpdir),
-                index_dir=Path(idx_dir),
-                embed_fn=_mock_embed,
-            )
-            app = create_api(fs)
-            router = create_ui_router(fs, search_engine=engine)
-            app.include_router(router)
-            client = TestClient(app)
-            response = client.get("/ui/browse/")
-            body = response.text
-            assert "Search content" in body
-            assert "data-vector-search" in body
-            assert 'id="search-results"' in body
-            assert "data.indexing" in body
-            assert "index is being rebuilt" in body
-            assert "search-spinner" in body
-            assert "search-loading" in body
-
-    def test_ui_search_endpoint_returns_results(self):
-        """GET /ui/search returns vector search results as JSON."""
-        from stash_mcp.search import SearchEngine
+        fs = FileSystem(tmp_path_factory.mktemp("search-content"))
+        fs.write_file("docs/auth.md", "# Auth\n\nOAuth2 flow here.")
+        fs.write_file("notes.md", "# Meeting Notes\n\nDiscussed timeline.")
+        engine = SearchEngine(
+            content_dir=fs.content_dir,
+            index_dir=tmp_path_factory.mktemp("search-index"),
+            embed_fn=_mock_embed,
+            filesystem=fs,
+        )
+        asyncio.run(engine.build_index(fs.list_all_files()))
+        app = create_api(fs)
+        app.include_router(create_ui_router(fs, search_engine=engine))
+        return TestClient(app)
 
-        with TemporaryDirectory() as tmpdir, TemporaryDirectory() as idx_dir:
-            fs = FileSystem(Path(tmpdir))
-            fs.write_file("docs/auth.md", "# Auth\n\nOAuth2 flow here.")
-            fs.write_file("notes.md", "# Meeting Notes\n\nDiscussed timeline.")
-            engine = SearchEngine(
-                content_dir=Path(tmpdir),
-                index_dir=Path(idx_dir),
-                embed_fn=_mock_embed,
-                filesystem=fs,
-            )
-            app = create_api(fs)
-            router = create_ui_router(fs, search_engine=engine)
-            app.include_router(router)
-            client = TestClient(app)
-
-            # Build index first
-            import asyncio
-            asyncio.run(engine.build_index(fs.list_all_files()))
-
-            response = client.get("/ui/search", params={"q": "authentication OAuth"})
-            assert response.status_code == 200
-            data = response.json()
-            assert "results" in data
-            assert data["total"] > 0
-            assert "indexing" in data
-            assert data["indexing"] is False
-            result = data["results"][0]
-            assert "file_path" in result
-            assert "content" in result
-            assert "score" in result
-
-    def test_ui_search_empty_query_returns_empty(self):
+    def test_sidebar_with_search_engine_has_vector_search(self, search_client):
+        """With search engine, sidebar uses vector search placeholder and container."""
+        response = search_client.get("/ui/browse/")
+        body = response.text
+        assert "Search content" in body
+        assert "data-vector-search" in body
+        assert 'id="search-results"' in body
+        assert "data.indexing" in body
+        assert "index is being rebuilt" in body
+        assert "search-spinner" in body
+        assert "search-loading" in body
+
+    def test_ui_search_endpoint_returns_results(self, search_client):
+        """GET /ui/search returns vector search results as JSON."""
+        response = search_client.get("/ui/search", params={"q": "authentication OAuth"})
+        assert response.status_code == 200
+        data = response.json()
+        assert "results" in data
+        assert data["total"] > 0
+        assert "indexing" in data
+        assert data["indexing"] is False
+        result = data["results"][0]
+        assert "file_path" in result
+        assert "content" in result
+        assert "score" in result
+
+    def test_ui_search_empty_query_returns_empty(self, search_client):
         """GET /ui/search with empty query returns empty results."""
-        from stash_mcp.search import SearchEngine
-
-        with TemporaryDirectory() as tmpdir, TemporaryDirectory() as idx_dir:
-            fs = FileSystem(Path(tmpdir))
-            engine = SearchEngine(
-                content_dir=Path(tmpdir),
-                index_dir=Path(idx_dir),
-                embed_fn=_mock_embed,
-            )
-            app = create_api(fs)
-            router = create_ui_router(fs, search_engine=engine)
-            app.include_router(router)
-            client = TestClient(app)
-
-            response = client.get("/ui/search", params={"q": ""})
-            assert response.status_code == 200
-            data = response.json()
-            assert data["results"] == []
-            assert data["total"] == 0
+        response = search_client.get("/ui/search", params={"q": ""})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["results"] == []
+        assert data["total"] == 0
 
     def test_no_search_endpoint_without_engine(self, ui_client):
         """GET /ui/search returns 404 when search engine is not enabled."""
@@ -1018,10 +1017,9 @@ class TestUISearch:
 class TestUIFeatures:
     """Tests for UI enhancement features."""
 
-    def test_keyboard_shortcuts_in_js(self, ui_client):
+    def test_keyboard_shortcuts_in_js(self, hello_page):
         """Page should include keyboard shortcut handlers."""
-        response = ui_client.get("/ui/browse/hello.md")
-        body = response.text
+        body = hello_page
         assert "keydown" in body
         assert "ctrlKey" in body
 
@@ -1051,93 +1049,74 @@ class TestUIEvents:
     """Tests for event emission from UI mutation routes."""
 
     @pytest.fixture
-    def ui_client_with_listener(self):
-        """Create a test client with event listener attached."""
-        from unittest.mock import MagicMock
-
-        from stash_mcp.events import _listeners, add_listener
+    def ui_client_with_listener(self, ui_client):
+        """Shared UI client plus the list of events emitted during the test."""
+        from stash_mcp.events import add_listener, remove_listener
 
-        with TemporaryDirectory() as tmpdir:
-            fs = FileSystem(Path(tmpdir))
-            fs.write_file("hello.md", "# Hello World")
+        events: list[tuple[tuple, dict]] = []
 
-            app = create_api(fs)
-            router = create_ui_router(fs)
-            app.include_router(router)
-            client = TestClient(app)
+        def listener(*args, **kwargs):
+            events.append((args, kwargs))
 
-            listener = MagicMock()
-            add_listener(listener)
-            yield client, listener
-            _listeners.remove(listener)
+        add_listener(listener)
+        yield ui_client, events
+        remove_listener(listener)
 
     def test_ui_save_new_file_emits_created(self, ui_client_with_listener):
         """POST /ui/save for a new file emits content_created event."""
-        client, listener = ui_client_with_listener
+        client, events = ui_client_with_listener
         client.post(
             "/ui/save",
             data={"path": "new.md", "content": "# New"},
             follow_redirects=False,
         )
-        listener.assert_called_once()
-        args = listener.call_args[0]
-        assert args[0] == "content_created"
-        assert args[1] == "new.md"
+        assert events == [(("content_created", "new.md"), {})]
 
     def test_ui_save_existing_file_emits_updated(self, ui_client_with_listener):
         """POST /ui/save for an existing file emits content_updated event."""
-        client, listener = ui_client_with_listener
+        client, events = ui_client_with_listener
         client.post(
             "/ui/save",
             data={"path": "hello.md", "content": "# Updated"},
             follow_redirects=False,
         )
-        listener.assert_called_once()
-        args = listener.call_args[0]
-        assert args[0] == "content_updated"
-        assert args[1] == "hello.md"
+        assert events == [(("content_updated", "hello.md"), {})]
 
     def test_ui_delete_emits_deleted(self, ui_client_with_listener):
         """POST /ui/delete emits content_deleted event."""
-        client, listener = ui_client_with_listener
+        client, events = ui_client_with_listener
         client.post("/ui/delete/hello.md", follow_redirects=False)
-        listener.assert_called_once()
-        args = listener.call_args[0]
-        assert args[0] == "content_deleted"
-        assert args[1] == "hello.md"
+        assert events == [(("content_deleted", "hello.md"), {})]
 
     def test_ui_move_emits_moved(self, ui_client_with_listener):
         """POST /ui/move emits content_moved event with correct kwargs."""
-        client, listener = ui_client_with_listener
+        client, events = ui_client_with_listener
         client.post(
             "/ui/move/hello.md",
             data={"destination": "renamed.md"},
             follow_redirects=False,
         )
-        listener.assert_called_once()
-        args = listener.call_args[0]
-        kwargs = listener.call_args[1]
-        assert args[0] == "content_moved"
-        assert args[1] == "renamed.md"
+        assert len(events) == 1
+        args, kwargs = events[0]
+        assert args == ("content_moved", "renamed.md")
         assert kwargs.get("source_path") == "hello.md"
 
 
 class TestUIReadOnly:
     """Tests for read-only mode (STASH_READ_ONLY=true) in the UI."""
 
-    @pytest.fixture
-    def ro_client(self):
+    @pytest.fixture(scope="class")
+    def ro_client(self, tmp_path_factory):
         """Create a test client with UI router in read-only mode."""
-        with TemporaryDirectory() as tmpdir:
-            fs = FileSystem(Path(tmpdir))
-            fs.write_file("hello.md", "# Hello World")
-            fs.write_file("docs/readme.md", "# README")
-
-            app = create_api(fs)
-            router = create_ui_router(fs, read_only=True)
-            app.include_router(router)
-            client = TestClient(app)
-            yield client
+        fs = FileSystem(tmp_path_factory.mktemp("ro"))
+        fs.write_file("hello.md", "# Hello World")
+        fs.write_file("docs/readme.md", "# README")
+
+        app = create_api(fs)
+        router = create_ui_router(fs, read_only=True)
+        app.include_router(router)
+        client = TestClient(app)
+        return client
 
     # --- UI elements hidden in read-only mode ---
 